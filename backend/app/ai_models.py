@@ -9,13 +9,28 @@
 # - IncidentPredictor
 
 from datetime import datetime
+import threading
+import time
 import numpy as np
 import pandas as pd
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
 from sklearn.preprocessing import StandardScaler
 import joblib
 from config import settings
+import shapely
 from shapely.geometry import Point, Polygon
+from services.live_state import LiveStateStore, high_risk_rows, stored_probability
+from services.stream_aggregator import DashboardAggregator
+from services.zone_sketches import ZoneSketchStore
+from services.keyword_matcher import KeywordMatcher
+from services.language_detector import language_detector
+from services.dynamic_batcher import DynamicBatcher
+from services.translation_cache import TranslationCache
+from services.efir_numbers import EFIRNumberAllocator
+from services.conversation_store import ConversationStore
+from services.llm_client import LLMClient, httpx
+from services.face_index import FaceEncodingIndex
+from services.metrics import metrics
 
 # Computer Vision imports
 try:
@@ -49,9 +64,16 @@ except ImportError:
     cv2 = MockCV2()
     face_recognition = MockFaceRecognition()
 
-# Try to import transformers, but provide fallbacks for testing
+# Try to import transformers, but provide fallbacks for testing. Importing it (and torch)
+# takes seconds, so that happens on the first pipeline() call rather than with this module.
 try:
-    from transformers import pipeline
+    import importlib.util
+    if importlib.util.find_spec("transformers") is None:
+        raise ImportError("transformers")
+
+    def pipeline(task, model=None, **kwargs):
+        from transformers import pipeline as transformers_pipeline
+        return transformers_pipeline(task, model=model, **kwargs)
 except ImportError:
     # Mock pipeline for testing environments
     def pipeline(task, model=None):
@@ -60,76 +82,191 @@ except ImportError:
                 self.task = task
                 self.model = model
                 
-            def __call__(self, text):
+            def __call__(self, text, **kwargs):
+                texts = text if isinstance(text, list) else [text]
                 if self.task == "translation":
-                    return [{'translation_text': f"Translated: {text}"}]
+                    return [{'translation_text': f"Translated: {t}"} for t in texts]
                 elif self.task == "sentiment-analysis":
-                    return [{'label': 'POSITIVE', 'score': 0.9}]
+                    return [{'label': 'POSITIVE', 'score': 0.9} for t in texts]
         return MockPipeline(task, model)
 
+def _stage_timer(component, stage):
+  """Histogram timer for one pipeline stage (exported at /metrics)"""
+  return metrics.timer('stage_duration_seconds', component=component, stage=stage)
+
 class MultilingualEmergencyProcessor:
-  def __init__(self):
+  EMERGENCY_KEYWORDS = {
+    'english': ['help', 'emergency', 'danger', 'lost', 'accident', 'injured', 'panic'],
+    'hindi': ['मदद', 'आपातकाल', 'खतरा', 'खो गया', 'दुर्घटना', 'घायल'],
+    'bengali': ['সাহায্য', 'জরুরী', 'বিপদ', 'হারিয়ে গেছে', 'দুর্ঘটনা'],
+    'tamil': ['உதவி', 'அவசரம்', 'ஆபத்து', 'தொலைந்து போனேன்'],
+    'marathi': ['मदत', 'तातडीची', 'धोका', 'हरवलो'],
+    'gujarati': ['મદદ', 'તાતકાલિક', 'ખતરો', 'ખોવાઈ ગયો']
+  }
+  HIGH_URGENCY_WORDS = ['emergency', 'danger', 'help', 'injured', 'accident', 'panic']
+  MEDIUM_URGENCY_WORDS = ['lost', 'confused', 'stuck', 'problem']
+  # The same two tiers for the native keywords above, so urgency can be judged before translating
+  NATIVE_HIGH_URGENCY_WORDS = [
+    'मदद', 'आपातकाल', 'खतरा', 'दुर्घटना', 'घायल',
+    'সাহায্য', 'জরুরী', 'বিপদ', 'দুর্ঘটনা',
+    'உதவி', 'அவசரம்', 'ஆபத்து',
+    'मदत', 'तातडीची', 'धोका',
+    'મદદ', 'તાતકાલિક', 'ખતરો'
+  ]
+  NATIVE_MEDIUM_URGENCY_WORDS = ['खो गया', 'হারিয়ে গেছে', 'தொலைந்து போனேன்', 'हरवलो', 'ખોવાઈ ગયો']
+  INFO_KEYWORDS = {
+    'location_mentioned': ['at', 'near', 'location', 'place'],
+    'injury_mentioned': ['hurt', 'injured', 'pain', 'bleeding'],
+    'contact_requested': ['call', 'contact', 'phone', 'notify'],
+    'transport_needed': ['ambulance', 'hospital', 'transport', 'pickup']
+  }
+
+  def __init__(self, translation_cache=None):
     # Initialize translation pipeline
     self.translator = pipeline("translation", model="Helsinki-NLP/opus-mt-mul-en")
     self.sentiment_analyzer = pipeline("sentiment-analysis")
-    self.emergency_keywords = {
-      'english': ['help', 'emergency', 'danger', 'lost', 'accident', 'injured', 'panic'],
-      'hindi': ['मदद', 'आपातकाल', 'खतरा', 'खो गया', 'दुर्घटना', 'घायल'],
-      'bengali': ['সাহায্য', 'জরুরী', 'বিপদ', 'হারিয়ে গেছে', 'দুর্ঘটনা'],
-      'tamil': ['உதவி', 'அவசரம்', 'ஆபத்து', 'தொலைந்து போனேன்'],
-      'marathi': ['मदत', 'तातडीची', 'धोका', 'हरवलो'],
-      'gujarati': ['મદદ', 'તાતકાલિક', 'ખતરો', 'ખોવાઈ ગયો']
-    }
+    # Concurrent requests share padded batches instead of calling the pipeline one text at a time
+    self.translation_batcher = DynamicBatcher(
+      'translation', self._translate_batch, settings.NLP_BATCH_MAX_SIZE, settings.NLP_BATCH_MAX_WAIT_MS
+    )
+    # Repeated phrases are translated once (memory-only unless a persistent cache is passed in)
+    self.translation_cache = translation_cache if translation_cache is not None else TranslationCache()
+    self.emergency_keywords = self.EMERGENCY_KEYWORDS
+    self.keyword_matcher = self.build_keyword_matcher()
+
+  @classmethod
+  def build_keyword_matcher(cls):
+    """One compiled matcher over every keyword table, so a single scan answers all three questions"""
+    tables = {f'lang:{lang}': keywords for lang, keywords in cls.EMERGENCY_KEYWORDS.items()}
+    tables['high'] = cls.HIGH_URGENCY_WORDS + cls.NATIVE_HIGH_URGENCY_WORDS
+    tables['medium'] = cls.MEDIUM_URGENCY_WORDS + cls.NATIVE_MEDIUM_URGENCY_WORDS
+    tables.update({f'info:{flag}': keywords for flag, keywords in cls.INFO_KEYWORDS.items()})
+    return KeywordMatcher(tables)
+    
+  def process_emergency_text(self, text, language='auto', defer_translation=False):
+    """
+    Process emergency text in multiple languages.
+
+    Triage cascade: English text is scored on keywords directly. Other languages are
+    first scored on native keywords; with defer_translation a clear emergency is
+    decided there (translation_pending) and complete_translation() fills in the rest
+    later, so SOS latency never waits on the translation model. Everything else is
+    translated and rescored.
+    """
+    with _stage_timer('emergency_text', 'keyword_scan'):
+      hits = self.keyword_matcher.scan(text)
     
-  def process_emergency_text(self, text, language='auto'):
-    """Process emergency text in multiple languages"""
     # Detect language if not specified
     if language == 'auto':
-      language = self._detect_language(text)
+      language = self._detect_language(text, hits)
     
-    # Translate to English if needed
-    if language != 'english':
-      text = self._translate_to_english(text, language)
-    
-    # Check for emergency keywords
-    emergency_level = self._assess_emergency_level(text)
+    # Check for emergency keywords (native ones count before any translation)
+    emergency_level = self._assess_emergency_level(text, hits)
     
     # Extract key information
-    extracted_info = self._extract_emergency_info(text)
+    extracted_info = self._extract_emergency_info(text, hits)
+    
+    triage_stage = 'keywords'
+    translation_pending = False
+    if language != 'english':
+      if defer_translation and emergency_level >= 7:
+        triage_stage = 'native_keywords'
+        translation_pending = True
+      else:
+        # Ambiguous: translate to English and rescore on the translation
+        translated = self._translate_and_rescore(text, language, emergency_level, extracted_info)
+        text, emergency_level, extracted_info = translated
+        triage_stage = 'translation'
+    metrics.inc('emergency_triage_total', stage=triage_stage)
     
     return {
       'original_text': text,
       'language': language,
       'emergency_level': emergency_level,
       'extracted_info': extracted_info,
-      'requires_immediate_response': emergency_level >= 7
+      'requires_immediate_response': emergency_level >= 7,
+      'triage_stage': triage_stage,
+      'translation_pending': translation_pending
+    }
+
+  def prescore(self, texts):
+    """
+    (levels, languages) of a batch: each emergency level from one keyword scan (English
+    and native words, no translation), the languages from one vectorized script pass
+    """
+    with _stage_timer('emergency_text', 'prescore'):
+      hits = [self.keyword_matcher.scan(text) for text in texts]
+      levels = [self._assess_emergency_level(text, text_hits) for text, text_hits in zip(texts, hits)]
+      return levels, self.detect_languages(texts, hits)
+
+  def complete_translation(self, result):
+    """Deferred half of the cascade for a translation_pending result from process_emergency_text"""
+    text, emergency_level, extracted_info = self._translate_and_rescore(
+      result['original_text'], result['language'], result['emergency_level'], result['extracted_info']
+    )
+    return {
+      **result,
+      'translated_text': text,
+      'emergency_level': emergency_level,
+      'extracted_info': extracted_info,
+      'requires_immediate_response': emergency_level >= 7,
+      'triage_stage': 'translation',
+      'translation_pending': False
     }
+
+  def _translate_and_rescore(self, text, language, emergency_level, extracted_info):
+    """Translated text, with level and info flags combined from the native and translated scans"""
+    with _stage_timer('emergency_text', 'translate'):
+      translated = self._translate_to_english(text, language)
+    with _stage_timer('emergency_text', 'keyword_scan'):
+      hits = self.keyword_matcher.scan(translated)
+    translated_info = self._extract_emergency_info(translated, hits)
+    return (
+      translated,
+      max(emergency_level, self._assess_emergency_level(translated, hits)),
+      {flag: extracted_info[flag] or translated_info[flag] for flag in translated_info}
+    )
   
-  def _detect_language(self, text):
+  def _detect_language(self, text, hits=None):
     """Detect language of input text"""
-    # Simple keyword-based detection
-    for lang, keywords in self.emergency_keywords.items():
-      if any(keyword in text.lower() for keyword in keywords):
-        return lang
-    return 'english'
+    # The script histogram decides; keyword hits only settle languages sharing a script (Hindi/Marathi)
+    return self._settle_shared_script(language_detector.detect(text), text, hits)
+
+  def _settle_shared_script(self, language, text, hits=None):
+    siblings = language_detector.siblings(language)
+    if len(siblings) > 1:
+      hits = self.keyword_matcher.scan(text) if hits is None else hits
+      matched = [lang for lang in siblings if f'lang:{lang}' in hits]
+      if len(matched) == 1:
+        return matched[0]
+    return language
+
+  def detect_languages(self, texts, hits=None):
+    """_detect_language for a batch: one vectorized script pass, keyword hits only for shared scripts"""
+    languages = language_detector.detect_many(texts)
+    return [
+      self._settle_shared_script(language, text, hits[i] if hits is not None else None)
+      for i, (language, text) in enumerate(zip(languages, texts))
+    ]
   
   def _translate_to_english(self, text, source_lang):
     """Translate text to English"""
     try:
-      # Use translation API or local model
-      translated = self.translator(text)[0]['translation_text']
-      return translated
+      # Use translation API or local model, batched with concurrent requests
+      return self.translation_cache.get_or_translate(text, source_lang, self.translation_batcher)
     except:
       return text
+
+  def _translate_batch(self, texts):
+    outputs = self.translator(texts, batch_size=len(texts))
+    return [(o[0] if isinstance(o, list) else o)['translation_text'] for o in outputs]
+
   
-  def _assess_emergency_level(self, text):
+  def _assess_emergency_level(self, text, hits=None):
     """Assess emergency level (1-10 scale)"""
-    high_urgency_words = ['emergency', 'danger', 'help', 'injured', 'accident', 'panic']
-    medium_urgency_words = ['lost', 'confused', 'stuck', 'problem']
-    
-    text_lower = text.lower()
-    high_count = sum(1 for word in high_urgency_words if word in text_lower)
-    medium_count = sum(1 for word in medium_urgency_words if word in text_lower)
+    hits = self.keyword_matcher.scan(text) if hits is None else hits
+    high_count = len(hits.get('high', ()))
+    medium_count = len(hits.get('medium', ()))
     
     if high_count >= 2:
       return 9
@@ -140,30 +277,21 @@ class MultilingualEmergencyProcessor:
     else:
       return 3
 
-  def _extract_emergency_info(self, text):
+  def _extract_emergency_info(self, text, hits=None):
     """Extract key information from emergency text"""
-    info = {
-      'location_mentioned': False,
-      'injury_mentioned': False,
-      'contact_requested': False,
-      'transport_needed': False
-    }
-    
-    text_lower = text.lower()
-    
-    if any(word in text_lower for word in ['at', 'near', 'location', 'place']):
-      info['location_mentioned'] = True
-    if any(word in text_lower for word in ['hurt', 'injured', 'pain', 'bleeding']):
-      info['injury_mentioned'] = True
-    if any(word in text_lower for word in ['call', 'contact', 'phone', 'notify']):
-      info['contact_requested'] = True
-    if any(word in text_lower for word in ['ambulance', 'hospital', 'transport', 'pickup']):
-      info['transport_needed'] = True
-      
-    return info
+    hits = self.keyword_matcher.scan(text) if hits is None else hits
+    return {flag: f'info:{flag}' in hits for flag in self.INFO_KEYWORDS}
 
 class AutomatedEFIRGenerator:
-  def __init__(self):
+  def __init__(self, aggregator=None, numbers=None, store=None):
+    self.aggregator = aggregator
+    # Unique even for several e-FIRs in the same second, and across restarts: by default the
+    # counter lives in EFIR_COUNTER_DIR (see services/efir_numbers.py)
+    self.numbers = numbers if numbers is not None else EFIRNumberAllocator(
+      settings.EFIR_COUNTER_DIR, settings.EFIR_BLOCK_SIZE, settings.EFIR_NODE_ID
+    )
+    # Optional append-only log the e-FIRs are kept in (see services/efir_store.py)
+    self.store = store
     self.efir_template = {
       'complaint_number': '',
       'date_time': '',
@@ -181,7 +309,7 @@ class AutomatedEFIRGenerator:
     efir = self.efir_template.copy()
     
     # Generate unique complaint number
-    efir['complaint_number'] = f"EFIR{datetime.now().strftime('%Y%m%d%H%M%S')}"
+    efir['complaint_number'] = self.numbers.next_number()
     efir['date_time'] = datetime.now().isoformat()
     
     # Fill complainant details
@@ -210,6 +338,12 @@ class AutomatedEFIRGenerator:
       'nearby_landmarks': incident_data.get('nearby_landmarks', [])
     }
     
+    if self.aggregator is not None:
+      self.aggregator.record_efir(incident_data.get('tourist_id'), incident_data.get('response_time_seconds'))
+
+    if self.store is not None:
+      self.store.append(efir)
+    
     return efir
     
   def _generate_incident_description(self, incident_data):
@@ -226,11 +360,59 @@ class AutomatedEFIRGenerator:
     return description
 
 class RealTimeTourismAnalytics:
+  # Aggregator fields kept as history (see services/timeseries.py)
+  HISTORY_METRICS = ('active_tourists', 'high_risk_tourists', 'recent_alerts', 'recent_efirs', 'open_alerts', 'avg_response_time_seconds')
+
+  def __init__(self, live_state=None, active_window_seconds=settings.ACTIVE_TOURIST_WINDOW_SECONDS, aggregator=None, history=None):
+    self.live_state = live_state
+    self.active_window_seconds = active_window_seconds
+    self.aggregator = aggregator
+    self.history = history
+
+  def record_history(self, now=None):
+    """Sample the current dashboard numbers into the time-series store"""
+    if self.aggregator is None or self.history is None:
+      return
+    now = time.time() if now is None else now
+    snapshot = self.aggregator.snapshot(now)
+    self.history.record_many({name: snapshot[name] for name in self.HISTORY_METRICS}, now)
+
+  def get_history(self, metric, start, end, resolution=None, max_points=1000):
+    """Points of one dashboard metric between start and end (unix seconds)"""
+    if metric not in self.HISTORY_METRICS:
+      raise ValueError(f"Unknown metric {metric}; expected one of {list(self.HISTORY_METRICS)}")
+    if self.history is None:
+      return []
+    return self.history.query(metric, start, end, resolution, max_points)
+
   def get_dashboard_metrics(self):
+    if self.aggregator is not None:
+      # Constant-time read of the incrementally maintained windows
+      snapshot = self.aggregator.snapshot()
+      avg_seconds = snapshot['avg_response_time_seconds']
+      return {
+        'active_tourists': snapshot['active_tourists'],
+        'recent_alerts': snapshot['recent_alerts'],
+        'high_risk_tourists': snapshot['high_risk_tourists'],
+        'avg_response_time_minutes': None if avg_seconds is None else round(avg_seconds / 60, 1),
+        'response_time_percentiles_minutes': {
+          name: None if value is None else round(value / 60, 1)
+          for name, value in snapshot['response_time_percentiles_seconds'].items()
+        },
+        'recent_efirs': snapshot['recent_efirs'],
+        'open_alerts': snapshot['open_alerts'],
+        'system_status': 'operational',
+        'last_updated': datetime.now().isoformat(),
+      }
+    if self.live_state is not None:
+      active_tourists = self.live_state.count_active(self.active_window_seconds)
+      high_risk_tourists = self.live_state.count_high_risk(self.active_window_seconds)
+    else:
+      active_tourists, high_risk_tourists = 12, 2
     return {
-      'active_tourists': 12,
+      'active_tourists': active_tourists,
       'recent_alerts': 3,
-      'high_risk_tourists': 2,
+      'high_risk_tourists': high_risk_tourists,
       'avg_response_time_minutes': 5,
       'system_status': 'operational',
       'last_updated': datetime.now().isoformat(),
@@ -244,13 +426,19 @@ class TouristSafetyScoreModel:
     
   def prepare_features(self, tourist_data):
     """Prepare features for safety score prediction"""
-    features = []
-    
+    features = self._feature_row(tourist_data, datetime.now().hour)
+    return np.array(features).reshape(1, -1)
+
+  def prepare_features_batch(self, tourist_records):
+    """Prepare a (n, 7) feature matrix for many tourists at once"""
+    hour = datetime.now().hour
+    return np.array([self._feature_row(data, hour) for data in tourist_records], dtype=float).reshape(-1, 7)
+
+  def _feature_row(self, tourist_data, hour):
     # Location risk score (1-10)
     location_risk = tourist_data.get('location_risk', 5)
     
     # Time of day risk (higher at night)
-    hour = datetime.now().hour
     time_risk = 8 if hour < 6 or hour > 22 else 3
     
     # Group size (solo travelers are riskier)
@@ -265,10 +453,8 @@ class TouristSafetyScoreModel:
     planned = tourist_data.get('has_itinerary', False)
     planning_risk = 3 if planned else 7
     
-    features = [location_risk, time_risk, group_risk, exp_risk, planning_risk,
-               tourist_data.get('age', 30), tourist_data.get('health_score', 8)]
-    
-    return np.array(features).reshape(1, -1)
+    return [location_risk, time_risk, group_risk, exp_risk, planning_risk,
+            tourist_data.get('age', 30), tourist_data.get('health_score', 8)]
   
   def train_model(self, training_data):
     """Train the safety score model"""
@@ -292,36 +478,71 @@ class TouristSafetyScoreModel:
     joblib.dump(self.model, settings.SAFETY_MODEL_PATH)
     joblib.dump(self.scaler, settings.SAFETY_SCALER_PATH)
   
-  def predict_safety_score(self, tourist_data):
-    """Predict safety score for a tourist"""
+  def _ensure_loaded(self):
+    """Load the pre-trained model on first use; False if it is not available"""
     if not self.is_trained:
-      # Load pre-trained model
       try:
         self.model = joblib.load(settings.SAFETY_MODEL_PATH)
         self.scaler = joblib.load(settings.SAFETY_SCALER_PATH)
         self.is_trained = True
       except:
-        return 5  # Default score if model not available
+        return False
+    return True
+
+  def predict_safety_score(self, tourist_data):
+    """Predict safety score for a tourist"""
+    if not self._ensure_loaded():
+      return 5  # Default score if model not available
     
-    features = self.prepare_features(tourist_data)
-    features_scaled = self.scaler.transform(features)
-    score = self.model.predict(features_scaled)[0]
+    with _stage_timer('safety_model', 'feature_prep'):
+      features = self.prepare_features(tourist_data)
+      features_scaled = self.scaler.transform(features)
+    with _stage_timer('safety_model', 'inference'):
+      score = self.model.predict(features_scaled)[0]
     
     # Ensure score is between 1-10
     return max(1, min(10, int(score)))
 
+  def predict_safety_scores(self, tourist_records):
+    """Predict safety scores for many tourists with a single model call"""
+    if not tourist_records:
+      return []
+    if not self._ensure_loaded():
+      return [5] * len(tourist_records)
+    
+    with _stage_timer('safety_model', 'feature_prep'):
+      features_scaled = self.scaler.transform(self.prepare_features_batch(tourist_records))
+    with _stage_timer('safety_model', 'inference'):
+      scores = self.model.predict(features_scaled)
+    return [max(1, min(10, int(score))) for score in scores]
+
 class GeoFencingSystem:
-  def __init__(self):
+  def __init__(self, aggregator=None):
+    self.aggregator = aggregator
     self.risk_zones = {}
     self.safe_zones = {}
+    self.zone_sketches = ZoneSketchStore(
+      settings.ZONE_SKETCH_BUCKET_SECONDS,
+      settings.ZONE_SKETCH_RETENTION_SECONDS,
+      settings.ZONE_SKETCH_PRECISION,
+      settings.ZONE_SKETCH_DIR
+    )
+    self.version = 0  # Bumped on every zone change so cached lookups can be invalidated
     
   def add_risk_zone(self, zone_id, coordinates, risk_level):
     """Add a risk zone with coordinates and risk level"""
-    self.risk_zones[zone_id] = {
+    polygon = Polygon([(coord[1], coord[0]) for coord in coordinates])
+    shapely.prepare(polygon)
+    # Copy on write: lookups on pool threads keep iterating the dict they started with
+    risk_zones = dict(self.risk_zones)
+    risk_zones[zone_id] = {
       'coordinates': coordinates,  # List of [lat, lng] points
       'risk_level': risk_level,    # 1-10 scale
-      'active': True
+      'active': True,
+      'polygon': polygon           # Built once, (lng, lat) order
     }
+    self.risk_zones = risk_zones
+    self.version += 1
   
   def check_location_risk(self, lat, lng):
     """Check if location is in any risk zone"""
@@ -332,12 +553,45 @@ class GeoFencingSystem:
       if not zone_data['active']:
         continue
         
-      polygon = Polygon([(coord[1], coord[0]) for coord in zone_data['coordinates']])
-      if polygon.contains(point):
+      if zone_data['polygon'].contains(point):
         max_risk = max(max_risk, zone_data['risk_level'])
     
     return max_risk
+
+  def check_locations_risk(self, lats, lngs):
+    """Vectorized check_location_risk: one containment test per zone for all points"""
+    return self.classify_locations(lats, lngs)[0]
+
+  def classify_locations(self, lats, lngs):
+    """Return (max risk per point, id of the highest-risk zone containing it or None)"""
+    lats = np.asarray(lats, dtype=float)
+    lngs = np.asarray(lngs, dtype=float)
+    zone_risk = np.zeros(lats.shape, dtype=int)
+    zone_ids = [None] * len(lats)
+    
+    with _stage_timer('geofence', 'lookup'):
+      for zone_id, zone_data in self.risk_zones.items():
+        if not zone_data['active']:
+          continue
+          
+        inside = shapely.contains_xy(zone_data['polygon'], lngs, lats)
+        higher = inside & (zone_data['risk_level'] > zone_risk)
+        for i in np.flatnonzero(higher):
+          zone_ids[i] = zone_id
+        zone_risk[higher] = zone_data['risk_level']
+    
+    return np.maximum(zone_risk, 1), zone_ids
   
+  def record_presence(self, tourist_ids, zone_ids, now=None):
+    """Count tourists seen inside zones (zone id None = outside every zone)"""
+    inside = [(t, z) for t, z in zip(tourist_ids, zone_ids) if z is not None]
+    if inside:
+      self.zone_sketches.record([z for _, z in inside], [t for t, _ in inside], now)
+
+  def unique_tourists(self, zone_ids=None, windows=None):
+    """Approximate distinct tourists in zone_ids over a union of (start, end) windows"""
+    return self.zone_sketches.unique_tourists(zone_ids, windows)
+
   def generate_alert(self, tourist_id, lat, lng, risk_level):
     """Generate geo-fence alert"""
     alert_data = {
@@ -349,7 +603,11 @@ class GeoFencingSystem:
     }
     
     # Send to emergency contacts and police
-    self._send_emergency_alert(alert_data)
+    with _stage_timer('geofence', 'alert_dispatch'):
+      self._send_emergency_alert(alert_data)
+    metrics.inc('alerts_total', alert_type='geo_fence_breach')
+    if self.aggregator is not None:
+      self.aggregator.record_alert(tourist_id)
     
     return alert_data
   
@@ -397,19 +655,46 @@ class TouristFlowPredictor:
     features = np.array(features).reshape(1, -1)
     
     # Load or fit scaler if needed
+    if not self._ensure_loaded():
+      # Return default value if model not available
+      return 50
+    
+    features_scaled = self.scaler.transform(features)
+    
+    predicted_flow = self.model.predict(features_scaled)[0]
+    return max(0, int(predicted_flow))
+
+  def predict_tourist_flows(self, location_ids, timestamps):
+    """Predict tourist flow for many (location, time) pairs with a single model call"""
+    if not location_ids:
+      return []
+    
+    dt = pd.DatetimeIndex(pd.to_datetime(list(timestamps), format='mixed'))
+    with _stage_timer('flow_model', 'feature_prep'):
+      features = np.column_stack([
+        dt.hour, dt.day, dt.month, dt.weekday,
+        dt.isocalendar().week.to_numpy(), dt.dayofyear,
+        location_ids,
+        [self._get_weather_score(timestamp) for timestamp in timestamps],
+        [self._get_event_score(location_id, timestamp) for location_id, timestamp in zip(location_ids, timestamps)]
+      ]).astype(float)
+    
+    if not self._ensure_loaded():
+      return [50] * len(location_ids)
+    
+    with _stage_timer('flow_model', 'inference'):
+      predicted = self.model.predict(self.scaler.transform(features))
+    return [max(0, int(flow)) for flow in predicted]
+
+  def _ensure_loaded(self):
     if not self.is_trained:
       try:
         self.model = joblib.load(settings.FLOW_MODEL_PATH)
         self.scaler = joblib.load(settings.FLOW_SCALER_PATH)
         self.is_trained = True
       except:
-        # Return default value if model not available
-        return 50
-    
-    features_scaled = self.scaler.transform(features)
-    
-    predicted_flow = self.model.predict(features_scaled)[0]
-    return max(0, int(predicted_flow))
+        return False
+    return True
   
   def _get_weather_score(self, timestamp):
     """Get weather favorability score (1-10)"""
@@ -428,7 +713,34 @@ class IncidentPredictor:
     
   def predict_incident_probability(self, location_data, tourist_data, environmental_data):
     """Predict probability of incident occurring"""
-    features = [
+    features = self._feature_row(location_data, tourist_data, environmental_data)
+    
+    features = np.array(features).reshape(1, -1)
+    
+    # Load model if needed
+    if not self._ensure_loaded():
+      # Return default value if model not available
+      return 0.25
+    
+    incident_prob = self.model.predict_proba(features)[0][1]  # Probability of incident
+    
+    return incident_prob
+
+  def predict_incident_probabilities(self, cases):
+    """Batch predict_incident_probability over (location, tourist, environmental) triples"""
+    if not cases:
+      return []
+    if not self._ensure_loaded():
+      return [0.25] * len(cases)
+    
+    with _stage_timer('incident_model', 'feature_prep'):
+      features = np.array([self._feature_row(*case) for case in cases], dtype=float)
+    with _stage_timer('incident_model', 'inference'):
+      probabilities = self.model.predict_proba(features)[:, 1]
+    return [float(p) for p in probabilities]
+
+  def _feature_row(self, location_data, tourist_data, environmental_data):
+    return [
       location_data.get('risk_score', 5),
       location_data.get('tourist_density', 50),
       tourist_data.get('safety_score', 5),
@@ -437,106 +749,293 @@ class IncidentPredictor:
       environmental_data.get('time_of_day_risk', 5),
       environmental_data.get('visibility_score', 5)
     ]
-    
-    features = np.array(features).reshape(1, -1)
-    
-    # Load model if needed
+
+  def _ensure_loaded(self):
     if not self.is_trained:
       try:
         self.model = joblib.load(settings.INCIDENT_MODEL_PATH)
         self.is_trained = True
       except:
-        # Return default value if model not available
-        return 0.25
-    
-    incident_prob = self.model.predict_proba(features)[0][1]  # Probability of incident
-    
-    return incident_prob
+        return False
+    return True
 
 class SmartTouristSafetySystem:
+  # Ping fields the safety model reads (see TouristSafetyScoreModel.prepare_features)
+  SAFETY_PROFILE_FIELDS = ('location_risk', 'group_size', 'experience_level', 'has_itinerary', 'age', 'health_score')
+  DELTA_STAGES = ('safety', 'geofence', 'flow', 'incident')
+
   def __init__(self):
+    self.aggregator = DashboardAggregator(
+      settings.ACTIVE_TOURIST_WINDOW_SECONDS,
+      settings.DASHBOARD_ALERT_WINDOW_SECONDS,
+      settings.DASHBOARD_RESPONSE_WINDOW_SECONDS
+    )
     self.safety_model = TouristSafetyScoreModel()
-    self.geo_fencing = GeoFencingSystem()
+    self.geo_fencing = GeoFencingSystem(self.aggregator)
     self.flow_predictor = TouristFlowPredictor()
     self.incident_predictor = IncidentPredictor()
+    self.live_state = LiveStateStore(settings.LIVE_STATE_CAPACITY)
+    
+    # Delta-aware skipping: reuse a tourist's cached stage outputs while its inputs are unchanged
+    self.delta_skipping = settings.DELTA_SKIP_ENABLED
+    self.delta_distance_meters = settings.DELTA_DISTANCE_METERS
+    self.delta_time_bucket_seconds = settings.DELTA_TIME_BUCKET_SECONDS
+    self.delta_max_age_seconds = settings.DELTA_MAX_AGE_SECONDS
+    self._stage_counts = {stage: {'computed': 0, 'skipped': 0} for stage in self.DELTA_STAGES}
+    self._stage_lock = threading.Lock()
     
+  def warm_up(self):
+    """
+    Load model artifacts up front instead of on the first ping. A missing artifact is not
+    an error, since each model answers with defaults without it; see fallback_models().
+    """
+    for model in (self.safety_model, self.flow_predictor, self.incident_predictor):
+      model._ensure_loaded()
+
+  def fallback_models(self):
+    """Models whose artifact is not loaded, so their predictions are the built-in defaults"""
+    return [name for name, model in (('safety', self.safety_model), ('flow', self.flow_predictor),
+                                     ('incident', self.incident_predictor)) if not model.is_trained]
+
+  def get_delta_stats(self):
+    """Per-stage computed/skipped counts since startup"""
+    with self._stage_lock:
+      stats = {stage: dict(counts) for stage, counts in self._stage_counts.items()}
+    for counts in stats.values():
+      total = counts['computed'] + counts['skipped']
+      counts['skip_ratio'] = counts['skipped'] / total if total else 0.0
+    return stats
+
   async def process_tourist_data(self, tourist_id, data_update):
-    # Calculate safety score using the model
-    safety_score = self.safety_model.predict_safety_score(data_update)
-    
-    # Check location risk if coordinates are provided
-    alerts_generated = []
-    incident_probability = None
-    tourist_flow = None
-    
-    if 'latitude' in data_update and 'longitude' in data_update:
-      lat = data_update['latitude']
-      lng = data_update['longitude']
-      location_risk = self.geo_fencing.check_location_risk(lat, lng)
+    return self.process_tourist_batch([(tourist_id, data_update)])[0]
+
+  def process_tourist_batch(self, pings):
+    """Process a micro-batch of (tourist_id, data_update) pings.
+
+    Each stage runs once for the whole batch (one model call, one containment
+    test per zone); results are returned in input order and match what
+    process_tourist_data returns for each ping individually.
+
+    A stage is only recomputed for pings whose inputs changed since that
+    tourist's previous ping: profile fields for the safety score, movement
+    beyond delta_distance_meters (or new zones) for the geofence, location and
+    time bucket for the flow, and all of the above for the incident model.
+    Other pings reuse the outputs cached in live_state and list the stage under
+    'skipped_stages'. Geo-fence alerts are only raised when the geofence stage runs.
+    """
+    if not pings:
+      return []
+    tourist_ids = [tourist_id for tourist_id, _ in pings]
+    updates = [data_update for _, data_update in pings]
+    now = int(time.time())
+    skipped_stages = [[] for _ in pings]
+    
+    # Time of day risk (higher at night)
+    hour = datetime.now().hour
+    time_risk = 8 if hour < 6 or hour > 22 else 3
+    
+    metrics.inc('stage_items_total', len(pings), component='tourist_pipeline', stage='ping')
+    
+    # Cached outputs and the inputs they came from, one row per ping
+    with _stage_timer('tourist_pipeline', 'cache_lookup'):
+      cached = self.live_state.snapshot(tourist_ids)
+    if self.delta_skipping:
+      fresh = cached['computed_at'] >= now - self.delta_max_age_seconds
+    else:
+      fresh = np.zeros(len(pings), dtype=bool)
+    
+    # Calculate safety scores using the model
+    safety_keys = np.array([
+      self._input_key(time_risk, *(data_update.get(field) for field in self.SAFETY_PROFILE_FIELDS))
+      for data_update in updates
+    ], dtype=np.int64)
+    safety_stale = np.flatnonzero(~(fresh & (cached['safety_key'] == safety_keys)))
+    safety_scores = cached['safety_score'].astype(int).tolist()
+    for i, score in zip(safety_stale, self.safety_model.predict_safety_scores([updates[i] for i in safety_stale])):
+      safety_scores[i] = score
+    self._mark_skipped(skipped_stages, range(len(pings)), safety_stale, 'safety')
+    
+    alerts_generated = [[] for _ in pings]
+    incident_probabilities = [None] * len(pings)
+    tourist_flows = [None] * len(pings)
+    
+    # Check location risk for pings that carry coordinates
+    located = np.array([i for i, data_update in enumerate(updates) if 'latitude' in data_update and 'longitude' in data_update], dtype=int)
+    if len(located):
+      lats = np.array([updates[i]['latitude'] for i in located], dtype=float)
+      lngs = np.array([updates[i]['longitude'] for i in located], dtype=float)
+      moved = self._distance_meters(cached['geo_lat'][located], cached['geo_lng'][located], lats, lngs)
+      geo_stale = located[~(
+        fresh[located]
+        & (moved <= self.delta_distance_meters)
+        & (cached['geo_version'][located] == self.geo_fencing.version)
+      )]
+      location_risks = dict(zip(located.tolist(), cached['location_risk'][located].astype(int).tolist()))
+      geo_positions = np.searchsorted(located, geo_stale)
+      stale_risks, stale_zones = self.geo_fencing.classify_locations(lats[geo_positions], lngs[geo_positions])
+      location_risks.update(zip(geo_stale.tolist(), stale_risks.tolist()))
+      self._mark_skipped(skipped_stages, located, geo_stale, 'geofence')
       
       # Generate alert if risk is high (above 7)
-      if location_risk > 7:
-        alert = self.geo_fencing.generate_alert(tourist_id, lat, lng, location_risk)
-        alerts_generated.append(alert)
+      for i in geo_stale:
+        if location_risks[i] > 7:
+          alert = self.geo_fencing.generate_alert(pings[i][0], updates[i]['latitude'], updates[i]['longitude'], location_risks[i])
+          alerts_generated[i].append(alert)
       
       # Get tourist flow prediction if location_id is provided
-      if 'location_id' in data_update:
-        tourist_flow = self.flow_predictor.predict_tourist_flow(
-          data_update['location_id'],
-          data_update.get('timestamp', datetime.now().isoformat())
-        )
+      with_location_id = np.array([i for i in located if 'location_id' in updates[i]], dtype=int)
+      timestamps = {i: updates[i].get('timestamp', datetime.now().isoformat()) for i in with_location_id}
+      flow_keys = np.array([
+        self._input_key(updates[i]['location_id'], self._time_bucket(timestamps[i]))
+        for i in with_location_id
+      ], dtype=np.int64)
+      flow_stale = with_location_id[~(fresh[with_location_id] & (cached['flow_key'][with_location_id] == flow_keys))]
+      for i in with_location_id:
+        tourist_flows[i] = int(cached['tourist_flow'][i])
+      flows = self.flow_predictor.predict_tourist_flows(
+        [updates[i]['location_id'] for i in flow_stale],
+        [timestamps[i] for i in flow_stale]
+      )
+      for i, flow in zip(flow_stale, flows):
+        tourist_flows[i] = flow
+      self._mark_skipped(skipped_stages, with_location_id, flow_stale, 'flow')
       
       # Predict incident probability
-      if 'location_id' in data_update:
+      cases = {}
+      for i in with_location_id:
         location_data = {
-          'risk_score': location_risk,
-          'tourist_density': tourist_flow or 50
+          'risk_score': location_risks[i],
+          'tourist_density': tourist_flows[i] or 50
         }
         
         tourist_data = {
-          'safety_score': safety_score,
-          'experience_level_score': data_update.get('experience_level_score', 5)
+          'safety_score': safety_scores[i],
+          'experience_level_score': updates[i].get('experience_level_score', 5)
         }
         
-        # Time of day risk (higher at night)
-        hour = datetime.now().hour
-        time_risk = 8 if hour < 6 or hour > 22 else 3
-        
         environmental_data = {
-          'weather_score': data_update.get('weather_score', 5),
+          'weather_score': updates[i].get('weather_score', 5),
           'time_of_day_risk': time_risk,
-          'visibility_score': data_update.get('visibility_score', 7)
+          'visibility_score': updates[i].get('visibility_score', 7)
         }
-        
-        incident_probability = self.incident_predictor.predict_incident_probability(
-          location_data, tourist_data, environmental_data
+        cases[i] = (location_data, tourist_data, environmental_data)
+      
+      incident_keys = np.array([
+        self._input_key(*(tuple(part.values()) for part in cases[i])) for i in with_location_id
+      ], dtype=np.int64)
+      incident_stale = with_location_id[~(fresh[with_location_id] & (cached['incident_key'][with_location_id] == incident_keys))]
+      # Both paths go through the stored precision, so skipping the stage never changes the output
+      for i in with_location_id:
+        incident_probabilities[i] = stored_probability(cached['incident_probability'][i])
+      probabilities = self.incident_predictor.predict_incident_probabilities([cases[i] for i in incident_stale])
+      for i, probability in zip(incident_stale, probabilities):
+        incident_probabilities[i] = stored_probability(probability)
+      self._mark_skipped(skipped_stages, with_location_id, incident_stale, 'incident')
+    
+    # Remember the latest state of every tourist in this batch, plus the inputs behind it
+    with _stage_timer('tourist_pipeline', 'state_update'):
+      self.live_state.update(tourist_ids, safety_score=safety_scores, safety_key=safety_keys)
+      stale_rows = np.flatnonzero(~fresh)
+      self.live_state.update([tourist_ids[i] for i in stale_rows], computed_at=np.full(len(stale_rows), now))
+      if len(located):
+        # Pings without a location_id clear the flow/incident cache (key 0 never matches)
+        keyed = dict(zip(with_location_id.tolist(), zip(flow_keys.tolist(), incident_keys.tolist())))
+        self.live_state.update(
+          [tourist_ids[i] for i in located],
+          lat=lats,
+          lng=lngs,
+          location_risk=[location_risks[i] for i in located],
+          tourist_flow=[-1 if tourist_flows[i] is None else tourist_flows[i] for i in located],
+          incident_probability=[np.nan if incident_probabilities[i] is None else incident_probabilities[i] for i in located],
+          flow_key=[keyed.get(i, (0, 0))[0] for i in located],
+          incident_key=[keyed.get(i, (0, 0))[1] for i in located]
+        )
+        self.live_state.update(
+          [tourist_ids[i] for i in geo_stale],
+          zones=stale_zones,
+          geo_lat=lats[geo_positions],
+          geo_lng=lngs[geo_positions],
+          geo_version=np.full(len(geo_stale), self.geo_fencing.version)
         )
     
-    return {
-      'tourist_id': tourist_id,
-      'timestamp': datetime.now().isoformat(),
-      'safety_score': safety_score,
-      'alerts_generated': alerts_generated,
-      'tourist_flow': tourist_flow,
-      'incident_probability': incident_probability,
-      'recommendations': [],
-    }
+    # Feed the dashboard windows; high risk uses the same rule as the live-state queries
+    with _stage_timer('tourist_pipeline', 'aggregate'):
+      current = self.live_state.snapshot(tourist_ids)
+      self.aggregator.record_pings(tourist_ids, high_risk_rows(current), now)
+      # Every located ping counts towards its zone, including ones whose geofence stage was skipped
+      if len(located):
+        self.geo_fencing.record_presence(
+          [tourist_ids[i] for i in located], self.live_state.zone_names(current['zone'][located]), now
+        )
+    
+    timestamp = datetime.now().isoformat()
+    return [
+      {
+        'tourist_id': tourist_id,
+        'timestamp': timestamp,
+        'safety_score': safety_scores[i],
+        'alerts_generated': alerts_generated[i],
+        'tourist_flow': tourist_flows[i],
+        'incident_probability': incident_probabilities[i],
+        'recommendations': [],
+        'skipped_stages': skipped_stages[i],
+      }
+      for i, tourist_id in enumerate(tourist_ids)
+    ]
+
+  def _mark_skipped(self, skipped_stages, candidates, recomputed, stage):
+    recomputed = set(int(i) for i in recomputed)
+    skipped = [i for i in candidates if int(i) not in recomputed]
+    for i in skipped:
+      skipped_stages[i].append(stage)
+    with self._stage_lock:
+      self._stage_counts[stage]['computed'] += len(recomputed)
+      self._stage_counts[stage]['skipped'] += len(skipped)
+
+  @staticmethod
+  def _input_key(*values):
+    """Hash of a stage's inputs; stable within the process, which is all the cache needs"""
+    try:
+      return hash(values)
+    except TypeError:
+      return hash(repr(values))
+
+  def _time_bucket(self, timestamp):
+    """Wall-clock bucket index of a ping timestamp (naive local time, like the flow features)"""
+    try:
+      dt = datetime.fromisoformat(str(timestamp))
+    except ValueError:
+      dt = pd.to_datetime(timestamp).to_pydatetime()
+    seconds = (dt.replace(tzinfo=None) - datetime(1970, 1, 1)).total_seconds()
+    return int(seconds // self.delta_time_bucket_seconds)
+
+  @staticmethod
+  def _distance_meters(lat1, lng1, lat2, lng2):
+    """Equirectangular distance; accurate to well under a meter at geofence scales. NaN if no anchor"""
+    lat1, lng1 = np.radians(lat1), np.radians(lng1)
+    lat2, lng2 = np.radians(lat2), np.radians(lng2)
+    x = (lng2 - lng1) * np.cos((lat1 + lat2) / 2)
+    y = lat2 - lat1
+    return 6371000.0 * np.hypot(x, y)
 
 
 class TouristVerificationSystem:
     def __init__(self):
-        self.known_faces = {}  # Store known face encodings
+        # Known face encodings: one contiguous matrix, usable as a dict (see services/face_index.py)
+        self.known_faces = FaceEncodingIndex()
         self.confidence_threshold = 0.6
         
     def register_tourist_face(self, tourist_id, image_path):
         """Register tourist's face for verification"""
         try:
             # Load image and get face encoding
-            image = face_recognition.load_image_file(image_path)
-            face_encodings = face_recognition.face_encodings(image)
+            with _stage_timer('face_registration', 'image_load'):
+                image = face_recognition.load_image_file(image_path)
+            with _stage_timer('face_registration', 'inference'):
+                face_encodings = face_recognition.face_encodings(image)
             
             if face_encodings:
-                self.known_faces[tourist_id] = face_encodings[0]
+                self.known_faces.add(tourist_id, face_encodings[0])
                 return True
             return False
         except Exception as e:
@@ -550,23 +1049,39 @@ class TouristVerificationSystem:
                 return False
             
             # Get face encoding from current image
-            current_encoding = face_recognition.face_encodings(current_image)
+            with _stage_timer('face_verification', 'inference'):
+                current_encoding = face_recognition.face_encodings(current_image)
             
             if not current_encoding:
                 return False
             
-            # Compare with stored encoding
-            matches = face_recognition.compare_faces(
-                [self.known_faces[tourist_id]],
-                current_encoding[0],
-                tolerance=self.confidence_threshold
-            )
-            
-            return matches[0]
+            # Same test as face_recognition.compare_faces: distance within tolerance
+            distance = self.known_faces.distance(tourist_id, current_encoding[0])
+            return distance is not None and distance <= self.confidence_threshold
         except Exception as e:
             print(f"Face verification failed: {e}")
             return False
 
+    def identify_tourist(self, current_image, top_k=5):
+        """1:N lookup: the registered tourists whose faces are nearest to the face in the image"""
+        try:
+            with _stage_timer('face_identification', 'inference'):
+                current_encoding = face_recognition.face_encodings(current_image)
+            if not current_encoding:
+                return {'face_found': False, 'candidates': []}
+            with _stage_timer('face_identification', 'search'):
+                nearest = self.known_faces.identify(current_encoding[0], top_k)
+            return {
+                'face_found': True,
+                'candidates': [
+                    {'tourist_id': tourist_id, 'distance': distance, 'match': distance <= self.confidence_threshold}
+                    for tourist_id, distance in nearest
+                ],
+            }
+        except Exception as e:
+            print(f"Face identification failed: {e}")
+            return {'face_found': False, 'candidates': []}
+
 
 class CrowdAnalysisSystem:
     def __init__(self):
@@ -587,16 +1102,19 @@ class CrowdAnalysisSystem:
         try:
             # Load image
             if isinstance(image_path_or_array, str):
-                image = cv2.imread(image_path_or_array)
+                with _stage_timer('crowd_analysis', 'image_load'):
+                    image = cv2.imread(image_path_or_array)
             else:
                 image = image_path_or_array
                 
             height, width, channels = image.shape
             
             # Prepare image for YOLO
-            blob = cv2.dnn.blobFromImage(image, 0.00392, (416, 416), (0, 0, 0), True, crop=False)
-            self.net.setInput(blob)
-            outputs = self.net.forward(self.output_layers)
+            with _stage_timer('crowd_analysis', 'preprocess'):
+                blob = cv2.dnn.blobFromImage(image, 0.00392, (416, 416), (0, 0, 0), True, crop=False)
+            with _stage_timer('crowd_analysis', 'inference'):
+                self.net.setInput(blob)
+                outputs = self.net.forward(self.output_layers)
             
             # Count people
             person_count = 0
@@ -632,15 +1150,24 @@ class TouristAssistantChatbot:
   """Lightweight rule-based chatbot with optional OpenAI fallback via settings.OPENAI_API_KEY.
   In absence of keys, returns templated responses to avoid external dependencies.
   """
-  def __init__(self):
-    self.history_by_tourist = {}
-    try:
-      import openai  # type: ignore
-      self._openai = openai if settings.OPENAI_API_KEY else None
-      if self._openai:
-        self._openai.api_key = settings.OPENAI_API_KEY
-    except Exception:
-      self._openai = None
+  TEMPLATES = {
+    'emergency': "Emergency noted. We've alerted authorities and shared your last known details. Stay safe and share your location if possible.",
+    'location_info': "Nearby: popular attractions, safe routes, and transit options available. Tell me your exact location for precise tips.",
+    'booking': "I can guide bookings for hotels, attractions, transport, or local guides. What do you need?",
+    'safety': "General safety: stay in well-lit areas, keep valuables secure, and use verified transport.",
+    'general': "How can I help with your trip? I can assist with places, safety, and travel tips.",
+  }
+
+  def __init__(self, conversations=None, llm=None, faq=None):
+    # Bounded per-tourist history (see services/conversation_store.py)
+    self.conversations = conversations if conversations is not None else ConversationStore()
+    # Async, pooled, deadline-bound completions (see services/llm_client.py)
+    if llm is None and settings.OPENAI_API_KEY and httpx is not None:
+      llm = LLMClient(settings.OPENAI_API_KEY, settings.OPENAI_BASE_URL, settings.OPENAI_MODEL,
+                      settings.LLM_TIMEOUT_SECONDS, settings.LLM_MAX_CONCURRENCY)
+    self.llm = llm
+    # Local answers for common questions (see services/faq_index.py)
+    self.faq = faq
 
   def _classify(self, message: str) -> str:
     text = message.lower()
@@ -654,41 +1181,92 @@ class TouristAssistantChatbot:
       return 'safety'
     return 'general'
 
-  def process_query(self, tourist_id: str, message: str, language: str = 'en') -> dict:
-    query_type = self._classify(message)
-    history = self.history_by_tourist.get(tourist_id, [])
-
-    # Fallback responses by type
-    if query_type == 'emergency':
-      response = "Emergency noted. We've alerted authorities and shared your last known details. Stay safe and share your location if possible."
-    elif query_type == 'location_info':
-      response = "Nearby: popular attractions, safe routes, and transit options available. Tell me your exact location for precise tips."
-    elif query_type == 'booking':
-      response = "I can guide bookings for hotels, attractions, transport, or local guides. What do you need?"
-    elif query_type == 'safety':
-      response = "General safety: stay in well-lit areas, keep valuables secure, and use verified transport."
-    else:
-      response = "How can I help with your trip? I can assist with places, safety, and travel tips."
+  def _llm_messages(self, message: str, language: str):
+    prompt = f"Tourist asked: {message}\nLanguage: {language}. Provide concise, practical help."
+    return [{"role": "user", "content": prompt}]
 
-    # If OpenAI is configured, enhance the response
-    if self._openai:
-      try:
-        prompt = f"Tourist asked: {message}\nLanguage: {language}. Provide concise, practical help."
-        completion = self._openai.chat.completions.create(
-          model="gpt-3.5-turbo",
-          messages=[{"role": "user", "content": prompt}],
-          max_tokens=200,
-          temperature=0.7,
-        )
-        response = completion.choices[0].message.content or response
-      except Exception:
-        pass
+  def _result(self, tourist_id, message, language, query_type, response, source):
+    self.conversations.append(tourist_id, message, response)
+    return self._response(language, query_type, response, source)
 
-    history.append({"user": message, "bot": response})
-    self.history_by_tourist[tourist_id] = history[-10:]
+  async def _aresult(self, tourist_id, message, language, query_type, response, source):
+    # Redis-backed history is written off the event loop
+    await self.conversations.aappend(tourist_id, message, response)
+    return self._response(language, query_type, response, source)
+
+  @staticmethod
+  def _response(language, query_type, response, source):
     return {
       "response": response,
       "query_type": query_type,
       "language": language,
       "requires_human_intervention": query_type == 'emergency',
+      "source": source,
+    }
+
+  def _faq_answer(self, message: str, query_type: str):
+    # Emergencies always get the emergency template (and human intervention)
+    if self.faq is None or query_type == 'emergency':
+      return None
+    entry = self.faq.match(message)
+    return entry['answer'] if entry is not None else None
+
+  def process_query(self, tourist_id: str, message: str, language: str = 'en') -> dict:
+    """FAQ or templated answer only; never waits on the network (see aprocess_query)"""
+    query_type = self._classify(message)
+    answer = self._faq_answer(message, query_type)
+    if answer is not None:
+      return self._result(tourist_id, message, language, query_type, answer, 'faq')
+    return self._result(tourist_id, message, language, query_type, self.TEMPLATES[query_type], 'template')
+
+  async def aprocess_query(self, tourist_id: str, message: str, language: str = 'en') -> dict:
+    """
+    FAQ answer when the question matches one; otherwise the answer enhanced by the
+    LLM when configured, falling back to the template on timeout or error
+    """
+    query_type = self._classify(message)
+    answer = self._faq_answer(message, query_type)
+    if answer is not None:
+      return await self._aresult(tourist_id, message, language, query_type, answer, 'faq')
+    response, source = self.TEMPLATES[query_type], 'template'
+    if self.llm is not None:
+      completion = await self.llm.complete(self._llm_messages(message, language))
+      if completion:
+        response, source = completion, 'llm'
+    return await self._aresult(tourist_id, message, language, query_type, response, source)
+
+  async def astream_query(self, tourist_id: str, message: str, language: str = 'en'):
+    """
+    (event, data) pairs for a streamed answer: 'template' with the templated answer
+    at once, then a 'token' per LLM text delta as it arrives, then 'done' with the
+    final result. The final text goes into the history when the stream ends, even if
+    the client disconnects; source is 'llm_partial' if the model was cut off. An FAQ
+    match is sent as the 'template' event and the model is not called.
+    """
+    query_type = self._classify(message)
+    answer = self._faq_answer(message, query_type)
+    template = answer if answer is not None else self.TEMPLATES[query_type]
+    yield 'template', {
+      "response": template,
+      "query_type": query_type,
+      "language": language,
+      "requires_human_intervention": query_type == 'emergency',
     }
+    parts, source, recorded = [], 'faq' if answer is not None else 'template', False
+    try:
+      if self.llm is not None and answer is None:
+        stream = self.llm.stream(self._llm_messages(message, language))
+        try:
+          async for token in stream:
+            parts.append(token)
+            yield 'token', token
+          source = 'llm' if parts else 'template'
+        except Exception:
+          source = 'llm_partial' if parts else 'template'
+        finally:
+          await stream.aclose()
+      recorded = True
+      yield 'done', await self._aresult(tourist_id, message, language, query_type, "".join(parts) or template, source)
+    finally:
+      if not recorded:
+        await self.conversations.aappend(tourist_id, message, "".join(parts) or template)
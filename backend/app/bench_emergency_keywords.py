@@ -0,0 +1,103 @@
+import argparse
+import random
+import time
+
+from ai_models import MultilingualEmergencyProcessor
+from services.language_detector import language_detector
+
+# Fragments mixed into synthetic SMS messages; roughly the spread seen on the SMS gateway
+FRAGMENTS = [
+    "Help! I'm injured near the waterfall",
+    "Lost my way back to the hotel, please call me",
+    "The view from the fort is beautiful",
+    "मदद करो! मैं पहाड़ी पर खो गया हूँ",
+    "সাহায্য করুন, আমি হারিয়ে গেছি",
+    "உதவி! நான் காட்டில் தொலைந்து போனேன்",
+    "मदत करा, मी हरवलो आहे",
+    "મદદ કરો, હું ખોવાઈ ગયો છું",
+    "Need an ambulance at the main gate, bleeding badly",
+    "Stuck in traffic, no problem, will reach the hotel by evening",
+    "Accident on the highway near km 42, send transport",
+    "Enjoying the boat ride with family",
+]
+
+
+def build_corpus(size, seed=7):
+    """Synthetic multilingual SMS corpus of size messages, 1-3 fragments each"""
+    rng = random.Random(seed)
+    return [" ".join(rng.sample(FRAGMENTS, rng.randint(1, 3))) for _ in range(size)]
+
+
+def legacy_scan(text):
+    """The per-table substring checks the processor used before the compiled matcher, over the same tables"""
+    P = MultilingualEmergencyProcessor
+    language = 'english'
+    for lang, keywords in P.EMERGENCY_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            language = lang
+            break
+    text_lower = text.lower()
+    high_count = sum(1 for word in P.HIGH_URGENCY_WORDS + P.NATIVE_HIGH_URGENCY_WORDS if word in text_lower)
+    medium_count = sum(1 for word in P.MEDIUM_URGENCY_WORDS + P.NATIVE_MEDIUM_URGENCY_WORDS if word in text_lower)
+    info = {
+        flag: any(word in text_lower for word in words)
+        for flag, words in P.INFO_KEYWORDS.items()
+    }
+    return language, high_count, medium_count, info
+
+
+def matcher_scan(matcher, text):
+    hits = matcher.scan(text)
+    language = next(
+        (lang for lang in MultilingualEmergencyProcessor.EMERGENCY_KEYWORDS if f'lang:{lang}' in hits),
+        'english'
+    )
+    info = {flag: f'info:{flag}' in hits for flag in MultilingualEmergencyProcessor.INFO_KEYWORDS}
+    return language, len(hits.get('high', ())), len(hits.get('medium', ())), info
+
+
+def run_benchmark(messages, repeats):
+    corpus = build_corpus(messages)
+    matcher = MultilingualEmergencyProcessor.build_keyword_matcher()
+    print(f"===== EMERGENCY KEYWORD MATCHING: {messages} messages x {repeats} =====\n")
+
+    for name, scan in (("substring scans", legacy_scan), ("compiled matcher", lambda text: matcher_scan(matcher, text))):
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            for text in corpus:
+                scan(text)
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:20s} {messages / best:12,.0f} messages/s  ({best * 1000:.1f} ms)")
+
+    # Keywords must start a word in the matcher ("at" not inside "that"), so report where the two disagree
+    differing = sum(1 for text in corpus if legacy_scan(text) != matcher_scan(matcher, text))
+    print(f"\nMessages classified differently (substring vs word-start matches): {differing}")
+
+
+def run_language_benchmark(messages, repeats):
+    corpus = build_corpus(messages)
+    print(f"\n===== LANGUAGE DETECTION: {messages} messages x {repeats} =====\n")
+    megabytes = sum(len(text) for text in corpus) * 4 / 1e6  # as UTF-32 code points
+
+    runs = (
+        ("keyword hits", lambda: [legacy_scan(text)[0] for text in corpus]),
+        ("script, per message", lambda: [language_detector.detect(text) for text in corpus]),
+        ("script, batched", lambda: language_detector.detect_many(corpus)),
+    )
+    for name, run in runs:
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - started)
+        print(f"{name:20s} {messages / best:12,.0f} messages/s  ({megabytes / best:7.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark emergency keyword matching and language detection on a synthetic SMS corpus")
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.messages, args.repeats)
+    run_language_benchmark(args.messages, args.repeats)
@@ -46,4 +46,106 @@ class Settings(BaseModel):
   SUPABASE_URL: str = os.getenv("SUPABASE_URL", "")
   SUPABASE_KEY: str = os.getenv("SUPABASE_KEY", "")
 
+  # Streaming ingestion
+  INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+  # Live tourist state
+  LIVE_STATE_CAPACITY: int = int(os.getenv("LIVE_STATE_CAPACITY", "100000"))
+  ACTIVE_TOURIST_WINDOW_SECONDS: int = int(os.getenv("ACTIVE_TOURIST_WINDOW_SECONDS", "1800"))
+
+  # Dashboard sliding windows (see services/stream_aggregator.py)
+  DASHBOARD_ALERT_WINDOW_SECONDS: int = int(os.getenv("DASHBOARD_ALERT_WINDOW_SECONDS", "3600"))
+  DASHBOARD_RESPONSE_WINDOW_SECONDS: int = int(os.getenv("DASHBOARD_RESPONSE_WINDOW_SECONDS", "86400"))
+
+  # Distinct tourists per zone (HyperLogLog sketches per zone and time bucket);
+  # ZONE_SKETCH_DIR works like METRICS_DIR for merging workers
+  ZONE_SKETCH_PRECISION: int = int(os.getenv("ZONE_SKETCH_PRECISION", "11"))
+  ZONE_SKETCH_BUCKET_SECONDS: int = int(os.getenv("ZONE_SKETCH_BUCKET_SECONDS", "900"))
+  ZONE_SKETCH_RETENTION_SECONDS: int = int(os.getenv("ZONE_SKETCH_RETENTION_SECONDS", "86400"))
+  ZONE_SKETCH_DIR: str = os.getenv("ZONE_SKETCH_DIR", "")
+
+  # Dashboard metric history (memory-mapped ring buffers at 1s / 1m / 1h). Only the
+  # worker holding the writer lock samples, so with several workers the history
+  # reflects that worker's dashboard counters, not the whole deployment
+  TIMESERIES_DIR: str = os.getenv("TIMESERIES_DIR", "./data/timeseries")
+  TIMESERIES_SAMPLE_SECONDS: float = float(os.getenv("TIMESERIES_SAMPLE_SECONDS", "1"))
+
+  # Dashboard WebSocket push (fanned out over REDIS_URL pub/sub when set)
+  DASHBOARD_REDIS_CHANNEL: str = os.getenv("DASHBOARD_REDIS_CHANNEL", "dashboard_broadcast")
+  DASHBOARD_WS_QUEUE_SIZE: int = int(os.getenv("DASHBOARD_WS_QUEUE_SIZE", "256"))
+  DASHBOARD_PUSH_INTERVAL_SECONDS: float = float(os.getenv("DASHBOARD_PUSH_INTERVAL_SECONDS", "1"))
+
+  # Delta-aware skipping in SmartTouristSafetySystem
+  DELTA_SKIP_ENABLED: bool = os.getenv("DELTA_SKIP_ENABLED", "true").lower() in ("1", "true", "yes")
+  DELTA_DISTANCE_METERS: float = float(os.getenv("DELTA_DISTANCE_METERS", "25"))
+  DELTA_TIME_BUCKET_SECONDS: int = int(os.getenv("DELTA_TIME_BUCKET_SECONDS", "3600"))
+  DELTA_MAX_AGE_SECONDS: int = int(os.getenv("DELTA_MAX_AGE_SECONDS", "900"))
+
+  # Emergency text triage: decide clear native-language SOS messages from keywords
+  # and translate them in the background instead of before answering
+  EMERGENCY_DEFER_TRANSLATION: bool = os.getenv("EMERGENCY_DEFER_TRANSLATION", "true").lower() in ("1", "true", "yes")
+
+  # e-FIR numbers: workers on one host reserve blocks from a counter file in
+  # EFIR_COUNTER_DIR; give each host sharing the number space its own EFIR_NODE_ID
+  EFIR_COUNTER_DIR: str = os.getenv("EFIR_COUNTER_DIR", "./data/efir")
+  EFIR_BLOCK_SIZE: int = int(os.getenv("EFIR_BLOCK_SIZE", "1000"))
+  EFIR_NODE_ID: str = os.getenv("EFIR_NODE_ID", "")
+  # e-FIR log: append-only segment files, fsynced in groups every EFIR_COMMIT_INTERVAL_MS
+  EFIR_STORE_DIR: str = os.getenv("EFIR_STORE_DIR", "./data/efir_log")
+  EFIR_SEGMENT_BYTES: int = int(os.getenv("EFIR_SEGMENT_BYTES", str(64 * 1024 * 1024)))
+  EFIR_COMMIT_INTERVAL_MS: float = float(os.getenv("EFIR_COMMIT_INTERVAL_MS", "5"))
+
+  # Bulk SMS triage queue (pre-scored, most urgent first)
+  SMS_QUEUE_MAX_SIZE: int = int(os.getenv("SMS_QUEUE_MAX_SIZE", "100000"))
+  SMS_QUEUE_WORKERS: int = int(os.getenv("SMS_QUEUE_WORKERS", "4"))
+
+  # Inference thread pools (per model family)
+  INFERENCE_TABULAR_WORKERS: int = int(os.getenv("INFERENCE_TABULAR_WORKERS", "4"))
+  INFERENCE_VISION_WORKERS: int = int(os.getenv("INFERENCE_VISION_WORKERS", "2"))
+  INFERENCE_ASR_WORKERS: int = int(os.getenv("INFERENCE_ASR_WORKERS", "1"))
+  # NLP requests mostly wait on the translation batcher below, so this
+  # should be at least NLP_BATCH_MAX_SIZE for batches to fill up
+  INFERENCE_NLP_WORKERS: int = int(os.getenv("INFERENCE_NLP_WORKERS", "16"))
+
+  # Dynamic batching of the translation pipeline: a batch runs when it holds
+  # NLP_BATCH_MAX_SIZE texts or NLP_BATCH_MAX_WAIT_MS after its first text
+  NLP_BATCH_MAX_SIZE: int = int(os.getenv("NLP_BATCH_MAX_SIZE", "16"))
+  NLP_BATCH_MAX_WAIT_MS: float = float(os.getenv("NLP_BATCH_MAX_WAIT_MS", "10"))
+
+  # Translation cache: in-memory LRU over a sqlite file shared by all workers
+  # (empty path = memory only)
+  TRANSLATION_CACHE_PATH: str = os.getenv("TRANSLATION_CACHE_PATH", "./data/translation_cache.sqlite3")
+  TRANSLATION_CACHE_SIZE: int = int(os.getenv("TRANSLATION_CACHE_SIZE", "10000"))
+  TRANSLATION_CACHE_DISK_SIZE: int = int(os.getenv("TRANSLATION_CACHE_DISK_SIZE", "200000"))
+
+  # Chatbot LLM calls: an OpenAI-compatible endpoint, at most LLM_MAX_CONCURRENCY at
+  # once, each answered from the template if it takes longer than LLM_TIMEOUT_SECONDS
+  OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+  OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
+  LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "8"))
+  LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+  # Chatbot FAQ answers: TF-IDF index over FAQ_SOURCE_PATH, built once into
+  # FAQ_INDEX_DIR and memory-mapped; queries at least FAQ_MIN_SIMILARITY similar
+  # to an entry, and FAQ_MIN_MARGIN more similar than to any other entry, are
+  # answered from it without calling the LLM
+  FAQ_SOURCE_PATH: str = os.getenv("FAQ_SOURCE_PATH", "./models/chatbot_faq.json")
+  FAQ_INDEX_DIR: str = os.getenv("FAQ_INDEX_DIR", "./data/faq_index")
+  FAQ_MIN_SIMILARITY: float = float(os.getenv("FAQ_MIN_SIMILARITY", "0.45"))
+  FAQ_MIN_MARGIN: float = float(os.getenv("FAQ_MIN_MARGIN", "0.1"))
+
+  # Chatbot history: last CHAT_HISTORY_TURNS turns per tourist, expired after
+  # CHAT_IDLE_TTL_SECONDS idle and LRU-evicted beyond the conversation/byte caps;
+  # CHAT_HISTORY_REDIS keeps it in REDIS_URL instead (shared, survives restarts)
+  CHAT_HISTORY_TURNS: int = int(os.getenv("CHAT_HISTORY_TURNS", "10"))
+  CHAT_MAX_CONVERSATIONS: int = int(os.getenv("CHAT_MAX_CONVERSATIONS", "50000"))
+  CHAT_IDLE_TTL_SECONDS: int = int(os.getenv("CHAT_IDLE_TTL_SECONDS", "3600"))
+  CHAT_HISTORY_MAX_BYTES: int = int(os.getenv("CHAT_HISTORY_MAX_BYTES", str(64 * 1024 * 1024)))
+  CHAT_HISTORY_REDIS: bool = os.getenv("CHAT_HISTORY_REDIS", "false").lower() in ("1", "true", "yes")
+
+  # Metrics; with several workers, point METRICS_DIR at a directory shared by them
+  # (and emptied on deploy) so /metrics on any worker reports all of them
+  METRICS_DIR: str = os.getenv("METRICS_DIR", "")
+  METRICS_FLUSH_SECONDS: float = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
 settings = Settings()
@@ -1,17 +1,39 @@
-from fastapi import FastAPI, WebSocket, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, File, UploadFile, Form, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.requests import ClientDisconnect
 from app.api.endpoints import translation
 from pydantic import BaseModel
 from typing import Any, Dict, List, Optional
 from datetime import datetime
+import asyncio
+import json
 import os
 import shutil
+import time
+import uuid
 import numpy as np
-from .ai_models import SmartTouristSafetySystem, AutomatedEFIRGenerator, RealTimeTourismAnalytics, TouristSafetyScoreModel, GeoFencingSystem, TouristFlowPredictor, IncidentPredictor, MultilingualEmergencyProcessor, TouristVerificationSystem, CrowdAnalysisSystem, TouristAssistantChatbot
+from .ai_models import SmartTouristSafetySystem, AutomatedEFIRGenerator, RealTimeTourismAnalytics, MultilingualEmergencyProcessor, TouristVerificationSystem, CrowdAnalysisSystem, TouristAssistantChatbot
 from .services.supabase_client import get_supabase
 from .services.blockchain import anchor_id_hash
 from web3 import Web3
 from app.services.asr_service import asr_service
+from app.services.inference_pool import inference_pools
+from app.services.ping_ingest import iter_ndjson_batches
+from config import settings
+from services.metrics import metrics
+from services.dashboard_push import dashboard_hub
+from services.timeseries import TimeSeriesStore
+from services.translation_cache import TranslationCache
+from services.sms_queue import SMSPriorityQueue
+from services.service_registry import ServiceRegistry
+from services.efir_numbers import EFIRNumberAllocator
+from services.efir_store import EFIRStore
+from services.efir_search import EFIRSearchIndex
+from services.conversation_store import ConversationStore
+from services.faq_index import FAQIndex
+from services.efir_export import EXPORT_FORMATS, EFIRFilter, iter_csv, iter_efirs, iter_ndjson
 
 app = FastAPI(title="Smart Tourist Safety API")
 
@@ -32,16 +54,65 @@ app.add_middleware(
 )
 
 safety_system = SmartTouristSafetySystem()
-analytics = RealTimeTourismAnalytics()
-efirs = AutomatedEFIRGenerator()
-safety_score_model = TouristSafetyScoreModel()
-geo_fencing = GeoFencingSystem()
-flow_predictor = TouristFlowPredictor()
-incident_predictor = IncidentPredictor()
-emergency_processor = MultilingualEmergencyProcessor()
+# One instance of each model: the endpoints share the ones inside the safety system
+# (so risk zones added through the API also apply to processed pings)
+safety_score_model = safety_system.safety_model
+geo_fencing = safety_system.geo_fencing
+flow_predictor = safety_system.flow_predictor
+incident_predictor = safety_system.incident_predictor
 face_verification = TouristVerificationSystem()
-crowd_analysis = CrowdAnalysisSystem()
-chatbot = TouristAssistantChatbot()
+try:
+  faq_index = FAQIndex.open(settings.FAQ_SOURCE_PATH, settings.FAQ_INDEX_DIR, settings.FAQ_MIN_SIMILARITY,
+                            settings.FAQ_MIN_MARGIN)
+except (OSError, ValueError) as e:
+  print(f"Chatbot FAQ index unavailable, answering from templates and the LLM only: {e}")
+  faq_index = None
+chatbot = TouristAssistantChatbot(ConversationStore(
+  settings.CHAT_HISTORY_TURNS, settings.CHAT_MAX_CONVERSATIONS, settings.CHAT_IDLE_TTL_SECONDS,
+  settings.CHAT_HISTORY_MAX_BYTES, settings.REDIS_URL if settings.CHAT_HISTORY_REDIS else ""
+), faq=faq_index)
+
+def _build_analytics():
+  # Opens (and may take the writer lock on) the time-series files
+  return RealTimeTourismAnalytics(
+    safety_system.live_state,
+    aggregator=safety_system.aggregator,
+    history=TimeSeriesStore(settings.TIMESERIES_DIR)
+  )
+
+def _build_efirs():
+  # Opening the store replays its segments, and the allocator reserves a block of numbers
+  return AutomatedEFIRGenerator(
+    safety_system.aggregator,
+    EFIRNumberAllocator(settings.EFIR_COUNTER_DIR, settings.EFIR_BLOCK_SIZE, settings.EFIR_NODE_ID),
+    EFIRStore(settings.EFIR_STORE_DIR, settings.EFIR_SEGMENT_BYTES, settings.EFIR_COMMIT_INTERVAL_MS)
+  )
+
+def _build_efir_search():
+  # Full-text index over the stored e-FIRs: replays the log, then the store keeps it current
+  index = EFIRSearchIndex()
+  registry.get("efirs").store.subscribe(index.add)
+  return index
+
+def _warm_safety_system():
+  safety_system.warm_up()
+  return safety_system
+
+# Heavy components, and the stores that open files, are built by the background warm-up
+# (or on first use), never at import; /ready reports when all of them are loaded, and
+# which run on fallbacks
+registry = ServiceRegistry()
+registry.register("analytics", _build_analytics)
+registry.register("efirs", _build_efirs)
+registry.register("translation_cache", lambda: TranslationCache(
+  settings.TRANSLATION_CACHE_PATH, settings.TRANSLATION_CACHE_SIZE, settings.TRANSLATION_CACHE_DISK_SIZE
+))
+registry.register("emergency_processor", lambda: MultilingualEmergencyProcessor(registry.get("translation_cache")))
+registry.register("safety_models", _warm_safety_system, fallbacks=lambda system: system.fallback_models())
+registry.register("crowd_analysis", CrowdAnalysisSystem)
+registry.register("efir_search", _build_efir_search)
+
+sms_queue = SMSPriorityQueue(settings.SMS_QUEUE_MAX_SIZE)
 
 class TouristUpdate(BaseModel):
   profile_data: Dict[str, Any] | None = None
@@ -67,6 +138,10 @@ class LocationCheckRequest(BaseModel):
   latitude: float
   longitude: float
 
+class UniqueTouristsQuery(BaseModel):
+  zone_ids: Optional[List[str]] = None  # all zones if omitted
+  windows: List[List[float]]  # [[start, end], ...] unix seconds; counted as a union
+
 class FaceRegistrationRequest(BaseModel):
   tourist_id: str
   image_path: str
@@ -100,32 +175,373 @@ class ASRTranscribeRequest(BaseModel):
   language_id: Optional[str] = None
   decoder: str = 'ctc'
 
+def _inference_pool_gauge(field):
+  def collect():
+    for name, stats in inference_pools.stats().items():
+      yield {"pool": name}, stats[field]
+  return collect
+
+metrics.register_gauge("inference_pool_queued", _inference_pool_gauge("queued"))
+metrics.register_gauge("inference_pool_running", _inference_pool_gauge("running"))
+metrics.register_gauge("live_state_tourists", lambda: [({}, len(safety_system.live_state))])
+metrics.register_gauge("sms_queue_depth", lambda: [
+  ({"priority": name}, stats["queued"]) for name, stats in sms_queue.stats()["by_priority"].items()
+])
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+  start = time.perf_counter()
+  response = await call_next(request)
+  # Label by route template (/api/tourist/{tourist_id}/state), not the raw path
+  path = getattr(request.scope.get("route"), "path", "unmatched")
+  metrics.observe("http_request_duration_seconds", time.perf_counter() - start, method=request.method, path=path)
+  metrics.inc("http_requests_total", method=request.method, path=path, status=response.status_code)
+  return response
+
+@app.on_event("startup")
+async def preload_models():
+  # Build the stores and load the models on a background thread before traffic arrives
+  registry.warm_up()
+  metrics.start_flusher(settings.METRICS_FLUSH_SECONDS)
+  safety_system.geo_fencing.zone_sketches.start_flusher(settings.METRICS_FLUSH_SECONDS)
+
+@app.on_event("startup")
+async def start_dashboard_push():
+  dashboard_hub.start(asyncio.get_running_loop())
+  analytics = await registry.aget("analytics")
+  asyncio.create_task(dashboard_hub.push_metrics(analytics.get_dashboard_metrics, settings.DASHBOARD_PUSH_INTERVAL_SECONDS))
+
+@app.on_event("startup")
+async def start_history_sampler():
+  # Only the worker holding the time-series writer lock samples; the others read its files
+  analytics = await registry.aget("analytics")
+  if not analytics.history.writable:
+    return
+
+  async def sample():
+    while True:
+      await asyncio.sleep(settings.TIMESERIES_SAMPLE_SECONDS)
+      analytics.record_history()
+
+  asyncio.create_task(sample())
+
+@app.on_event("startup")
+async def start_sms_workers():
+  async def work():
+    while True:
+      item = await asyncio.to_thread(sms_queue.pop, 1.0)
+      if item is None:
+        continue
+      _, (sms, language), _ = item
+      try:
+        await handle_sms(sms.from_number, sms.message, sms.location_data, language)
+      except Exception as e:
+        print(f"Queued SMS from {sms.from_number} failed: {e}")
+
+  for _ in range(settings.SMS_QUEUE_WORKERS):
+    asyncio.create_task(work())
+
+@app.on_event("shutdown")
+async def flush_efir_store():
+  # Make the last group of e-FIRs durable without waiting for the committer
+  efirs = registry.peek("efirs")
+  if efirs is not None:
+    efirs.store.flush()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+  if chatbot.llm is not None:
+    await chatbot.llm.aclose()
+
+def publish_ping_results(results):
+  """Push alerts to every dashboard and changed safety scores to the tourist's own clients"""
+  for result in results:
+    tourist_id = result['tourist_id']
+    for alert in result['alerts_generated']:
+      dashboard_hub.publish({"type": "alert", "data": alert}, tourist_id)
+    if result['alerts_generated'] or 'safety' not in result['skipped_stages']:
+      dashboard_hub.publish({
+        "type": "tourist_update",
+        "data": {
+          "tourist_id": tourist_id,
+          "safety_score": result['safety_score'],
+          "alerts_count": len(result['alerts_generated']),
+          "timestamp": result['timestamp'],
+        },
+      }, tourist_id, broadcast=False)
+
+def publish_efir(efir):
+  dashboard_hub.publish({
+    "type": "efir",
+    "data": {
+      "efir_number": efir.get('complaint_number'),
+      "tourist_id": efir['complainant_details'].get('tourist_id'),
+      "incident_type": efir['incident_details'].get('type'),
+      "severity": efir['incident_details'].get('severity'),
+      "date_time": efir.get('date_time'),
+    },
+  })
+
+# Background translations of natively triaged emergency messages (kept so they are not garbage-collected)
+_translation_tasks = set()
+
+def schedule_translation(result, efir_number=None, from_number=None):
+  """Translate a translation_pending analysis after the verdict and push the refined one to dashboards"""
+  async def complete():
+    emergency_processor = await registry.aget("emergency_processor")
+    updated = await inference_pools.run("nlp", emergency_processor.complete_translation, result)
+    dashboard_hub.publish({
+      "type": "emergency_translation",
+      "data": {
+        "efir_number": efir_number,
+        "from_number": from_number,
+        "language": updated['language'],
+        "translated_text": updated['translated_text'],
+        "emergency_level": updated['emergency_level'],
+        "extracted_info": updated['extracted_info'],
+      },
+    })
+
+  task = asyncio.create_task(complete())
+  _translation_tasks.add(task)
+  task.add_done_callback(_translation_tasks.discard)
+
 @app.get("/health")
 async def health():
   return {"status": "ok"}
 
+@app.get("/ready")
+async def ready():
+  """
+  Readiness (unlike /health, liveness): 503 until the background warm-up has loaded every model.
+  A model whose artifact is missing answers with defaults; that is ready but "degraded".
+  """
+  status = "degraded" if registry.degraded() else "ready"
+  body = {"status": status if registry.ready() else "loading", "services": registry.status()}
+  return JSONResponse(body, status_code=200 if registry.ready() else 503)
+
+@app.get("/metrics")
+async def get_prometheus_metrics():
+  return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/system/translation-cache")
+async def get_translation_cache_stats():
+  translation_cache = await registry.aget("translation_cache")
+  return {"status": "ok", "cache": await asyncio.to_thread(translation_cache.stats)}
+
+@app.get("/api/system/chatbot-faq")
+async def get_chatbot_faq_stats():
+  return {"status": "ok", "faq": faq_index.stats() if faq_index is not None else None}
+
+@app.get("/api/system/inference-pools")
+async def get_inference_pools():
+  emergency_processor = registry.peek("emergency_processor")
+  return {
+    "status": "ok",
+    "pools": inference_pools.stats(),
+    "batchers": {
+      "translation": emergency_processor.translation_batcher.stats(),
+    } if emergency_processor is not None else {},
+    "llm": chatbot.llm.stats() if chatbot.llm is not None else None,
+  }
+
 @app.post("/api/tourist/{tourist_id}/process")
 async def process_update(tourist_id: str, payload: TouristUpdate):
-  result = await safety_system.process_tourist_data(tourist_id, payload.model_dump(exclude_none=True))
+  pings = [(tourist_id, payload.model_dump(exclude_none=True))]
+  (result,) = await inference_pools.run("tabular", safety_system.process_tourist_batch, pings)
+  publish_ping_results([result])
   return result
 
+class PingResultStream(StreamingResponse):
+  """
+  StreamingResponse whose generator also reads the request body. Starlette's version
+  listens for disconnects on the same ASGI receive channel (before ASGI spec 2.4), which
+  would swallow body chunks; here a disconnect surfaces as ClientDisconnect from
+  request.stream() instead, and the generator handles it.
+  """
+  async def __call__(self, scope, receive, send):
+    try:
+      await self.stream_response(send)
+    except OSError:
+      raise ClientDisconnect()
+
+async def _process_ping_batch(batch):
+  """NDJSON lines for one micro-batch in input order; a failed model call becomes per-line errors"""
+  pings = [parsed for _, parsed in batch if not isinstance(parsed, Exception)]
+  try:
+    processed = await inference_pools.run("tabular", safety_system.process_tourist_batch, pings)
+    publish_ping_results(processed)
+    failure = None
+  except Exception as e:
+    processed, failure = [], f"processing failed: {e}"
+  processed = iter(processed)
+  lines = []
+  for line_number, parsed in batch:
+    if isinstance(parsed, Exception):
+      item = {"line": line_number, "error": str(parsed)}
+    elif failure is not None:
+      item = {"line": line_number, "error": failure}
+    else:
+      item = next(processed)
+    lines.append(json.dumps(jsonable_encoder(item)))
+  return "\n".join(lines) + "\n"
+
+@app.post("/api/tourist/ingest")
+async def ingest_pings(request: Request):
+  """
+  Bulk ping ingestion. The body is NDJSON, one ping per line:
+  {"tourist_id": "...", "latitude": ..., "longitude": ..., "location_id": ..., ...}
+  Pings are processed in micro-batches as the body arrives and results stream back as
+  NDJSON in input order, so only one batch is held in memory. A malformed line, or a
+  line whose batch failed in the models, yields {"line": n, "error": "..."} in its place.
+  """
+  async def results():
+    try:
+      async for batch in iter_ndjson_batches(request.stream(), settings.INGEST_BATCH_SIZE):
+        yield await _process_ping_batch(batch)
+    except ClientDisconnect:
+      # The client went away mid-upload; nobody is left to read the rest
+      return
+  return PingResultStream(results(), media_type="application/x-ndjson")
+
+@app.get("/api/tourist/{tourist_id}/state")
+async def get_tourist_state(tourist_id: str):
+  state = safety_system.live_state.get(tourist_id)
+  if state is None:
+    raise HTTPException(status_code=404, detail=f"No pings recorded for tourist {tourist_id}")
+  return {"status": "ok", "state": state}
+
+@app.get("/api/live-state/summary")
+async def get_live_state_summary():
+  live_state = safety_system.live_state
+  window = (await registry.aget("analytics")).active_window_seconds
+  return {
+    "status": "ok",
+    "tracked_tourists": len(live_state),
+    "active_tourists": live_state.count_active(window),
+    "high_risk_tourists": live_state.count_high_risk(window),
+    "active_by_zone": live_state.zone_counts(window),
+    "memory_bytes": live_state.memory_bytes(),
+  }
+
+@app.get("/api/pipeline/delta-stats")
+async def get_delta_stats():
+  return {"status": "ok", "stages": safety_system.get_delta_stats()}
+
 @app.get("/api/dashboard/metrics")
 async def get_metrics():
+  analytics = await registry.aget("analytics")
   return analytics.get_dashboard_metrics()
 
+@app.get("/api/dashboard/history")
+async def get_dashboard_history(metric: str, start: Optional[float] = None, end: Optional[float] = None,
+                                resolution: Optional[int] = None, max_points: int = 1000):
+  """
+  History of one dashboard metric. resolution is 1, 60 or 3600 seconds; by default
+  the finest one that covers the range in at most max_points points.
+  """
+  end = end if end is not None else time.time()
+  start = start if start is not None else end - 3600
+  if start > end:
+    raise HTTPException(status_code=422, detail="start must not be after end")
+  analytics = await registry.aget("analytics")
+  try:
+    points = analytics.get_history(metric, start, end, resolution, max_points)
+  except ValueError as e:
+    raise HTTPException(status_code=422, detail=str(e))
+  return {"status": "ok", "metric": metric, "points": points}
+
 @app.post("/api/efir/create")
 async def create_efir(body: EFIRPayload):
+  efirs = await registry.aget("efirs")
   efir = efirs.generate_efir(body.incident_data)
+  publish_efir(efir)
   return {"status": "ok", "efir_number": efir.get("complaint_number")}
 
+@app.get("/api/efir")
+async def list_efirs(start: Optional[float] = None, end: Optional[float] = None, tourist_id: Optional[str] = None,
+                     limit: int = 100, offset: int = 0):
+  """
+  Stored e-FIRs filed between start and end (unix seconds, default the last 24
+  hours), oldest first; or a tourist's e-FIRs, newest first.
+  """
+  if limit < 1 or limit > 1000 or offset < 0:
+    raise HTTPException(status_code=422, detail="limit must be 1-1000 and offset non-negative")
+  efirs = await registry.aget("efirs")
+  if tourist_id is not None:
+    return {"status": "ok", "efirs": await asyncio.to_thread(efirs.store.by_tourist, tourist_id, limit)}
+  end = end if end is not None else time.time()
+  start = start if start is not None else end - 86400
+  if start > end:
+    raise HTTPException(status_code=422, detail="start must not be after end")
+  # Lookups may tail other workers' segments, which is file I/O: keep it off the event loop
+  return {
+    "status": "ok",
+    "total": await asyncio.to_thread(efirs.store.count, start, end),
+    "efirs": await asyncio.to_thread(efirs.store.range, start, end, limit, offset),
+  }
+
+@app.get("/api/efir/export")
+async def export_efirs(format: str = "csv", start: Optional[float] = None, end: Optional[float] = None,
+                       type: Optional[str] = None, severity: Optional[str] = None, area: Optional[str] = None):
+  """
+  Every stored e-FIR matching the filters, streamed as CSV or NDJSON. type and
+  severity take comma-separated values, area matches part of the incident area,
+  start/end are unix seconds. The log is read segment by segment on a worker
+  thread, so memory stays flat and other requests are not held up.
+  """
+  if format not in EXPORT_FORMATS:
+    raise HTTPException(status_code=422, detail=f"format must be one of {', '.join(EXPORT_FORMATS)}")
+  if start is not None and end is not None and start > end:
+    raise HTTPException(status_code=422, detail="start must not be after end")
+  efirs = await registry.aget("efirs")
+  matching = iter_efirs(efirs.store.scan(), EFIRFilter(type, severity, area, start, end))
+  if format == "csv":
+    body, media_type = iter_csv(matching), "text/csv"
+  else:
+    body, media_type = iter_ndjson(matching), "application/x-ndjson"
+  filename = f"efirs-{time.strftime('%Y%m%d-%H%M%S')}.{format}"
+  # A plain generator: Starlette iterates it in the threadpool, off the event loop
+  return StreamingResponse(body, media_type=media_type,
+                           headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+@app.get("/api/efir/search")
+async def search_efirs(q: str, limit: int = 10, type: Optional[str] = None, severity: Optional[str] = None,
+                       area: Optional[str] = None, start: Optional[float] = None, end: Optional[float] = None):
+  """
+  e-FIRs ranked by how well their description, circumstances, area and landmarks
+  match q (BM25). type and severity take comma-separated values, area matches part
+  of the incident area, start/end are unix seconds.
+  """
+  if limit < 1 or limit > 100:
+    raise HTTPException(status_code=422, detail="limit must be 1-100")
+  efirs = await registry.aget("efirs")
+  efir_search = await registry.aget("efir_search")
+  await asyncio.to_thread(efirs.store.refresh)
+  hits = efir_search.search(q, limit, types=type.split(",") if type else None,
+                            severities=severity.split(",") if severity else None, area=area, start=start, end=end)
+  found = await asyncio.to_thread(lambda: [efirs.store.get(number) for number, _ in hits])
+  return {
+    "status": "ok",
+    "results": [{"score": round(score, 4), "efir": efir} for (_, score), efir in zip(hits, found)],
+  }
+
+@app.get("/api/efir/{number}")
+async def get_efir(number: str):
+  efirs = await registry.aget("efirs")
+  efir = await asyncio.to_thread(efirs.store.get, number)
+  if efir is None:
+    raise HTTPException(status_code=404, detail="e-FIR not found")
+  return {"status": "ok", "efir": efir}
+
 @app.post("/api/safety/score")
 async def get_safety_score(request: SafetyScoreRequest):
-  score = safety_score_model.predict_safety_score(request.tourist_data)
+  score = await inference_pools.run("tabular", safety_score_model.predict_safety_score, request.tourist_data)
   return {"status": "ok", "safety_score": score}
 
 @app.post("/api/safety/train")
 async def train_safety_model(request: TrainingDataRequest):
-  safety_score_model.train_model(request.training_data)
+  await inference_pools.run("tabular", safety_score_model.train_model, request.training_data)
   return {"status": "ok", "message": "Model trained successfully"}
 
 @app.post("/api/geo/risk-zone")
@@ -138,18 +554,40 @@ async def check_location(request: LocationCheckRequest):
   risk_level = geo_fencing.check_location_risk(request.latitude, request.longitude)
   return {"status": "ok", "risk_level": risk_level}
 
+@app.get("/api/geo/unique-tourists")
+async def get_unique_tourists(window_seconds: int = 3600):
+  """Approximate distinct tourists per zone over the last window_seconds (HyperLogLog, ~2% error)"""
+  sketches = safety_system.geo_fencing.zone_sketches
+  now = time.time()
+  return {
+    "status": "ok",
+    "window_seconds": window_seconds,
+    "zones": sketches.zone_counts(window_seconds, now),
+    "all_zones": sketches.unique_tourists(windows=[(now - window_seconds, now)], now=now),
+  }
+
+@app.post("/api/geo/unique-tourists")
+async def query_unique_tourists(query: UniqueTouristsQuery):
+  if any(len(window) != 2 for window in query.windows):
+    raise HTTPException(status_code=422, detail="Each window must be [start, end]")
+  if any(start > end for start, end in query.windows):
+    raise HTTPException(status_code=422, detail="Window start must not be after its end")
+  count = safety_system.geo_fencing.unique_tourists(query.zone_ids, [tuple(w) for w in query.windows])
+  return {"status": "ok", "unique_tourists": count}
+
 @app.post("/api/geo/alert/{tourist_id}")
 async def generate_geo_alert(tourist_id: str, request: LocationCheckRequest):
   risk_level = geo_fencing.check_location_risk(request.latitude, request.longitude)
   if risk_level > 5:  # Only generate alert if risk level is significant
     alert = geo_fencing.generate_alert(tourist_id, request.latitude, request.longitude, risk_level)
+    dashboard_hub.publish({"type": "alert", "data": alert}, tourist_id)
     return {"status": "ok", "alert": alert}
   return {"status": "ok", "message": "No alert generated, risk level too low"}
 
 @app.post("/api/predict/tourist-flow")
 async def predict_tourist_flow(request: FlowPredictionRequest):
   timestamp = request.timestamp or datetime.now().isoformat()
-  predicted_flow = flow_predictor.predict_tourist_flow(request.location_id, timestamp)
+  predicted_flow = await inference_pools.run("tabular", flow_predictor.predict_tourist_flow, request.location_id, timestamp)
   return {
     "status": "ok", 
     "location_id": request.location_id,
@@ -159,7 +597,9 @@ async def predict_tourist_flow(request: FlowPredictionRequest):
 
 @app.post("/api/predict/incident-probability")
 async def predict_incident(request: IncidentPredictionRequest):
-  probability = incident_predictor.predict_incident_probability(
+  probability = await inference_pools.run(
+    "tabular",
+    incident_predictor.predict_incident_probability,
     request.location_data,
     request.tourist_data,
     request.environmental_data
@@ -172,7 +612,11 @@ async def predict_incident(request: IncidentPredictionRequest):
 
 @app.post("/api/emergency/process-text")
 async def process_emergency_text(request: EmergencyTextRequest):
-  result = emergency_processor.process_emergency_text(request.text, request.language)
+  emergency_processor = await registry.aget("emergency_processor")
+  result = await inference_pools.run(
+    "nlp", emergency_processor.process_emergency_text, request.text, request.language,
+    defer_translation=settings.EMERGENCY_DEFER_TRANSLATION
+  )
   
   # If immediate response is required, generate an EFIR
   if result.get('requires_immediate_response', False):
@@ -182,12 +626,17 @@ async def process_emergency_text(request: EmergencyTextRequest):
       'circumstances': f"Emergency text received: {request.text}",
       'extracted_info': result['extracted_info']
     }
+    efirs = await registry.aget("efirs")
     efir = efirs.generate_efir(incident_data)
+    publish_efir(efir)
     result['efir_generated'] = True
     result['efir_number'] = efir.get('complaint_number')
   else:
     result['efir_generated'] = False
   
+  if result['translation_pending']:
+    schedule_translation(result, efir_number=result.get('efir_number'))
+  
   return {
     "status": "ok",
     "emergency_analysis": result
@@ -200,28 +649,51 @@ class ChatbotRequest(BaseModel):
 
 @app.post("/api/chatbot/query")
 async def chatbot_query(req: ChatbotRequest):
-  result = chatbot.process_query(req.tourist_id, req.message, req.language)
+  result = await chatbot.aprocess_query(req.tourist_id, req.message, req.language)
   return {"status": "ok", "result": result}
 
+@app.get("/api/chatbot/stream")
+async def chatbot_stream(tourist_id: str, message: str, language: str = 'en'):
+  """
+  Server-sent events (GET, so browsers can use EventSource): `template` with the
+  templated answer immediately, `token` per LLM text delta, then `done` with the
+  final result. Each data field is JSON.
+  """
+  async def events():
+    async for event, data in chatbot.astream_query(tourist_id, message, language):
+      yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+  return StreamingResponse(events(), media_type="text/event-stream",
+                           headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/api/chatbot/history/{tourist_id}")
+async def chatbot_history(tourist_id: str):
+  return {"status": "ok", "history": await chatbot.conversations.aget(tourist_id), "store": chatbot.conversations.stats()}
+
 class SMSMessageRequest(BaseModel):
   from_number: str
   message: str
   timestamp: str = None
   location_data: Dict[str, Any] = None
 
-@app.post("/api/emergency/sms")
-async def process_emergency_sms(request: SMSMessageRequest):
+async def handle_sms(from_number, message, location_data=None, language='auto'):
+  """Full triage of one SMS: analysis, e-FIR for emergencies, deferred translation"""
   # Process the SMS text using the multilingual processor
-  result = emergency_processor.process_emergency_text(request.message)
+  emergency_processor = await registry.aget("emergency_processor")
+  result = await inference_pools.run(
+    "nlp", emergency_processor.process_emergency_text, message, language,
+    defer_translation=settings.EMERGENCY_DEFER_TRANSLATION
+  )
   
   # Prepare response data
   response_data = {
     "status": "ok",
-    "from_number": request.from_number,
+    "from_number": from_number,
     "emergency_level": result['emergency_level'],
     "language_detected": result['language'],
     "requires_immediate_response": result['requires_immediate_response'],
-    "extracted_info": result['extracted_info']
+    "extracted_info": result['extracted_info'],
+    "triage_stage": result['triage_stage'],
+    "translation_pending": result['translation_pending']
   }
   
   # If high emergency level, generate EFIR and trigger alerts
@@ -230,29 +702,65 @@ async def process_emergency_sms(request: SMSMessageRequest):
     incident_data = {
       'incident_type': 'SMS_EMERGENCY',
       'severity': 'HIGH' if result['emergency_level'] >= 8 else 'MEDIUM',
-      'circumstances': f"Emergency SMS received: {request.message}",
-      'contact_number': request.from_number,
+      'circumstances': f"Emergency SMS received: {message}",
+      'contact_number': from_number,
       'last_activity': 'Unknown',
       'extracted_info': result['extracted_info']
     }
     
     # Add location data if available
-    if request.location_data:
-      incident_data['last_location'] = request.location_data
+    if location_data:
+      incident_data['last_location'] = location_data
     
     # Generate EFIR
+    efirs = await registry.aget("efirs")
     efir = efirs.generate_efir(incident_data)
+    publish_efir(efir)
     response_data['efir_generated'] = True
     response_data['efir_number'] = efir.get('complaint_number')
     
     # In a real implementation, we would trigger emergency alerts here
     # For example, sending notifications to emergency services
-    # safety_system.trigger_emergency_alert(efir.get('complaint_number'), request.from_number)
+    # safety_system.trigger_emergency_alert(efir.get('complaint_number'), from_number)
   else:
     response_data['efir_generated'] = False
   
+  if result['translation_pending']:
+    schedule_translation(result, efir_number=response_data.get('efir_number'), from_number=from_number)
+  
   return response_data
 
+@app.post("/api/emergency/sms")
+async def process_emergency_sms(request: SMSMessageRequest):
+  return await handle_sms(request.from_number, request.message, request.location_data)
+
+class BulkSMSRequest(BaseModel):
+  messages: List[SMSMessageRequest]
+
+@app.post("/api/emergency/sms/bulk")
+async def enqueue_emergency_sms(request: BulkSMSRequest):
+  """
+  Accept a burst of SMS from the gateway: pre-score every message on keywords, detect
+  the languages of the whole burst in one pass, and queue each message by urgency. Queue workers fully process (and raise e-FIRs for) the most
+  urgent messages first; results arrive as dashboard events, not in this response.
+  """
+  emergency_processor = await registry.aget("emergency_processor")
+  levels, languages = await inference_pools.run(
+    "nlp", emergency_processor.prescore, [m.message for m in request.messages]
+  )
+  # Workers reuse the detected language instead of detecting it again per message
+  by_priority = sms_queue.push_many(list(zip(request.messages, languages)), levels)
+  return {
+    "status": "queued",
+    "received": len(request.messages),
+    "by_priority": by_priority,
+    "queued": len(sms_queue)
+  }
+
+@app.get("/api/emergency/sms/queue")
+async def get_sms_queue_stats():
+  return {"status": "ok", **sms_queue.stats()}
+
 # -----------------------
 # Users + Blockchain
 # -----------------------
@@ -313,8 +821,9 @@ def save_upload_file(upload_file: UploadFile, destination: str):
     os.makedirs(os.path.dirname(destination), exist_ok=True)
     
     # Save the file
-    with open(destination, "wb") as buffer:
-      shutil.copyfileobj(upload_file.file, buffer)
+    with metrics.timer("stage_duration_seconds", component="upload", stage="file_io"):
+      with open(destination, "wb") as buffer:
+        shutil.copyfileobj(upload_file.file, buffer)
     
     return True
   except Exception as e:
@@ -333,7 +842,7 @@ async def register_tourist_face(tourist_id: str = Form(...), image: UploadFile =
     raise HTTPException(status_code=500, detail="Failed to save image")
   
   # Register the face
-  result = face_verification.register_tourist_face(tourist_id, image_path)
+  result = await inference_pools.run("vision", face_verification.register_tourist_face, tourist_id, image_path)
   
   if not result:
     # If registration failed, delete the saved image
@@ -368,7 +877,7 @@ async def verify_tourist_face(tourist_id: str = Form(...), image: UploadFile = F
       current_image = np.ones((300, 300, 3), dtype=np.uint8) * 255
     
     # Verify the face
-    result = face_verification.verify_tourist(tourist_id, current_image)
+    result = await inference_pools.run("vision", face_verification.verify_tourist, tourist_id, current_image)
     
     # Clean up the temporary file
     if os.path.exists(temp_path):
@@ -394,6 +903,39 @@ async def verify_tourist_face(tourist_id: str = Form(...), image: UploadFile = F
       os.remove(temp_path)
     raise HTTPException(status_code=500, detail=f"Verification process failed: {str(e)}")
 
+@app.post("/api/tourist/identify-face")
+async def identify_tourist_face(image: UploadFile = File(...), top_k: int = Form(5)):
+  """Who is this? The registered tourists whose faces are nearest to the uploaded one"""
+  if top_k < 1 or top_k > 100:
+    raise HTTPException(status_code=422, detail="top_k must be 1-100")
+  temp_dir = "temp_images"
+  os.makedirs(temp_dir, exist_ok=True)
+
+  temp_path = os.path.join(temp_dir, f"identify_{uuid.uuid4().hex}_{os.path.basename(image.filename or 'image')}")
+  if not save_upload_file(image, temp_path):
+    raise HTTPException(status_code=500, detail="Failed to save image")
+
+  try:
+    try:
+      import face_recognition
+      current_image = face_recognition.load_image_file(temp_path)
+    except ImportError:
+      # Use mock data if face_recognition is not available
+      current_image = np.ones((300, 300, 3), dtype=np.uint8) * 255
+    result = await inference_pools.run("vision", face_verification.identify_tourist, current_image, top_k)
+  finally:
+    if os.path.exists(temp_path):
+      os.remove(temp_path)
+
+  if not result['face_found']:
+    raise HTTPException(status_code=400, detail="No face detected in the image.")
+  return {
+    "status": "success",
+    "identified": any(c['match'] for c in result['candidates']),
+    "candidates": result['candidates'],
+    "registered_faces": len(face_verification.known_faces),
+  }
+
 @app.post("/api/crowd/analyze")
 async def analyze_crowd(image: UploadFile = File(...), location_id: str = Form(None), timestamp: str = Form(None)):
   # Save the uploaded image temporarily
@@ -406,7 +948,8 @@ async def analyze_crowd(image: UploadFile = File(...), location_id: str = Form(N
   
   try:
     # Analyze the crowd density
-    result = crowd_analysis.analyze_crowd_density(temp_path)
+    crowd_analysis = await registry.aget("crowd_analysis")
+    result = await inference_pools.run("vision", crowd_analysis.analyze_crowd_density, temp_path)
     
     # Clean up the temporary file
     if os.path.exists(temp_path):
@@ -438,7 +981,7 @@ async def analyze_crowd(image: UploadFile = File(...), location_id: str = Form(N
 # ASR Endpoints (AI4Bharat IndicConformer via NeMo if available)
 @app.post("/api/asr/load-model")
 async def asr_load_model(req: ASRLoadModelRequest):
-  ok = asr_service.load_checkpoint(req.checkpoint_path)
+  ok = await inference_pools.run("asr", asr_service.load_checkpoint, req.checkpoint_path)
   if not ok:
     return {"status": "failed", "message": "ASR model not loaded. Ensure NeMo and checkpoint are available."}
   return {"status": "ok", "message": "ASR model loaded."}
@@ -452,7 +995,7 @@ async def asr_transcribe(language_id: str = Form(None), decoder: str = Form('ctc
   if not save_upload_file(audio, temp_path):
     raise HTTPException(status_code=500, detail="Failed to save audio")
   try:
-    text = asr_service.transcribe(temp_path, language_id=language_id, decoder=decoder)
+    text = await inference_pools.run("asr", asr_service.transcribe, temp_path, language_id=language_id, decoder=decoder)
     return {"status": "ok", "text": text, "engine": "nemo" if asr_service.available else "fallback"}
   finally:
     try:
@@ -461,21 +1004,31 @@ async def asr_transcribe(language_id: str = Form(None), decoder: str = Form('ctc
     except Exception:
       pass
 
-# WebSocket with optional Redis broadcast
-from config import settings
-try:
-  import redis
-  _redis = redis.from_url(settings.REDIS_URL) if settings.REDIS_URL else None
-except Exception:
-  _redis = None
-
+# WebSocket push; events fan out across workers over Redis pub/sub when REDIS_URL is set
 @app.websocket("/ws/dashboard")
 async def ws_dashboard(ws: WebSocket):
+  """
+  Dashboards connect without parameters and receive alerts, e-FIRs and metric deltas.
+  A tourist app connects with ?tourist_id=... and receives its own safety score updates and alerts.
+  Alerts, e-FIRs and tourist updates are pushed as they happen, from every worker. Metric
+  deltas are not: each worker polls its own dashboard metrics every
+  DASHBOARD_PUSH_INTERVAL_SECONDS (1 s by default) and pushes what changed to the dashboards
+  connected to it, so they reflect that worker's view only.
+  """
   await ws.accept()
+  tourist_id = ws.query_params.get("tourist_id")
   await ws.send_json({"type": "hello", "message": "connected"})
+  if not tourist_id:
+    analytics = await registry.aget("analytics")
+    await ws.send_json(jsonable_encoder({"type": "metrics", "data": analytics.get_dashboard_metrics()}))
+  connection = dashboard_hub.connect(ws, tourist_id)
+  sender = dashboard_hub.start_sender(connection)
   try:
     while True:
-      # If you later push messages to Redis channel 'dashboard_broadcast', forward them here
-      _ = await ws.receive_text()
-  except Exception:
+      # Nothing is expected from clients; reading only notices the disconnect
+      await ws.receive_text()
+  except (WebSocketDisconnect, RuntimeError):
     pass
+  finally:
+    dashboard_hub.disconnect(connection)
+    sender.cancel()
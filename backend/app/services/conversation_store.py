@@ -0,0 +1,180 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    import redis  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+# Rough per-turn overhead (tuple, deque slot) on top of the text, for the memory cap
+TURN_OVERHEAD_BYTES = 120
+
+
+class _Conversation:
+    __slots__ = ("turns", "last_used", "size")
+
+    def __init__(self, max_turns: int):
+        self.turns: Deque[Tuple[str, str]] = deque(maxlen=max_turns)
+        self.last_used = 0.0
+        self.size = 0
+
+
+def _turn_size(user: str, bot: str) -> int:
+    return len(user) + len(bot) + TURN_OVERHEAD_BYTES
+
+
+class ConversationStore:
+    """
+    Recent chatbot turns per tourist, bounded every way: each tourist keeps a ring
+    buffer of the last max_turns, conversations idle for idle_ttl_seconds expire,
+    and the least recently used ones are evicted beyond max_conversations or
+    max_bytes of text. Bot replies are mostly templates, so they are interned and
+    stored once however many tourists received them.
+
+    With a redis_url each conversation is instead a capped Redis list with the idle
+    TTL as its expiry, so history survives restarts and is shared by all workers.
+    The server is pinged at construction and the store stays in memory if that
+    fails; a Redis error later on loses that turn's history (counted in
+    redis_errors) but never fails the caller. The async aappend/aget run Redis
+    round-trips in a thread so they do not block the event loop.
+    """
+    def __init__(self, max_turns: int = 10, max_conversations: int = 50000, idle_ttl_seconds: float = 3600,
+                 max_bytes: int = 64 * 1024 * 1024, redis_url: str = "", key_prefix: str = "chat_history:",
+                 redis_timeout_seconds: float = 0.5):
+        self.max_turns = max(1, max_turns)
+        self.max_conversations = max(1, max_conversations)
+        self.idle_ttl = idle_ttl_seconds
+        self.max_bytes = max_bytes
+        self.key_prefix = key_prefix
+        self._conversations: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.evicted = 0
+        self.expired = 0
+        self.redis_errors = 0
+        self._redis = None
+        if redis is not None and redis_url:
+            try:
+                client = redis.from_url(redis_url, socket_connect_timeout=redis_timeout_seconds,
+                                        socket_timeout=redis_timeout_seconds)
+                client.ping()  # from_url does not connect
+                self._redis = client
+            except Exception as e:
+                print(f"Redis unavailable for chat history, staying in memory: {e}")
+
+    @property
+    def backend(self) -> str:
+        return "redis" if self._redis is not None else "memory"
+
+    def append(self, tourist_id: str, user: str, bot: str):
+        if self._redis is not None:
+            key = self.key_prefix + tourist_id
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                pipe.rpush(key, json.dumps([user, bot], ensure_ascii=False))
+                pipe.ltrim(key, -self.max_turns, -1)
+                if self.idle_ttl:
+                    pipe.expire(key, int(self.idle_ttl))
+                pipe.execute()
+            except redis.RedisError as e:
+                self._redis_failed("append", e)
+            return
+        bot = sys.intern(bot)
+        now = time.time()
+        with self._lock:
+            conversation = self._conversations.get(tourist_id)
+            if conversation is None:
+                conversation = self._conversations[tourist_id] = _Conversation(self.max_turns)
+            else:
+                self._conversations.move_to_end(tourist_id)
+            if len(conversation.turns) == conversation.turns.maxlen:
+                dropped = _turn_size(*conversation.turns[0])
+                conversation.size -= dropped
+                self._bytes -= dropped
+            conversation.turns.append((user, bot))
+            conversation.last_used = now
+            added = _turn_size(user, bot)
+            conversation.size += added
+            self._bytes += added
+            self._evict(now)
+
+    def _redis_failed(self, operation: str, error: Exception):
+        self.redis_errors += 1
+        print(f"Chat history {operation} failed in Redis: {error}")
+
+    async def aappend(self, tourist_id: str, user: str, bot: str):
+        if self._redis is None:
+            self.append(tourist_id, user, bot)
+        else:
+            await asyncio.to_thread(self.append, tourist_id, user, bot)
+
+    def _evict(self, now: float):
+        # Most recently used last: expiry and LRU eviction both pop from the front
+        while self._conversations:
+            tourist_id, oldest = next(iter(self._conversations.items()))
+            if self.idle_ttl and now - oldest.last_used > self.idle_ttl:
+                self.expired += 1
+            elif len(self._conversations) > self.max_conversations or self._bytes > self.max_bytes:
+                self.evicted += 1
+            else:
+                break
+            del self._conversations[tourist_id]
+            self._bytes -= oldest.size
+
+    def get(self, tourist_id: str) -> List[Dict[str, str]]:
+        """The tourist's recent turns, oldest first, as {"user": ..., "bot": ...}."""
+        if self._redis is not None:
+            try:
+                raw = self._redis.lrange(self.key_prefix + tourist_id, 0, -1)
+            except redis.RedisError as e:
+                self._redis_failed("read", e)
+                return []
+            return [dict(zip(("user", "bot"), json.loads(item))) for item in raw]
+        with self._lock:
+            conversation = self._conversations.get(tourist_id)
+            if conversation is None:
+                return []
+            if self.idle_ttl and time.time() - conversation.last_used > self.idle_ttl:
+                del self._conversations[tourist_id]
+                self._bytes -= conversation.size
+                self.expired += 1
+                return []
+            return [{"user": user, "bot": bot} for user, bot in conversation.turns]
+
+    async def aget(self, tourist_id: str) -> List[Dict[str, str]]:
+        if self._redis is None:
+            return self.get(tourist_id)
+        return await asyncio.to_thread(self.get, tourist_id)
+
+    def clear(self, tourist_id: str):
+        if self._redis is not None:
+            try:
+                self._redis.delete(self.key_prefix + tourist_id)
+            except redis.RedisError as e:
+                self._redis_failed("clear", e)
+            return
+        with self._lock:
+            conversation = self._conversations.pop(tourist_id, None)
+            if conversation is not None:
+                self._bytes -= conversation.size
+
+    def __len__(self) -> int:
+        return len(self._conversations)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "conversations": len(self._conversations),
+                "bytes": self._bytes,
+                "max_conversations": self.max_conversations,
+                "max_bytes": self.max_bytes,
+                "evicted": self.evicted,
+                "expired": self.expired,
+                "redis_errors": self.redis_errors,
+            }
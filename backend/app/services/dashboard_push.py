@@ -0,0 +1,195 @@
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, Set
+
+from config import settings
+from services.metrics import metrics
+
+try:
+    import redis  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+class DashboardConnection:
+    """
+    One WebSocket client. Outgoing messages wait in a bounded queue that a single
+    sender task drains; when a slow client lets it fill, the oldest message is
+    dropped so the newest state always gets through and memory stays bounded.
+    """
+    def __init__(self, ws, tourist_id: Optional[str] = None, queue_size: int = 256):
+        self.ws = ws
+        self.tourist_id = tourist_id
+        self.queue = deque(maxlen=queue_size)
+        self.dropped = 0
+        self.sent = 0
+        self._ready = asyncio.Event()
+
+    def offer(self, text: str):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+            metrics.inc("ws_messages_dropped_total")
+        self.queue.append(text)
+        self._ready.set()
+
+    async def drain(self):
+        """Send queued messages until the socket fails."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self.queue:
+                await self.ws.send_text(self.queue.popleft())
+                self.sent += 1
+
+
+class DashboardHub:
+    """
+    Pushes dashboard events to WebSocket clients.
+    Events are published once and fanned out to every worker through Redis pub/sub
+    when REDIS_URL is set (in-process only otherwise). Each message is serialized
+    once and delivered to dashboard connections (broadcast) and/or the connections
+    subscribed to one tourist.
+    """
+    def __init__(self, redis_url: str = "", channel: str = "dashboard_broadcast", queue_size: int = 256):
+        self.channel = channel
+        self.queue_size = queue_size
+        try:
+            self._redis = redis.from_url(redis_url) if (redis is not None and redis_url) else None
+        except Exception as e:
+            print(f"Redis unavailable for dashboard push, staying in-process: {e}")
+            self._redis = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._dashboards: Set[DashboardConnection] = set()
+        self._by_tourist: Dict[str, Set[DashboardConnection]] = {}
+        self._outbox: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._last_metrics: Dict[str, object] = {}
+
+    @property
+    def connections(self) -> int:
+        return len(self._dashboards) + sum(len(c) for c in self._by_tourist.values())
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Bind to the server's event loop; with Redis, start the publisher and subscriber threads."""
+        self._loop = loop
+        if self._redis is not None:
+            threading.Thread(target=self._publish_loop, name="dashboard-publish", daemon=True).start()
+            threading.Thread(target=self._subscribe_loop, name="dashboard-subscribe", daemon=True).start()
+
+    # Connections
+
+    def connect(self, ws, tourist_id: Optional[str] = None) -> DashboardConnection:
+        connection = DashboardConnection(ws, tourist_id, self.queue_size)
+        if tourist_id:
+            self._by_tourist.setdefault(tourist_id, set()).add(connection)
+        else:
+            self._dashboards.add(connection)
+        return connection
+
+    def start_sender(self, connection: DashboardConnection) -> asyncio.Task:
+        """Run the connection's drain() task; if sending fails, log it and drop the connection."""
+        task = asyncio.ensure_future(connection.drain())
+        task.add_done_callback(lambda done: self._sender_done(connection, done))
+        return task
+
+    def _sender_done(self, connection: DashboardConnection, task: asyncio.Task):
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            print(f"Dashboard push failed, dropping the connection: {error!r}")
+        self.disconnect(connection)
+
+    def disconnect(self, connection: DashboardConnection):
+        if connection.tourist_id:
+            subscribers = self._by_tourist.get(connection.tourist_id, set())
+            subscribers.discard(connection)
+            if not subscribers:
+                self._by_tourist.pop(connection.tourist_id, None)
+        else:
+            self._dashboards.discard(connection)
+
+    # Publishing (thread-safe; callable from request handlers and inference threads)
+
+    def publish(self, message: dict, tourist_id: Optional[str] = None, broadcast: bool = True):
+        """
+        Send message to all dashboards (broadcast) and/or the clients following tourist_id.
+        Routing travels as a one-line header so receivers never re-parse the JSON.
+        """
+        envelope = f"{int(broadcast)}{tourist_id or ''}\n{json.dumps(message, default=str)}"
+        if self._redis is not None:
+            self._outbox.put(envelope)
+        elif self._loop is not None:
+            self._loop.call_soon_threadsafe(self._deliver, envelope)
+
+    def _deliver(self, envelope: str):
+        header, text = envelope.split("\n", 1)
+        broadcast, tourist_id = header[:1] == "1", header[1:]
+        if broadcast:
+            for connection in self._dashboards:
+                connection.offer(text)
+        if tourist_id:
+            for connection in self._by_tourist.get(tourist_id, ()):
+                connection.offer(text)
+
+    def _publish_loop(self):
+        # One pipeline round trip per burst of events instead of one per event
+        while True:
+            batch = [self._outbox.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                pipe = self._redis.pipeline(transaction=False)
+                for envelope in batch:
+                    pipe.publish(self.channel, envelope)
+                pipe.execute()
+            except Exception as e:
+                print(f"Dashboard publish failed: {e}")
+                time.sleep(1)
+
+    def _subscribe_loop(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for item in pubsub.listen():
+                    data = item.get("data")
+                    if isinstance(data, bytes):
+                        self._loop.call_soon_threadsafe(self._deliver, data.decode("utf-8"))
+            except Exception as e:
+                print(f"Dashboard subscription lost, retrying: {e}")
+                time.sleep(1)
+
+    # Metric deltas
+
+    def metrics_delta(self, current: dict) -> dict:
+        """Fields of current that differ from the last pushed metrics (last_updated ignored)."""
+        delta = {k: v for k, v in current.items() if k != "last_updated" and self._last_metrics.get(k) != v}
+        self._last_metrics.update(delta)
+        return delta
+
+    async def push_metrics(self, get_metrics: Callable[[], dict], interval_seconds: float):
+        """
+        Push this worker's dashboard metrics when they change. Metrics stay local to
+        the worker that computed them; events are what fan out through Redis.
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                delta = self.metrics_delta(get_metrics())
+            except Exception as e:
+                print(f"Dashboard metrics push failed: {e}")
+                continue
+            if delta and self._dashboards:
+                self._deliver("1\n" + json.dumps({"type": "metrics_delta", "data": delta}, default=str))
+
+
+# Singleton
+dashboard_hub = DashboardHub(settings.REDIS_URL, settings.DASHBOARD_REDIS_CHANNEL, settings.DASHBOARD_WS_QUEUE_SIZE)
+metrics.register_gauge("ws_connections", lambda: [({}, dashboard_hub.connections)])
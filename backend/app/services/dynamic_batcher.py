@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Sequence
+
+from services.metrics import metrics
+
+# Powers of two up to the largest batch worth configuring
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+metrics.describe("batch_size", "Items per model batch", buckets=BATCH_SIZE_BUCKETS)
+metrics.describe("batch_queue_wait_seconds", "Time an item waited for its batch to start")
+
+
+class DynamicBatcher:
+    """
+    Collects single items submitted from many threads into batches for a model that
+    is much cheaper per item when called on a list (a transformers pipeline pads
+    the batch and runs one forward pass). A batch closes when it holds
+    max_batch_size items or max_wait_ms after its first item arrived, whichever is
+    first, so a lone request waits at most max_wait_ms.
+
+    batch_fn(items) runs on the batcher's own thread and must return one result per
+    item, in order; each caller's future resolves to its own result (or to the
+    batch's exception).
+    """
+    def __init__(self, name: str, batch_fn: Callable[[List[Any]], Sequence[Any]],
+                 max_batch_size: int = 16, max_wait_ms: float = 10):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait_seconds = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    def submit(self, item: Any) -> Future:
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        """Submit one item and block until its batch has run."""
+        return self.submit(item).result()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=f"batcher-{self.name}", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_seconds
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Items already queued are taken even when the wait budget is spent
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            self._run(self._collect())
+
+    def _run(self, batch: list):
+        started = time.perf_counter()
+        items = [item for item, _, _ in batch]
+        metrics.observe("batch_size", len(batch), batcher=self.name)
+        for _, _, enqueued in batch:
+            metrics.observe("batch_queue_wait_seconds", started - enqueued, batcher=self.name)
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            with metrics.timer("stage_duration_seconds", component=self.name, stage="batch"):
+                results = list(self.batch_fn(items))
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name}: batch_fn returned {len(results)} results for {len(items)} items")
+        except Exception as exc:
+            for _, future, _ in batch:
+                future.set_exception(exc)
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_seconds * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "queued": self._queue.qsize(),
+            }
@@ -0,0 +1,117 @@
+import csv
+import io
+import json
+from typing import Any, Dict, Iterable, Iterator, Optional, Set
+
+from services.efir_store import efir_timestamp
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+# CSV columns: (header, path into the e-FIR dict)
+CSV_COLUMNS = (
+    ("complaint_number", ("complaint_number",)),
+    ("date_time", ("date_time",)),
+    ("status", ("status",)),
+    ("tourist_id", ("complainant_details", "tourist_id")),
+    ("name", ("complainant_details", "name")),
+    ("nationality", ("complainant_details", "nationality")),
+    ("contact_number", ("complainant_details", "contact_number")),
+    ("incident_type", ("incident_details", "type")),
+    ("severity", ("incident_details", "severity")),
+    ("description", ("incident_details", "description")),
+    ("incident_area", ("location_details", "incident_area")),
+    ("last_known_location", ("location_details", "last_known_location")),
+)
+
+
+def _field(efir: Dict[str, Any], path) -> Any:
+    value: Any = efir
+    for key in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _values(raw: Optional[str]) -> Optional[Set[str]]:
+    """Comma-separated query values, upper-cased; None for no filter."""
+    if not raw:
+        return None
+    return {value.strip().upper() for value in raw.split(",") if value.strip()} or None
+
+
+class EFIRFilter:
+    """
+    Server-side export filter. types and severities are comma-separated lists
+    matched case-insensitively; area matches as a case-insensitive substring of the
+    incident area; start/end bound date_time in unix seconds.
+    """
+    def __init__(self, types: Optional[str] = None, severities: Optional[str] = None, area: Optional[str] = None,
+                 start: Optional[float] = None, end: Optional[float] = None):
+        self.types = _values(types)
+        self.severities = _values(severities)
+        self.area = area.strip().casefold() if area and area.strip() else None
+        self.start = start
+        self.end = end
+
+    def __call__(self, efir: Dict[str, Any]) -> bool:
+        if self.start is not None or self.end is not None:
+            when = efir_timestamp(efir)
+            if (self.start is not None and when < self.start) or (self.end is not None and when > self.end):
+                return False
+        incident = efir.get("incident_details") or {}
+        if self.types is not None and str(incident.get("type", "")).upper() not in self.types:
+            return False
+        if self.severities is not None and str(incident.get("severity", "")).upper() not in self.severities:
+            return False
+        if self.area is not None:
+            area = str((efir.get("location_details") or {}).get("incident_area") or "")
+            if self.area not in area.casefold():
+                return False
+        return True
+
+
+def iter_efirs(lines: Iterable[bytes], matches: Optional[EFIRFilter] = None) -> Iterator[Dict[str, Any]]:
+    """Decode raw NDJSON lines from EFIRStore.scan(), keeping those matches accepts."""
+    for line in lines:
+        try:
+            efir = json.loads(line)
+        except ValueError:
+            continue
+        if matches is None or matches(efir):
+            yield efir
+
+
+def iter_ndjson(efirs: Iterable[Dict[str, Any]], chunk_bytes: int = 64 * 1024) -> Iterator[str]:
+    """e-FIRs as NDJSON text, in chunks of about chunk_bytes."""
+    lines, size = [], 0
+    for efir in efirs:
+        line = json.dumps(efir, default=str, ensure_ascii=False)
+        lines.append(line)
+        size += len(line) + 1
+        if size >= chunk_bytes:
+            yield "\n".join(lines) + "\n"
+            lines, size = [], 0
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def iter_csv(efirs: Iterable[Dict[str, Any]], chunk_bytes: int = 64 * 1024) -> Iterator[str]:
+    """e-FIRs as CSV text with a header row (CSV_COLUMNS), in chunks of about chunk_bytes."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for header, _ in CSV_COLUMNS])
+    for efir in efirs:
+        row = []
+        for _, path in CSV_COLUMNS:
+            value = _field(efir, path)
+            if isinstance(value, (dict, list)):
+                value = json.dumps(value, default=str, ensure_ascii=False)
+            row.append("" if value is None else value)
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,213 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from services.efir_store import efir_timestamp
+from services.keyword_matcher import tokenize
+
+# e-FIR fields whose text is searchable
+TEXT_FIELDS = (
+    ("incident_details", "type"),
+    ("incident_details", "description"),
+    ("incident_details", "circumstances"),
+    ("incident_details", "last_known_activity"),
+    ("location_details", "incident_area"),
+    ("location_details", "nearby_landmarks"),
+)
+
+
+def efir_text(efir: dict) -> str:
+    parts = []
+    for section, field in TEXT_FIELDS:
+        value = (efir.get(section) or {}).get(field)
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(v) for v in value)
+        elif value:
+            parts.append(str(value).replace("_", " "))
+    return "\n".join(parts)
+
+
+class EFIRSearchIndex:
+    """
+    In-memory inverted index over e-FIR text, ranked with BM25.
+
+    Tokens come from keyword_matcher.tokenize, so Indic words keep their vowel
+    signs and viramas. Each term's postings are two packed arrays (document ids,
+    term frequencies) appended to as e-FIRs arrive; document lengths and the filter
+    fields (type, severity, timestamp) are packed arrays indexed by document id.
+    A query scores the postings of its own terms into a reused dense array, rarest
+    term first, and skips the postings of very common terms once they can no longer
+    change the top results; type, severity and time filters are vectorized too.
+    """
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._numbers: List[str] = []
+        self._areas: List[str] = []
+        self._lengths = array("I")
+        self._timestamps = array("d")
+        self._types = array("H")
+        self._severities = array("H")
+        self._codes: Dict[str, int] = {}
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._total_length = 0
+        self._scores = np.zeros(0, dtype=np.float64)
+        self._norms = np.zeros(0, dtype=np.float64)
+
+    def _code(self, value) -> int:
+        value = str(value or "").upper()
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._codes)
+        return code
+
+    def add(self, efir: dict):
+        """Index one e-FIR (a store listener: see EFIRStore.subscribe)."""
+        number = efir.get("complaint_number")
+        if not number:
+            return
+        terms = Counter(tokenize(efir_text(efir)))
+        incident = efir.get("incident_details") or {}
+        with self._lock:
+            doc = len(self._numbers)
+            self._numbers.append(number)
+            self._areas.append(str((efir.get("location_details") or {}).get("incident_area") or "").casefold())
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._total_length += length
+            self._timestamps.append(efir_timestamp(efir))
+            self._types.append(self._code(incident.get("type")))
+            self._severities.append(self._code(incident.get("severity")))
+            for term, count in terms.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = (array("I"), array("H"))
+                postings[0].append(doc)
+                postings[1].append(min(count, 65535))
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def _mask(self, codes: array, values: Optional[Iterable[str]], docs: np.ndarray) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        values = [v.strip().upper() for v in values]
+        wanted = [self._codes[v] for v in values if v in self._codes]
+        return np.isin(np.frombuffer(codes, dtype=np.uint16)[docs], wanted)
+
+    def search(self, query: str, limit: int = 10, types: Optional[Iterable[str]] = None,
+               severities: Optional[Iterable[str]] = None, area: Optional[str] = None,
+               start: Optional[float] = None, end: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Best matching (complaint number, score) pairs, best first."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        area = area.strip().casefold() if area and area.strip() else None
+        if not terms or limit <= 0:
+            return []
+        with self._lock:
+            # The numpy views of the packed arrays must be gone before add() can grow them,
+            # so all of them live in _rank's frame
+            return self._rank(terms, limit, types, severities, area, start, end)
+
+    def _keep(self, docs: np.ndarray, types, severities, start, end) -> np.ndarray:
+        """Which of docs pass the type, severity and time filters."""
+        keep = np.ones(len(docs), dtype=bool)
+        for mask in (self._mask(self._types, types, docs), self._mask(self._severities, severities, docs)):
+            if mask is not None:
+                keep &= mask
+        if start is not None or end is not None:
+            when = np.frombuffer(self._timestamps, dtype=np.float64)[docs]
+            if start is not None:
+                keep &= when >= start
+            if end is not None:
+                keep &= when <= end
+        return keep
+
+    def _score_buffer(self, count: int) -> np.ndarray:
+        # One dense accumulator reused by every query (searches hold the lock)
+        if len(self._scores) < count:
+            self._scores = np.zeros(max(count, 2 * len(self._scores)), dtype=np.float64)
+        return self._scores[:count]
+
+    def _length_norms(self, count: int) -> np.ndarray:
+        # BM25's per-document length normalization, recomputed only after new documents
+        if len(self._norms) != count:
+            average_length = self._total_length / count or 1.0
+            lengths = np.frombuffer(self._lengths, dtype=np.uint32)
+            self._norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        return self._norms
+
+    def _rank(self, terms, limit, types, severities, area, start, end) -> List[Tuple[str, float]]:
+        count = len(self._numbers)
+        if not count:
+            return []
+        norms = self._length_norms(count)
+        weighted = []
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                df = len(postings[0])
+                weighted.append((math.log(1 + (count - df + 0.5) / (df + 0.5)), postings))
+        if not weighted:
+            return []
+        # Rarest terms first. A term adds at most idf * (k1 + 1) to a document, so once the
+        # limit-th best score beats what all the remaining terms could add together, no
+        # document they alone contain can make the results (MaxScore): the common terms
+        # are then only looked up for the few documents still in contention.
+        weighted.sort(key=lambda item: -item[0])
+        bounds = np.cumsum([idf * (self.k1 + 1) for idf, _ in weighted][::-1])[::-1]
+        scores = self._score_buffer(count)
+        contenders = None
+        try:
+            for i, (idf, (ids, frequencies)) in enumerate(weighted):
+                docs = np.frombuffer(ids, dtype=np.uint32)
+                tf = np.frombuffer(frequencies, dtype=np.uint16)
+                if contenders is None and i and area is None:
+                    touched = np.flatnonzero(scores)
+                    candidates = touched[self._keep(touched, types, severities, start, end)]
+                    if len(candidates) >= limit:
+                        threshold = np.partition(scores[candidates], len(candidates) - limit)[len(candidates) - limit]
+                        if threshold > bounds[i]:
+                            contenders = candidates[scores[candidates] + bounds[i] >= threshold]
+                if contenders is not None:
+                    # Postings are in document order, so each contender is one binary search
+                    positions = np.minimum(np.searchsorted(docs, contenders), len(docs) - 1)
+                    found = docs[positions] == contenders
+                    docs, tf = contenders[found], tf[positions[found]]
+                tf = tf.astype(np.float64)
+                # Each document appears once in a term's postings, so plain fancy-index += is exact
+                scores[docs] += (idf * (self.k1 + 1)) * tf / (tf + norms[docs])
+            if contenders is None:
+                docs = np.flatnonzero(scores)
+                docs = docs[self._keep(docs, types, severities, start, end)]
+            else:
+                docs = contenders
+            totals = scores[docs]
+        finally:
+            scores.fill(0.0)
+        if area is None and len(totals) > limit:
+            # Only the top limit need ordering
+            top = np.argpartition(-totals, limit)[:limit]
+            docs, totals = docs[top], totals[top]
+        results = []
+        for i in np.argsort(-totals, kind="stable"):
+            doc = int(docs[i])
+            if area is not None and area not in self._areas[doc]:
+                continue
+            results.append((self._numbers[doc], float(totals[i])))
+            if len(results) >= limit:
+                break
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "documents": len(self._numbers),
+                "terms": len(self._postings),
+                "postings": sum(len(ids) for ids, _ in self._postings.values()),
+                "average_length": self._total_length / len(self._numbers) if self._numbers else 0.0,
+            }
@@ -0,0 +1,365 @@
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.metrics import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+_SEGMENT_NAME = re.compile(r"^w(\d+)-(\d{6})\.ndjson$")
+MAX_WRITERS = 64
+
+# (segment path, byte offset, byte length) of one record
+Location = Tuple[str, int, int]
+
+
+def efir_timestamp(efir: dict) -> float:
+    try:
+        return datetime.fromisoformat(efir.get("date_time", "")).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class EFIRStore:
+    """
+    Append-only e-FIR log: one JSON record per line in segment files of at most
+    segment_bytes, with in-memory indexes by complaint number (the record's exact
+    byte range, so a lookup is one dict probe and one pread), by tourist and by
+    time.
+
+    append() writes straight to the segment and returns; a committer thread sleeps
+    until something is appended, lets the burst gather for commit_interval_ms and
+    fsyncs once (group commit), so the emergency path never waits on the disk and
+    one fsync covers every e-FIR of a burst. flush() forces it.
+
+    Each worker process claims a writer slot (a locked file) and appends only to its
+    own segments; all workers read all segments, picking up records written by the
+    others by tailing their files on a lookup miss or range query. Startup replays
+    the segments to rebuild the indexes, dropping a torn last line after a crash.
+    Tailing reads tail_chunk_bytes at a time and only holds the store's lock to index
+    each chunk, so appends are not held up; it does blocking file I/O, so async
+    callers run the lookups on a worker thread.
+    """
+    tail_chunk_bytes = 1024 * 1024
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, commit_interval_ms: float = 5):
+        self.directory = directory
+        self.segment_bytes = max(1024, segment_bytes)
+        self.commit_interval = max(0.0, commit_interval_ms) / 1000
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._appended = threading.Condition(self._lock)
+        self._tail_lock = threading.Lock()  # one tailer at a time, so offsets only move forward
+        self._by_number: Dict[str, Location] = {}
+        self._by_tourist: Dict[str, List[str]] = {}
+        self._by_time: List[Tuple[float, str]] = []
+        self._read_offsets: Dict[str, int] = {}  # how far each segment has been indexed
+        self._read_fds: Dict[str, int] = {}
+        self._listeners: List[Callable[[dict], None]] = []
+
+        self._slot_file = None
+        self.writer_slot = self._claim_slot()
+        self._segment_path: Optional[str] = None
+        self._segment_fd: Optional[int] = None
+        self._segment_size = 0
+        self._uncommitted = 0
+        self.commits = 0
+
+        self._tail()
+        self._open_segment()
+        self._closed = False
+        self._committer = threading.Thread(target=self._commit_loop, name="efir-group-commit", daemon=True)
+        self._committer.start()
+
+    # Writer slot and segments
+
+    def _claim_slot(self) -> int:
+        for slot in range(MAX_WRITERS):
+            handle = open(os.path.join(self.directory, f"writer_{slot}.lock"), "w")
+            if fcntl is None:
+                self._slot_file = handle
+                return slot
+            try:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                handle.close()
+                continue
+            self._slot_file = handle
+            return slot
+        raise RuntimeError(f"all {MAX_WRITERS} e-FIR writer slots are in use")
+
+    def _segments(self) -> List[str]:
+        """Segment paths in (writer slot, sequence) order."""
+        found = []
+        for entry in os.listdir(self.directory):
+            match = _SEGMENT_NAME.match(entry)
+            if match:
+                found.append((int(match.group(1)), int(match.group(2)), os.path.join(self.directory, entry)))
+        return [path for _, _, path in sorted(found)]
+
+    def _open_segment(self):
+        own = [p for p in self._segments() if _SEGMENT_NAME.match(os.path.basename(p)).group(1) == str(self.writer_slot)]
+        if own and os.path.getsize(own[-1]) < self.segment_bytes:
+            path = own[-1]
+        else:
+            sequence = int(_SEGMENT_NAME.match(os.path.basename(own[-1])).group(2)) + 1 if own else 0
+            path = os.path.join(self.directory, f"w{self.writer_slot}-{sequence:06d}.ndjson")
+        # Cut a torn tail from a crash so the next record starts on a fresh line
+        indexed = self._read_offsets.get(path, 0)
+        self._segment_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.path.getsize(path) > indexed:
+            os.ftruncate(self._segment_fd, indexed)
+        self._segment_path = path
+        self._segment_size = indexed
+        self._read_offsets[path] = indexed
+
+    def _rotate(self):
+        os.fsync(self._segment_fd)
+        os.close(self._segment_fd)
+        sequence = int(_SEGMENT_NAME.match(os.path.basename(self._segment_path)).group(2)) + 1
+        path = os.path.join(self.directory, f"w{self.writer_slot}-{sequence:06d}.ndjson")
+        self._segment_fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._segment_path = path
+        self._segment_size = 0
+        self._read_offsets[path] = 0
+
+    # Writes
+
+    def append(self, efir: dict) -> Location:
+        """Add an e-FIR; it is readable at once and durable within commit_interval_ms."""
+        data = (json.dumps(efir, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._segment_size and self._segment_size + len(data) > self.segment_bytes:
+                self._rotate()
+            offset = self._segment_size
+            os.write(self._segment_fd, data)
+            self._segment_size += len(data)
+            self._read_offsets[self._segment_path] = self._segment_size
+            location = (self._segment_path, offset, len(data))
+            self._index(efir, location)
+            self._uncommitted += 1
+            self._appended.notify()
+        if not self.commit_interval:
+            self.flush()
+        return location
+
+    def _commit_loop(self):
+        while True:
+            with self._appended:
+                while not self._uncommitted and not self._closed:
+                    self._appended.wait()
+                if self._closed:
+                    return  # close() flushes what is left
+            # Let the rest of the burst land so one fsync covers it
+            time.sleep(self.commit_interval)
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"e-FIR group commit failed: {e}")
+
+    def flush(self):
+        """fsync everything appended so far (one fsync for the whole group)."""
+        with self._lock:
+            pending, fd = self._uncommitted, self._segment_fd
+            self._uncommitted = 0
+        if not pending or fd is None:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            if fd == self._segment_fd:
+                raise  # otherwise the segment was rotated, which fsyncs it on the way out
+        self.commits += 1
+        metrics.observe("batch_size", pending, batcher="efir_group_commit")
+
+    # Indexes
+
+    def _index(self, efir: dict, location: Location):
+        number = efir.get("complaint_number")
+        if not number:
+            return
+        if number not in self._by_number:
+            tourist_id = (efir.get("complainant_details") or {}).get("tourist_id")
+            if tourist_id:
+                self._by_tourist.setdefault(tourist_id, []).append(number)
+            entry = (efir_timestamp(efir), number)
+            if not self._by_time or entry >= self._by_time[-1]:
+                self._by_time.append(entry)
+            else:
+                insort(self._by_time, entry)
+            for listener in self._listeners:
+                listener(efir)
+        self._by_number[number] = location
+
+    def subscribe(self, listener: Callable[[dict], None]):
+        """
+        Call listener(efir) for every record: the ones stored so far now, then each
+        new one as it is indexed, whether appended here or picked up from another
+        writer. The replay of stored records does not hold up appends: records
+        indexed meanwhile are queued and handed over after it, in order. Listeners
+        of new records run under the store's lock and must be quick.
+        """
+        backlog: List[dict] = []
+        queue = backlog.append
+        self._tail()
+        with self._lock:
+            replay_to = dict(self._read_offsets)
+            self._listeners.append(queue)
+        for line in self.scan(upto=replay_to):
+            listener(json.loads(line))
+        with self._lock:
+            self._listeners.remove(queue)
+            for efir in backlog:
+                listener(efir)
+            self._listeners.append(listener)
+
+    def refresh(self):
+        """Pick up records other writers appended (lookups and range queries do this themselves)."""
+        self._tail()
+
+    def _tail(self):
+        """Index records other writers (or an earlier run) appended since the last look."""
+        with self._tail_lock:
+            for path in self._segments():
+                if path == self._segment_path:
+                    continue
+                start = self._read_offsets.get(path, 0)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size > start:
+                    self._tail_segment(path, start, size)
+
+    def _tail_segment(self, path: str, start: int, size: int):
+        with open(path, "rb") as f:
+            f.seek(start)
+            offset, rest = start, b""
+            while offset + len(rest) < size:
+                chunk = f.read(min(self.tail_chunk_bytes, size - offset - len(rest)))
+                if not chunk:
+                    break
+                *lines, rest = (rest + chunk).split(b"\n")
+                with self._lock:
+                    for line in lines:
+                        try:
+                            efir = json.loads(line)
+                        except ValueError:
+                            # Torn by a crash; stop here like a partial last line
+                            self._read_offsets[path] = offset
+                            return
+                        self._index(efir, (path, offset, len(line) + 1))
+                        offset += len(line) + 1
+                    self._read_offsets[path] = offset
+        # rest is a line still being written (or torn); it is indexed once complete
+
+    # Reads
+
+    def _read(self, location: Location) -> dict:
+        path, offset, length = location
+        fd = self._read_fds.get(path)
+        if fd is None:
+            fd = self._read_fds[path] = os.open(path, os.O_RDONLY)
+        if hasattr(os, "pread"):
+            return json.loads(os.pread(fd, length, offset))
+        os.lseek(fd, offset, os.SEEK_SET)
+        return json.loads(os.read(fd, length))
+
+    def get(self, number: str) -> Optional[dict]:
+        location = self._by_number.get(number)
+        if location is None:
+            self._tail()
+            location = self._by_number.get(number)
+            if location is None:
+                return None
+        with self._lock:
+            return self._read(location)
+
+    def by_tourist(self, tourist_id: str, limit: int = 100) -> List[dict]:
+        """A tourist's e-FIRs, newest first."""
+        self._tail()
+        with self._lock:
+            numbers = self._by_tourist.get(tourist_id, [])[-limit:][::-1] if limit > 0 else []
+            return [self._read(self._by_number[n]) for n in numbers]
+
+    def range(self, start: float, end: float, limit: int = 100, offset: int = 0) -> List[dict]:
+        """e-FIRs with date_time in [start, end] (unix seconds), oldest first."""
+        self._tail()
+        with self._lock:
+            lo = bisect_left(self._by_time, (start, ""))
+            hi = bisect_right(self._by_time, (end, "\uffff"))
+            window = self._by_time[lo + offset:min(hi, lo + offset + limit)] if limit > 0 else []
+            return [self._read(self._by_number[n]) for _, n in window]
+
+    def count(self, start: Optional[float] = None, end: Optional[float] = None) -> int:
+        self._tail()
+        with self._lock:
+            lo = 0 if start is None else bisect_left(self._by_time, (start, ""))
+            hi = len(self._by_time) if end is None else bisect_right(self._by_time, (end, "\uffff"))
+            return max(0, hi - lo)
+
+    def scan(self, chunk_bytes: int = 1024 * 1024, upto: Optional[Dict[str, int]] = None) -> Iterator[bytes]:
+        """
+        Every stored record as its raw NDJSON line, segment by segment, reading
+        chunk_bytes at a time: memory stays constant however large the log is, and
+        appends are not held up while a scan runs. Lines past what was indexed when
+        the scan reached a segment (a write in flight) are left out; with upto
+        ({segment path: byte offset}), lines past those offsets are.
+        """
+        if upto is None:
+            self._tail()
+        for path in self._segments():
+            end = self._read_offsets.get(path, 0) if upto is None else upto.get(path, 0)
+            try:
+                f = open(path, "rb")
+            except OSError:
+                continue
+            with f:
+                position, rest = 0, b""
+                while position < end:
+                    chunk = f.read(min(chunk_bytes, end - position))
+                    if not chunk:
+                        break
+                    position += len(chunk)
+                    *lines, rest = (rest + chunk).split(b"\n")
+                    for line in lines:
+                        yield line + b"\n"
+
+    def __len__(self) -> int:
+        return len(self._by_number)
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "records": len(self._by_number),
+                "segments": len(self._read_offsets),
+                "writer_slot": self.writer_slot,
+                "uncommitted": self._uncommitted,
+                "group_commits": self.commits,
+            }
+
+    def close(self):
+        with self._appended:
+            self._closed = True
+            self._appended.notify_all()
+        self._committer.join(1)
+        self.flush()
+        with self._lock:
+            if self._segment_fd is not None:
+                os.close(self._segment_fd)
+                self._segment_fd = None
+            for fd in self._read_fds.values():
+                os.close(fd)
+            self._read_fds.clear()
+            if self._slot_file is not None:
+                self._slot_file.close()
+                self._slot_file = None
@@ -0,0 +1,107 @@
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+class FaceEncodingIndex:
+    """
+    Face encodings of registered tourists, one row each of a single contiguous
+    float32 matrix, with the tourist ids in a parallel list and each row's squared
+    norm kept alongside.
+
+    identify() finds the nearest faces to a probe with one matrix-vector product
+    (|x - q|^2 = |x|^2 - 2 x.q + |q|^2) and an argpartition for the top k, re-ranked
+    on exact distances, so a lookup against a million faces is a single BLAS pass
+    instead of a million compare_faces calls. Rows grow by doubling; removing a tourist moves the last
+    row into the hole, so the matrix stays dense.
+
+    It also reads like a dict of id -> encoding ("id" in index, index[id], len).
+    """
+    def __init__(self, dim: int = 128, capacity: int = 1024):
+        self.dim = dim
+        self._matrix = np.zeros((max(1, capacity), dim), dtype=np.float32)
+        self._sq_norms = np.zeros(max(1, capacity), dtype=np.float32)
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _grow(self):
+        capacity = 2 * len(self._matrix)
+        matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        sq_norms = np.zeros(capacity, dtype=np.float32)
+        sq_norms[:len(self._ids)] = self._sq_norms[:len(self._ids)]
+        self._matrix, self._sq_norms = matrix, sq_norms
+
+    def add(self, tourist_id: str, encoding):
+        """Register or replace a tourist's encoding."""
+        vector = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            row = self._rows.get(tourist_id)
+            if row is None:
+                if len(self._ids) == len(self._matrix):
+                    self._grow()
+                row = len(self._ids)
+                self._ids.append(tourist_id)
+                self._rows[tourist_id] = row
+            self._matrix[row] = vector
+            self._sq_norms[row] = float(np.dot(vector, vector))
+
+    def remove(self, tourist_id: str) -> bool:
+        with self._lock:
+            row = self._rows.pop(tourist_id, None)
+            if row is None:
+                return False
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._matrix[row] = self._matrix[last]
+                self._sq_norms[row] = self._sq_norms[last]
+                self._ids[row] = moved
+                self._rows[moved] = row
+            self._ids.pop()
+            return True
+
+    def distance(self, tourist_id: str, encoding) -> Optional[float]:
+        """Euclidean distance from encoding to the tourist's registered face (None if unregistered)."""
+        vector = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            row = self._rows.get(tourist_id)
+            if row is None:
+                return None
+            return float(np.linalg.norm(self._matrix[row] - vector))
+
+    def identify(self, encoding, k: int = 5) -> List[Tuple[str, float]]:
+        """The k registered faces nearest to encoding as (tourist id, distance), nearest first."""
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        with self._lock:
+            count = len(self._ids)
+            if not count or k <= 0:
+                return []
+            squared = self._sq_norms[:count] - 2 * (self._matrix[:count] @ query)
+            squared += float(np.dot(query, query))
+            # The float32 expansion can misorder near-ties, so a few extra candidates are
+            # re-ranked on exact distances
+            shortlist = min(count, k + 16)
+            top = np.argpartition(squared, shortlist - 1)[:shortlist] if shortlist < count else np.arange(count)
+            distances = np.linalg.norm(self._matrix[top] - query, axis=1)
+            order = np.argsort(distances, kind="stable")[:k]
+            return [(self._ids[i], float(d)) for i, d in zip(top[order].tolist(), distances[order].tolist())]
+
+    def __contains__(self, tourist_id) -> bool:
+        return tourist_id in self._rows
+
+    def __getitem__(self, tourist_id: str) -> np.ndarray:
+        with self._lock:
+            return self._matrix[self._rows[tourist_id]].copy()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._ids))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"faces": len(self._ids), "capacity": len(self._matrix), "matrix_bytes": self._matrix.nbytes}
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.keyword_matcher import tokenize
+from services.metrics import metrics
+
+metrics.describe("faq_lookups_total", "Chatbot FAQ index lookups by result (hit, miss)")
+
+
+# Bumped whenever features() changes, so indexes built the old way are not reused
+FEATURES_VERSION = 2
+
+# Question filler ("what should I do", "is it") that says nothing about the topic;
+# left in, it is what most near-miss questions have in common with an entry
+STOP_WORDS = frozenset("""
+    a about after am an and any are as at be been before being but by can could did do does doing
+    for from get got had has have here how i if in into is it its me my of on or our out over
+    please should so some than that the their them then there these they this those to up us was
+    we were what when where which while who whom whose why will with would you your
+""".split())
+
+
+def features(text: str) -> Counter:
+    """
+    Content words and pairs of adjacent content words of text ("reach station" tells
+    more than "reach" and "station").
+    """
+    words = [word for word in tokenize(text) if word not in STOP_WORDS]
+    return Counter(words + [f"{a} {b}" for a, b in zip(words, words[1:])])
+
+
+def _tfidf(counts: Counter, vocabulary: Dict[str, int], idf: np.ndarray,
+           unknown_idf: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (term ids, L2-normalized sublinear tf-idf weights) of the known terms in counts.
+    Terms outside the vocabulary still count towards the norm with unknown_idf, so
+    a query that is mostly about something else scores low.
+    """
+    known = [(vocabulary[term], count) for term, count in counts.items() if term in vocabulary]
+    unknown = [count for term, count in counts.items() if term not in vocabulary]
+    if not known:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    ids = np.array([i for i, _ in known], dtype=np.int64)
+    weights = np.array([1 + math.log(c) for _, c in known], dtype=np.float32) * idf[ids]
+    unknown_weight = sum((unknown_idf * (1 + math.log(c))) ** 2 for c in unknown)
+    norm = math.sqrt(float(np.dot(weights, weights)) + unknown_weight)
+    return ids, weights / norm if norm else weights
+
+
+class FAQIndex:
+    """
+    TF-IDF index over curated chatbot FAQ entries, each with several phrasings of
+    its question. Every phrasing is a document; a query is answered with the entry
+    of its most similar phrasing (cosine similarity over content words) if that
+    reaches threshold and beats the best phrasing of any other entry by margin, so
+    a vague question that fits several entries about equally goes to the LLM.
+
+    build() precomputes the matrix once, term-major (per term: the documents that
+    contain it and their normalized weights), into .npy files in a directory named
+    after the source's hash. load() maps those files read-only, so all workers
+    share one copy in the page cache and startup does no fitting. A query reads
+    just the rows of its own terms.
+    """
+    ARRAYS = ("idf", "term_ptr", "doc_ids", "weights", "doc_entry")
+
+    def __init__(self, entries: List[Dict[str, Any]], vocabulary: Dict[str, int], arrays: Dict[str, np.ndarray],
+                 threshold: float = 0.45, margin: float = 0.1):
+        self.entries = entries
+        self.vocabulary = vocabulary
+        self.idf = arrays["idf"]
+        self.term_ptr = arrays["term_ptr"]
+        self.doc_ids = arrays["doc_ids"]
+        self.weights = arrays["weights"]
+        self.doc_entry = arrays["doc_entry"]
+        self.threshold = threshold
+        self.margin = margin
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+        self.seconds = 0.0
+
+    @staticmethod
+    def build(entries: List[Dict[str, Any]], directory: str):
+        documents, doc_entry = [], []
+        for e, entry in enumerate(entries):
+            for question in entry["questions"]:
+                documents.append(features(question))
+                doc_entry.append(e)
+        df = Counter(term for counts in documents for term in counts)
+        vocabulary = {term: i for i, term in enumerate(sorted(df))}
+        n = len(documents)
+        idf = np.array([math.log((1 + n) / (1 + df[term])) + 1 for term in sorted(df)], dtype=np.float32)
+
+        postings: List[List[Tuple[int, float]]] = [[] for _ in vocabulary]
+        for d, counts in enumerate(documents):
+            ids, weights = _tfidf(counts, vocabulary, idf)
+            for t, w in zip(ids.tolist(), weights.tolist()):
+                postings[t].append((d, w))
+        term_ptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        term_ptr[1:] = np.cumsum([len(p) for p in postings])
+        arrays = {
+            "idf": idf,
+            "term_ptr": term_ptr,
+            "doc_ids": np.array([d for p in postings for d, _ in p], dtype=np.int32),
+            "weights": np.array([w for p in postings for _, w in p], dtype=np.float32),
+            "doc_entry": np.array(doc_entry, dtype=np.int32),
+        }
+        os.makedirs(directory, exist_ok=True)
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, "vocabulary.json"), "w", encoding="utf-8") as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+        answers = [{k: v for k, v in entry.items() if k != "questions"} for entry in entries]
+        with open(os.path.join(directory, "entries.json"), "w", encoding="utf-8") as f:
+            json.dump(answers, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory: str, threshold: float = 0.45, margin: float = 0.1) -> "FAQIndex":
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in cls.ARRAYS}
+        with open(os.path.join(directory, "vocabulary.json"), encoding="utf-8") as f:
+            vocabulary = json.load(f)
+        with open(os.path.join(directory, "entries.json"), encoding="utf-8") as f:
+            entries = json.load(f)
+        return cls(entries, vocabulary, arrays, threshold, margin)
+
+    @classmethod
+    def open(cls, source_path: str, index_directory: str, threshold: float = 0.45, margin: float = 0.1) -> "FAQIndex":
+        """Load the index of the FAQ file at source_path, building it first if this version has none yet."""
+        with open(source_path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.blake2b(raw + f"\nfeatures={FEATURES_VERSION}".encode(), digest_size=8).hexdigest()
+        directory = os.path.join(index_directory, digest)
+        if not os.path.exists(os.path.join(directory, "entries.json")):
+            # Build beside it and rename into place, so a worker never loads a half-written index
+            staging = f"{directory}.tmp{os.getpid()}"
+            cls.build(json.loads(raw), staging)
+            try:
+                os.rename(staging, directory)
+            except OSError:
+                pass  # another worker got there first; theirs is identical
+        return cls.load(directory, threshold, margin)
+
+    def search(self, query: str) -> Tuple[Optional[Dict[str, Any]], float, float]:
+        """
+        Most similar entry, its cosine similarity and that of the runner-up entry,
+        whatever the threshold.
+        """
+        # An unseen term is as rare as a term can be
+        unknown_idf = math.log(1 + len(self.doc_entry)) + 1
+        ids, weights = _tfidf(features(query), self.vocabulary, self.idf, unknown_idf)
+        if not len(ids):
+            return None, 0.0, 0.0
+        scores = np.zeros(len(self.doc_entry), dtype=np.float32)
+        for t, w in zip(ids.tolist(), weights.tolist()):
+            start, end = self.term_ptr[t], self.term_ptr[t + 1]
+            scores[self.doc_ids[start:end]] += w * self.weights[start:end]
+        # Best phrasing per entry
+        entry_scores = np.zeros(len(self.entries), dtype=np.float32)
+        np.maximum.at(entry_scores, self.doc_entry, scores)
+        best = int(np.argmax(entry_scores))
+        runner_up = float(np.max(np.delete(entry_scores, best))) if len(entry_scores) > 1 else 0.0
+        return self.entries[best], float(entry_scores[best]), runner_up
+
+    def match(self, query: str) -> Optional[Dict[str, Any]]:
+        """The entry answering query if it is similar enough and clearly the best fit, else None."""
+        started = time.perf_counter()
+        entry, score, runner_up = self.search(query)
+        hit = entry is not None and score >= self.threshold and score - runner_up >= self.margin
+        with self._lock:
+            self.lookups += 1
+            self.hits += hit
+            self.seconds += time.perf_counter() - started
+        metrics.inc("faq_lookups_total", result="hit" if hit else "miss")
+        return entry if hit else None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "documents": len(self.doc_entry),
+                "terms": len(self.vocabulary),
+                "threshold": self.threshold,
+                "margin": self.margin,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+                "mean_lookup_ms": 1000 * self.seconds / self.lookups if self.lookups else 0.0,
+            }
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from config import settings
+
+
+class InferencePool:
+    """
+    A bounded thread pool for one family of models (tabular, vision, asr, nlp).
+    sklearn, shapely, OpenCV and torch release the GIL inside their native code,
+    so threads give real parallelism while the models stay loaded once per process.
+    Tracks queue depth so a saturated model family is visible from outside.
+    """
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=f"inference-{name}")
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_queued = 0
+
+    def _call(self, fn: Callable, args, kwargs):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException:
+            with self._lock:
+                self.running -= 1
+                self.failed += 1
+            raise
+        with self._lock:
+            self.running -= 1
+            self.completed += 1
+        return result
+
+    def _dequeue_cancelled(self, future: Future):
+        # A job cancelled before a worker picked it up never reaches _call
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except BaseException:
+            with self._lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._dequeue_cancelled)
+        return future
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) on the pool without blocking the event loop. If the
+        caller is cancelled (a client disconnect, say) before the job starts, the job
+        is dropped from the queue.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "failed": self.failed,
+                "max_queued": self.max_queued,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+
+class InferencePools:
+    """Registry of per-model-family pools, sized from settings."""
+    def __init__(self, sizes: Dict[str, int]):
+        self._pools = {name: InferencePool(name, size) for name, size in sizes.items()}
+
+    def pool(self, name: str) -> InferencePool:
+        return self._pools[name]
+
+    async def run(self, name: str, fn: Callable, *args, **kwargs) -> Any:
+        return await self._pools[name].run(fn, *args, **kwargs)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    def shutdown(self, wait: bool = True):
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+
+
+# Singleton
+inference_pools = InferencePools({
+    "tabular": settings.INFERENCE_TABULAR_WORKERS,
+    "vision": settings.INFERENCE_VISION_WORKERS,
+    "asr": settings.INFERENCE_ASR_WORKERS,
+    "nlp": settings.INFERENCE_NLP_WORKERS,
+})
@@ -0,0 +1,82 @@
+import re
+from typing import Dict, Iterable, List, Mapping, Set
+
+# A word character is a letter/digit or a combining mark/joiner, so Indic words keep
+# their vowel signs and viramas ("हूँ" is one word; Python's \w alone splits it).
+# The Devanagari dandas (U+0964, U+0965) are punctuation, not letters.
+_WORD_CHAR = r"(?:[^\W_]|[\u0300-\u036f\u0900-\u0963\u0966-\u0dff\u200c\u200d])"
+_WORD = re.compile(f"{_WORD_CHAR}+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens of text; one C-level regex pass."""
+    return _WORD.findall(text.lower())
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation factored into a character trie ("help|hurt" -> "h(?:elp|urt)"),
+    so the engine follows one path per position instead of retrying every keyword.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        return f"(?:{'|'.join(branches)})" + ("?" if optional else "")
+
+    return emit(trie)
+
+
+class KeywordMatcher:
+    """
+    All keywords of several labelled tables compiled into one trie-shaped regex,
+    built once. scan() makes a single pass over the text and reports every keyword
+    of every table, so language, urgency and info flags come from the same scan
+    instead of one substring search per keyword.
+
+    A keyword must start at a word boundary, so "at" no longer matches inside
+    "that", but may run on into a suffix, so "danger" still matches "dangerous"
+    and "help" matches "helpless". Keywords of up to SHORT_KEYWORD characters
+    must also end at a word boundary ("at" does not match "attic"). Multi-word
+    keywords ("खो गया") match with the same spacing as in the table. Where two
+    keywords start at the same word the longest wins.
+    """
+    SHORT_KEYWORD = 2
+
+    def __init__(self, tables: Mapping[str, Iterable[str]]):
+        self._labels: Dict[str, List[str]] = {}
+        for label, keywords in tables.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    self._labels.setdefault(keyword, []).append(label)
+        self._pattern = None
+        if self._labels:
+            long_words = [k for k in self._labels if len(k) > self.SHORT_KEYWORD]
+            short_words = [k for k in self._labels if len(k) <= self.SHORT_KEYWORD]
+            branches = []
+            if long_words:
+                branches.append(_trie_pattern(long_words))
+            if short_words:
+                branches.append(f"{_trie_pattern(short_words)}(?!{_WORD_CHAR})")
+            self._pattern = re.compile(f"(?<!{_WORD_CHAR})((?:{')|(?:'.join(branches)}))")
+
+    def scan(self, text: str) -> Dict[str, Set[str]]:
+        """Keywords found in text, grouped by table label."""
+        hits: Dict[str, Set[str]] = {}
+        if self._pattern is None:
+            return hits
+        for keyword in self._pattern.findall(text.lower()):
+            for label in self._labels[keyword]:
+                hits.setdefault(label, set()).add(keyword)
+        return hits
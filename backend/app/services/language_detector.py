@@ -0,0 +1,158 @@
+import math
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+# Unicode blocks of the scripts we route on; everything else (digits, punctuation,
+# emoji, spaces) is "other" and does not vote.
+SCRIPT_BLOCKS: Tuple[Tuple[str, int, int], ...] = (
+    ("latin", 0x0041, 0x024F),
+    ("devanagari", 0x0900, 0x097F),
+    ("bengali", 0x0980, 0x09FF),
+    ("gurmukhi", 0x0A00, 0x0A7F),
+    ("gujarati", 0x0A80, 0x0AFF),
+    ("oriya", 0x0B00, 0x0B7F),
+    ("tamil", 0x0B80, 0x0BFF),
+    ("telugu", 0x0C00, 0x0C7F),
+    ("kannada", 0x0C80, 0x0CFF),
+    ("malayalam", 0x0D00, 0x0D7F),
+)
+
+SCRIPT_LANGUAGES: Dict[str, str] = {
+    "latin": "english",
+    "bengali": "bengali",
+    "gurmukhi": "punjabi",
+    "gujarati": "gujarati",
+    "oriya": "odia",
+    "tamil": "tamil",
+    "telugu": "telugu",
+    "kannada": "kannada",
+    "malayalam": "malayalam",
+}
+
+# Seed text for the Devanagari n-gram model: everyday and emergency phrasing
+_DEVANAGARI_SAMPLES: Dict[str, str] = {
+    "hindi": (
+        "मदद करो मैं खो गया हूँ मुझे रास्ता नहीं मिल रहा है कृपया जल्दी आइए "
+        "मेरा दोस्त घायल है हमें अस्पताल जाना है यहाँ बहुत खतरा है दुर्घटना हो गई है "
+        "मैं पहाड़ी पर हूँ और मेरे पास पानी नहीं है पुलिस को बुलाइए मेरा फोन बंद हो रहा है "
+        "हम मंदिर के पास हैं बच्चा कहीं चला गया है क्या आप मेरी मदद कर सकते हैं "
+        "मुझे डर लग रहा है कोई यहाँ नहीं है होटल का पता क्या है"
+    ),
+    "marathi": (
+        "मदत करा मी हरवलो आहे मला रस्ता सापडत नाही कृपया लवकर या "
+        "माझा मित्र जखमी झाला आहे आम्हाला रुग्णालयात जायचे आहे इथे खूप धोका आहे अपघात झाला आहे "
+        "मी डोंगरावर आहे आणि माझ्याकडे पाणी नाही पोलिसांना बोलवा माझा फोन बंद होत आहे "
+        "आम्ही मंदिराजवळ आहोत मुलगा कुठेतरी गेला आहे तुम्ही मला मदत करू शकता का "
+        "मला भीती वाटते इथे कोणी नाही हॉटेलचा पत्ता काय आहे"
+    ),
+}
+
+
+def _trigrams(text: str) -> List[str]:
+    padded = f" {' '.join(text.split())} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class _TrigramModel:
+    """Add-one smoothed character-trigram log-likelihood per language."""
+    def __init__(self, samples: Dict[str, str]):
+        self.languages = list(samples)
+        counts = {lang: Counter(_trigrams(text)) for lang, text in samples.items()}
+        vocabulary = len(set().union(*counts.values())) + 1
+        self._log_probs: Dict[str, Dict[str, float]] = {}
+        self._unseen: Dict[str, float] = {}
+        for lang, lang_counts in counts.items():
+            log_total = math.log(sum(lang_counts.values()) + vocabulary)
+            self._log_probs[lang] = {g: math.log(n + 1) - log_total for g, n in lang_counts.items()}
+            self._unseen[lang] = -log_total
+
+    def classify(self, text: str) -> str:
+        grams = _trigrams(text)
+        best, best_score = self.languages[0], -math.inf
+        for lang in self.languages:
+            log_probs, unseen = self._log_probs[lang], self._unseen[lang]
+            score = sum(log_probs.get(g, unseen) for g in grams)
+            if score > best_score:
+                best, best_score = lang, score
+        return best
+
+
+class ScriptLanguageDetector:
+    """
+    Language from the dominant Unicode script. Text is viewed as a UTF-32 code-point
+    array and mapped through a lookup table to script ids, so the histogram is a
+    couple of numpy passes; detect_many does the same for a whole batch of messages
+    at once. Only scripts shared by several languages (Devanagari: Hindi, Marathi)
+    go on to the character-trigram model, and only for the messages that need it.
+    """
+    SHARED_SCRIPTS = {"devanagari": _DEVANAGARI_SAMPLES}
+
+    def __init__(self, default: str = "english"):
+        self.default = default
+        self.scripts = [name for name, _, _ in SCRIPT_BLOCKS]
+        top = max(end for _, _, end in SCRIPT_BLOCKS) + 1
+        # Script id per code point below top; id 0 is "other", and top itself
+        # collects everything above the table
+        self._lut = np.zeros(top + 1, dtype=np.intp)
+        for script_id, (_, start, end) in enumerate(SCRIPT_BLOCKS, start=1):
+            self._lut[start:end + 1] = script_id
+        self._top = top
+        self._ngram_models = {script: _TrigramModel(samples) for script, samples in self.SHARED_SCRIPTS.items()}
+        # Per script id, for detect_many: the language, or the n-gram model deciding it
+        self._script_language = np.array(
+            [default] + [SCRIPT_LANGUAGES.get(script, default) for script in self.scripts], dtype=object
+        )
+        self._ngram_rows = {
+            self.scripts.index(script) + 1: model for script, model in self._ngram_models.items()
+        }
+
+    def siblings(self, language: str) -> List[str]:
+        """Languages written in the same script as language (itself included)."""
+        for model in self._ngram_models.values():
+            if language in model.languages:
+                return list(model.languages)
+        return [language]
+
+    def _script_ids(self, text: str) -> np.ndarray:
+        code_points = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        return self._lut[np.minimum(code_points, self._top)]
+
+    def script_histogram(self, text: str) -> Dict[str, int]:
+        counts = np.bincount(self._script_ids(text), minlength=len(self.scripts) + 1)
+        return {script: int(n) for script, n in zip(self.scripts, counts[1:]) if n}
+
+    def _language(self, script_counts: np.ndarray, text: str) -> str:
+        if not script_counts.any():
+            return self.default
+        script = self.scripts[int(np.argmax(script_counts))]
+        model = self._ngram_models.get(script)
+        if model is not None:
+            return model.classify(text)
+        return SCRIPT_LANGUAGES.get(script, self.default)
+
+    def detect(self, text: str) -> str:
+        counts = np.bincount(self._script_ids(text), minlength=len(self.scripts) + 1)
+        return self._language(counts[1:], text)
+
+    def detect_many(self, texts: Sequence[str]) -> List[str]:
+        """detect() for a batch: one encode and one bincount over all messages."""
+        if not len(texts):
+            return []
+        lengths = np.fromiter((len(t) for t in texts), dtype=np.intp, count=len(texts))
+        script_ids = self._script_ids("".join(texts))
+        message = np.repeat(np.arange(len(texts)), lengths)
+        width = len(self.scripts) + 1
+        counts = np.bincount(message * width + script_ids, minlength=len(texts) * width)
+        counts = counts.reshape(len(texts), width)[:, 1:]
+        dominant = np.where(counts.any(axis=1), counts.argmax(axis=1) + 1, 0)
+        languages = list(self._script_language[dominant])
+        for script_id, model in self._ngram_rows.items():
+            for i in np.flatnonzero(dominant == script_id):
+                languages[i] = model.classify(texts[i])
+        return languages
+
+
+# Singleton
+language_detector = ScriptLanguageDetector()
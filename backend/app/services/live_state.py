@@ -0,0 +1,183 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# One fixed-size row per tourist; 66 bytes, so 1M tourists is ~63 MB plus the id index.
+LIVE_STATE_DTYPE = np.dtype([
+    ("lat", "f4"),
+    ("lng", "f4"),
+    ("last_seen", "u4"),              # unix seconds of the last ping, 0 = never
+    ("safety_score", "i1"),           # 1-10, 0 = unknown
+    ("location_risk", "i1"),          # 1-10, 0 = unknown
+    ("zone", "i4"),                   # index into the zone table, -1 = outside all zones
+    ("incident_probability", "f4"),   # NaN = not predicted
+    ("tourist_flow", "i4"),           # -1 = not predicted
+    # Inputs the cached outputs above were computed from (see SmartTouristSafetySystem)
+    ("geo_lat", "f4"),                # position the geofence stage last ran at
+    ("geo_lng", "f4"),
+    ("geo_version", "u4"),            # GeoFencingSystem.version at that time
+    ("safety_key", "i8"),             # hash of the safety model inputs
+    ("flow_key", "i8"),               # hash of (location_id, time bucket)
+    ("incident_key", "i8"),           # hash of the incident model inputs
+    ("computed_at", "u4"),            # unix seconds of the last full recompute, 0 = never
+])
+
+HIGH_RISK_SAFETY_SCORE = 3
+HIGH_RISK_LOCATION_RISK = 8
+HIGH_RISK_INCIDENT_PROBABILITY = 0.7
+
+
+def stored_probability(value: float) -> float:
+    """
+    value as the f4 incident_probability column reads it back, rounded to the six
+    decimals f4 keeps, so a cached probability and a fresh one print the same.
+    """
+    return round(float(np.float32(value)), 6)
+
+
+def high_risk_rows(rows: np.ndarray) -> np.ndarray:
+    """Boolean mask of LIVE_STATE_DTYPE rows that count as high risk."""
+    safety = rows["safety_score"]
+    return (
+        ((safety > 0) & (safety <= HIGH_RISK_SAFETY_SCORE))
+        | (rows["location_risk"] >= HIGH_RISK_LOCATION_RISK)
+        | (rows["incident_probability"] >= HIGH_RISK_INCIDENT_PROBABILITY)
+    )
+
+
+class LiveStateStore:
+    """
+    Columnar last-known state for every tourist.
+    Rows live in one preallocated NumPy structured array addressed through an
+    id -> slot index, so fleet-wide questions (how many active, how many high risk,
+    who is in zone X) are single vectorized passes instead of loops over dicts.
+    """
+    def __init__(self, capacity: int = 1024):
+        self._rows = self._empty(max(1, capacity))
+        self._slots: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._zone_codes: Dict[str, int] = {}
+        self._zone_names: List[str] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _empty(capacity: int) -> np.ndarray:
+        rows = np.zeros(capacity, dtype=LIVE_STATE_DTYPE)
+        rows["lat"] = np.nan
+        rows["lng"] = np.nan
+        rows["zone"] = -1
+        rows["incident_probability"] = np.nan
+        rows["tourist_flow"] = -1
+        rows["geo_lat"] = np.nan
+        rows["geo_lng"] = np.nan
+        return rows
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def capacity(self) -> int:
+        return len(self._rows)
+
+    def memory_bytes(self) -> int:
+        return self._rows.nbytes
+
+    def _slot(self, tourist_id: str) -> int:
+        slot = self._slots.get(tourist_id)
+        if slot is None:
+            slot = len(self._ids)
+            if slot >= len(self._rows):
+                grown = self._empty(len(self._rows) * 2)
+                grown[:len(self._rows)] = self._rows
+                self._rows = grown
+            self._slots[tourist_id] = slot
+            self._ids.append(tourist_id)
+        return slot
+
+    def _zone_code(self, zone_id: Optional[str]) -> int:
+        if zone_id is None:
+            return -1
+        code = self._zone_codes.get(zone_id)
+        if code is None:
+            code = self._zone_codes[zone_id] = len(self._zone_names)
+            self._zone_names.append(zone_id)
+        return code
+
+    def update(self, tourist_ids: Iterable[str], zones: Optional[Iterable[Optional[str]]] = None, **columns):
+        """
+        Write one row per tourist id. columns are aligned sequences named after
+        LIVE_STATE_DTYPE fields; columns that are not passed keep their previous value.
+        last_seen defaults to now.
+        """
+        tourist_ids = list(tourist_ids)
+        if not tourist_ids:
+            return
+        unknown = set(columns) - set(LIVE_STATE_DTYPE.names)
+        if unknown:
+            raise KeyError(f"Unknown live-state columns: {sorted(unknown)}")
+        columns.setdefault("last_seen", np.full(len(tourist_ids), int(time.time())))
+        with self._lock:
+            slots = np.fromiter((self._slot(t) for t in tourist_ids), dtype=np.int64, count=len(tourist_ids))
+            if zones is not None:
+                columns["zone"] = [self._zone_code(z) for z in zones]
+            for name, values in columns.items():
+                self._rows[name][slots] = values
+
+    def snapshot(self, tourist_ids: Iterable[str]) -> np.ndarray:
+        """Copy of the rows for tourist_ids, in order; unknown ids get an empty row."""
+        slots = np.array([self._slots.get(t, -1) for t in tourist_ids], dtype=np.int64)
+        rows = self._rows[np.maximum(slots, 0)]
+        rows[slots < 0] = self._empty(1)[0]
+        return rows
+
+    def get(self, tourist_id: str) -> Optional[dict]:
+        slot = self._slots.get(tourist_id)
+        if slot is None:
+            return None
+        row = self._rows[slot]
+        zone = int(row["zone"])
+        return {
+            "tourist_id": tourist_id,
+            "latitude": None if np.isnan(row["lat"]) else float(row["lat"]),
+            "longitude": None if np.isnan(row["lng"]) else float(row["lng"]),
+            "last_seen": int(row["last_seen"]),
+            "safety_score": int(row["safety_score"]) or None,
+            "location_risk": int(row["location_risk"]) or None,
+            "zone_id": self._zone_names[zone] if zone >= 0 else None,
+            "incident_probability": None if np.isnan(row["incident_probability"]) else float(row["incident_probability"]),
+            "tourist_flow": int(row["tourist_flow"]) if row["tourist_flow"] >= 0 else None,
+        }
+
+    def zone_names(self, codes: Iterable[int]) -> List[Optional[str]]:
+        """Zone ids for values of the zone column (None for -1)."""
+        return [self._zone_names[c] if c >= 0 else None for c in codes]
+
+    # Vectorized fleet queries
+
+    def _view(self) -> np.ndarray:
+        return self._rows[:len(self._ids)]
+
+    def active_mask(self, window_seconds: float, now: Optional[float] = None) -> np.ndarray:
+        now = time.time() if now is None else now
+        return self._view()["last_seen"] >= now - window_seconds
+
+    def high_risk_mask(self) -> np.ndarray:
+        return high_risk_rows(self._view())
+
+    def count_active(self, window_seconds: float, now: Optional[float] = None) -> int:
+        return int(np.count_nonzero(self.active_mask(window_seconds, now)))
+
+    def count_high_risk(self, window_seconds: float, now: Optional[float] = None) -> int:
+        return int(np.count_nonzero(self.active_mask(window_seconds, now) & self.high_risk_mask()))
+
+    def zone_counts(self, window_seconds: float, now: Optional[float] = None) -> Dict[str, int]:
+        zones = self._view()["zone"][self.active_mask(window_seconds, now)]
+        counts = np.bincount(zones[zones >= 0], minlength=len(self._zone_names))
+        return {name: int(count) for name, count in zip(self._zone_names, counts) if count}
+
+    def tourists_in_bbox(self, min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> List[str]:
+        rows = self._view()
+        mask = (rows["lat"] >= min_lat) & (rows["lat"] <= max_lat) & (rows["lng"] >= min_lng) & (rows["lng"] <= max_lng)
+        return [self._ids[i] for i in np.flatnonzero(mask)]
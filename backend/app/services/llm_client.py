@@ -0,0 +1,159 @@
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from services.metrics import metrics
+
+try:
+    import httpx  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    httpx = None
+
+metrics.describe("llm_requests_total", "Chat completion calls by result (ok, timeout, busy, error)")
+
+
+class LLMClient:
+    """
+    Async client for an OpenAI-compatible chat completions endpoint.
+
+    Calls share one pooled HTTP/1.1 client (keep-alive connections, so no TLS
+    handshake per query) and at most max_concurrency run at once. Every call has a
+    deadline covering both the wait for a slot and the request itself; on timeout
+    or any error complete() returns None and the caller answers from its template,
+    so a slow or failing model never holds up a worker. stream() yields the
+    completion token by token under the same slot and deadline rules.
+
+    The HTTP client and semaphore belong to the event loop that first uses them and
+    are rebuilt if a different loop (a new TestClient, say) calls in.
+    """
+    def __init__(self, api_key: str, base_url: str = "https://api.openai.com/v1", model: str = "gpt-3.5-turbo",
+                 timeout_seconds: float = 8.0, max_concurrency: int = 16, max_connections: int = 32):
+        if httpx is None:
+            raise RuntimeError("httpx is required for LLM calls")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout_seconds
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_connections = max(1, max_connections)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.results: Dict[str, int] = {"ok": 0, "timeout": 0, "busy": 0, "error": 0}
+
+    def _bind(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {self.api_key}"},
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections),
+                timeout=httpx.Timeout(self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client, self._semaphore
+
+    def _record(self, result: str):
+        self.results[result] += 1
+        metrics.inc("llm_requests_total", result=result)
+
+    def _body(self, messages: List[Dict[str, str]], max_tokens: int, temperature: float, **extra) -> Dict[str, Any]:
+        return {"model": self.model, "messages": messages, "max_tokens": max_tokens,
+                "temperature": temperature, **extra}
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int = 200, temperature: float = 0.7,
+                       timeout: Optional[float] = None) -> Optional[str]:
+        """The completion text, or None if it failed or did not arrive within timeout seconds."""
+        client, semaphore = self._bind()
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self._record("busy")
+            return None
+        self.in_flight += 1
+        try:
+            with metrics.timer("stage_duration_seconds", component="chatbot", stage="llm"):
+                response = await asyncio.wait_for(
+                    client.post("/chat/completions", json=self._body(messages, max_tokens, temperature)),
+                    max(0.0, deadline - time.monotonic()),
+                )
+            response.raise_for_status()
+            text = response.json()["choices"][0]["message"]["content"]
+        except asyncio.TimeoutError:
+            self._record("timeout")
+            return None
+        except Exception:
+            self._record("error")
+            return None
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+        self._record("ok")
+        return text or None
+
+    async def stream(self, messages: List[Dict[str, str]], max_tokens: int = 200, temperature: float = 0.7,
+                     timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Completion text deltas as the server streams them (server-sent events).
+        Unlike complete(), a missed deadline raises asyncio.TimeoutError and a failed
+        call raises its error, after whatever arrived in time was yielded, so the
+        caller knows the text is cut short.
+        """
+        client, semaphore = self._bind()
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            self._record("busy")
+            raise
+        self.in_flight += 1
+        result = "ok"
+        try:
+            with metrics.timer("stage_duration_seconds", component="chatbot", stage="llm_stream"):
+                request = client.build_request(
+                    "POST", "/chat/completions", json=self._body(messages, max_tokens, temperature, stream=True)
+                )
+                response = await asyncio.wait_for(client.send(request, stream=True), max(0.0, deadline - time.monotonic()))
+                try:
+                    response.raise_for_status()
+                    lines = response.aiter_lines()
+                    while True:
+                        try:
+                            line = await asyncio.wait_for(lines.__anext__(), max(0.0, deadline - time.monotonic()))
+                        except StopAsyncIteration:
+                            break
+                        if not line.startswith("data:"):
+                            continue
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        delta = (json.loads(data)["choices"][0].get("delta") or {}).get("content")
+                        if delta:
+                            yield delta
+                finally:
+                    await response.aclose()
+        except asyncio.TimeoutError:
+            result = "timeout"
+            raise
+        except Exception:
+            result = "error"
+            raise
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+            self._record(result)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"model": self.model, "in_flight": self.in_flight, "max_concurrency": self.max_concurrency,
+                "timeout_seconds": self.timeout, **self.results}
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
@@ -0,0 +1,140 @@
+import json
+import math
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+import pandas as pd
+
+# Fields that end up in the batch's float feature arrays, with their allowed range
+NUMERIC_FIELDS = {
+    "latitude": (-90.0, 90.0),
+    "longitude": (-180.0, 180.0),
+    "location_risk": (None, None),
+    "group_size": (None, None),
+    "age": (None, None),
+    "health_score": (None, None),
+    "experience_level_score": (None, None),
+    "weather_score": (None, None),
+    "visibility_score": (None, None),
+}
+MODEL_FIELDS = tuple(NUMERIC_FIELDS) + ("location_id", "timestamp", "experience_level", "has_itinerary")
+
+
+class PingParseError(ValueError):
+    """Raised for an NDJSON line that is not a usable ping object."""
+
+
+def _number(field: str, value: Any) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise PingParseError(f"{field} must be a number")
+    try:
+        number = float(value)
+    except ValueError:
+        raise PingParseError(f"{field} must be a number")
+    low, high = NUMERIC_FIELDS.get(field, (None, None))
+    if not math.isfinite(number) or (low is not None and not low <= number <= high):
+        raise PingParseError(f"{field} out of range")
+    return number
+
+
+def _location_id(value: Any) -> int:
+    number = _number("location_id", value)
+    if not number.is_integer():
+        raise PingParseError("location_id must be an integer")
+    return int(number)
+
+
+def _timestamp(value: Any) -> str:
+    """ISO timestamp as naive wall-clock time (how the flow features read it), so a batch never mixes zones."""
+    if not isinstance(value, str):
+        raise PingParseError("timestamp must be an ISO 8601 string")
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = pd.to_datetime(value)
+        except (ValueError, OverflowError):
+            raise PingParseError("timestamp is not a valid date")
+        if pd.isna(parsed):
+            raise PingParseError("timestamp is not a valid date")
+        dt = parsed.to_pydatetime()
+    return dt.replace(tzinfo=None).isoformat()
+
+
+def _validate(data: Dict[str, Any]) -> Dict[str, Any]:
+    # An explicit null means "not sent", so the models fall back to their defaults
+    for field in MODEL_FIELDS:
+        if field in data and data[field] is None:
+            del data[field]
+    for field in NUMERIC_FIELDS:
+        if field in data:
+            number = _number(field, data[field])
+            # Keep ints as ints so cache keys match pings sent as JSON numbers
+            data[field] = int(number) if isinstance(data[field], int) else number
+    if "location_id" in data:
+        data["location_id"] = _location_id(data["location_id"])
+    if "timestamp" in data:
+        data["timestamp"] = _timestamp(data["timestamp"])
+    # Unknown levels score as intermediate in the safety model, but must still be a label
+    if "experience_level" in data and not isinstance(data["experience_level"], str):
+        raise PingParseError("experience_level must be a string")
+    if "has_itinerary" in data and not isinstance(data["has_itinerary"], bool):
+        raise PingParseError("has_itinerary must be true or false")
+    return data
+
+
+def parse_ping(line: bytes) -> Tuple[str, Dict[str, Any]]:
+    """
+    Decode one NDJSON line into (tourist_id, data_update).
+    The line is the same flat dict process_tourist_data accepts plus a tourist_id key.
+    Every field the models read (coordinates, numeric profile and environment
+    scores, location_id, timestamp, experience_level, has_itinerary) is coerced
+    and checked here, so one bad ping is rejected on its own line instead of
+    failing the model calls for its whole micro-batch.
+    """
+    try:
+        obj = json.loads(line)
+    except ValueError as e:
+        raise PingParseError(f"invalid JSON: {e}")
+    if not isinstance(obj, dict):
+        raise PingParseError("ping must be a JSON object")
+    tourist_id = obj.pop("tourist_id", None)
+    if not tourist_id:
+        raise PingParseError("missing tourist_id")
+    return str(tourist_id), _validate(obj)
+
+
+async def iter_ndjson_batches(chunks: AsyncIterator[bytes], batch_size: int) -> AsyncIterator[List[Tuple[int, Any]]]:
+    """
+    Split a streamed NDJSON body into micro-batches of at most batch_size lines.
+
+    Yields lists of (line_number, parsed) where parsed is either a
+    (tourist_id, data_update) tuple or a PingParseError, so callers can keep
+    the output in the same order as the input. Blank lines are skipped.
+    """
+    batch: List[Tuple[int, Any]] = []
+    buffer = b""
+    line_number = 0
+
+    def take(line: bytes):
+        try:
+            return parse_ping(line)
+        except PingParseError as e:
+            return e
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            batch.append((line_number, take(line)))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+    if buffer.strip():
+        batch.append((line_number + 1, take(buffer)))
+    if batch:
+        yield batch
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+class _Entry:
+    __slots__ = ("factory", "warm", "fallbacks", "instance", "state", "error", "degraded", "seconds", "lock")
+
+    def __init__(self, factory: Callable[[], Any], warm: bool, fallbacks: Optional[Callable[[Any], List[str]]]):
+        self.factory = factory
+        self.warm = warm
+        self.fallbacks = fallbacks
+        self.instance = None
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.degraded: List[str] = []
+        self.seconds: Optional[float] = None
+        self.lock = threading.Lock()
+
+
+class ServiceRegistry:
+    """
+    Heavy components (model pipelines, network weights) by name, each built once by
+    its factory: on first use, or ahead of traffic by warm_up() on a background
+    thread, so importing the app and serving lightweight endpoints never waits for
+    them. ready() turns true once every component registered with warm=True is
+    built, which is what a readiness probe should gate traffic on.
+
+    A failed build is reported by status() and retried on the next get(). A component
+    that built but runs some parts on a fallback (a model artifact that is not shipped,
+    answered with defaults) still counts as ready; register it with fallbacks, a
+    function of the instance naming those parts, and status() lists them as degraded.
+    """
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._warm_thread: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any], warm: bool = True,
+                 fallbacks: Optional[Callable[[Any], List[str]]] = None):
+        self._entries[name] = _Entry(factory, warm, fallbacks)
+
+    def get(self, name: str) -> Any:
+        """The component, building it on this thread if nobody has yet (blocks while another thread builds it)."""
+        entry = self._entries[name]
+        if entry.state == "ready":
+            return entry.instance
+        with entry.lock:
+            if entry.state != "ready":
+                entry.state = "loading"
+                started = time.perf_counter()
+                try:
+                    entry.instance = entry.factory()
+                    entry.degraded = list(entry.fallbacks(entry.instance)) if entry.fallbacks else []
+                except Exception as e:
+                    entry.state, entry.error = "failed", str(e)
+                    raise
+                entry.seconds = time.perf_counter() - started
+                entry.state, entry.error = "ready", None
+        return entry.instance
+
+    async def aget(self, name: str) -> Any:
+        """get() for async endpoints: a component that is not built yet is built (or awaited) off the event loop."""
+        entry = self._entries[name]
+        if entry.state == "ready":
+            return entry.instance
+        return await asyncio.get_running_loop().run_in_executor(None, self.get, name)
+
+    def peek(self, name: str) -> Any:
+        """The component if it is already built, else None; never builds."""
+        entry = self._entries[name]
+        return entry.instance if entry.state == "ready" else None
+
+    def warm_up(self) -> threading.Thread:
+        """Build every warm component, in registration order, on a background thread."""
+        def run():
+            for name, entry in list(self._entries.items()):
+                if entry.warm:
+                    try:
+                        self.get(name)
+                    except Exception as e:
+                        print(f"Warm-up of {name} failed: {e}")
+
+        if self._warm_thread is None or not self._warm_thread.is_alive():
+            self._warm_thread = threading.Thread(target=run, name="service-warm-up", daemon=True)
+            self._warm_thread.start()
+        return self._warm_thread
+
+    def ready(self) -> bool:
+        return all(entry.state == "ready" for entry in self._entries.values() if entry.warm)
+
+    def degraded(self) -> List[str]:
+        """Built components that run some parts on a fallback."""
+        return [name for name, entry in self._entries.items() if entry.state == "ready" and entry.degraded]
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"state": entry.state, "load_seconds": entry.seconds, "error": entry.error,
+                   "degraded": entry.degraded}
+            for name, entry in self._entries.items()
+        }
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from services.metrics import DEFAULT_BUCKETS, metrics
+from services.stream_aggregator import SlidingWindowHistogram
+
+# Lowest emergency level of each priority class, most urgent first
+PRIORITY_CLASSES: Tuple[Tuple[int, str], ...] = ((9, "critical"), (7, "high"), (5, "medium"), (0, "low"))
+
+metrics.describe("sms_queue_wait_seconds", "Time a bulk SMS waited in the triage queue, by priority class")
+
+
+def priority_class(level: int) -> str:
+    for floor, name in PRIORITY_CLASSES:
+        if level >= floor:
+            return name
+    return PRIORITY_CLASSES[-1][1]
+
+
+class SMSPriorityQueue:
+    """
+    Bounded priority queue of pre-scored SMS messages: highest emergency level
+    first, arrival order within a level (heapq on (-level, sequence)). pop() records
+    how long each message waited, per priority class, both as a Prometheus histogram
+    and as recent percentiles for stats().
+
+    When full, new messages are rejected unless they are critical, so a flood of
+    low-urgency chatter can never push out an SOS.
+    """
+    def __init__(self, max_size: int = 100000, wait_window_seconds: float = 300):
+        self.max_size = max(1, max_size)
+        self._heap: List[Tuple[int, int, float, Any]] = []
+        self._sequence = itertools.count()
+        self._not_empty = threading.Condition()
+        self._classes = {
+            name: {"queued": 0, "enqueued": 0, "processed": 0, "rejected": 0,
+                   "wait": SlidingWindowHistogram(wait_window_seconds, bounds=DEFAULT_BUCKETS)}
+            for _, name in PRIORITY_CLASSES
+        }
+
+    def __len__(self) -> int:
+        with self._not_empty:
+            return len(self._heap)
+
+    def push_many(self, messages: Sequence[Any], levels: Sequence[int]) -> Dict[str, Dict[str, int]]:
+        """Enqueue messages with their pre-scored levels; accepted/rejected counts per class."""
+        now = time.time()
+        counts = {name: {"accepted": 0, "rejected": 0} for _, name in PRIORITY_CLASSES}
+        with self._not_empty:
+            for message, level in zip(messages, levels):
+                name = priority_class(level)
+                if len(self._heap) >= self.max_size and name != "critical":
+                    counts[name]["rejected"] += 1
+                    self._classes[name]["rejected"] += 1
+                    continue
+                heapq.heappush(self._heap, (-level, next(self._sequence), now, message))
+                counts[name]["accepted"] += 1
+                self._classes[name]["queued"] += 1
+                self._classes[name]["enqueued"] += 1
+            self._not_empty.notify(sum(c["accepted"] for c in counts.values()))
+        return {name: c for name, c in counts.items() if c["accepted"] or c["rejected"]}
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[Tuple[int, Any, float]]:
+        """Most urgent (level, message, seconds waited), or None after timeout."""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._heap, timeout):
+                return None
+            negative_level, _, enqueued, message = heapq.heappop(self._heap)
+            now = time.time()
+            waited = now - enqueued
+            name = priority_class(-negative_level)
+            self._classes[name]["queued"] -= 1
+            self._classes[name]["processed"] += 1
+            self._classes[name]["wait"].observe(waited, now)
+        metrics.observe("sms_queue_wait_seconds", waited, priority=name)
+        return -negative_level, message, waited
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._not_empty:
+            by_priority = {}
+            for name, state in self._classes.items():
+                wait = state["wait"]
+                by_priority[name] = {
+                    "queued": state["queued"],
+                    "enqueued": state["enqueued"],
+                    "processed": state["processed"],
+                    "rejected": state["rejected"],
+                    "wait_seconds_mean": wait.mean(now),
+                    "wait_seconds_p50": wait.percentile(0.5, now),
+                    "wait_seconds_p99": wait.percentile(0.99, now),
+                }
+            return {"queued": len(self._heap), "max_size": self.max_size, "by_priority": by_priority}
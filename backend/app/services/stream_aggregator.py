@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, Optional, Sequence
+
+# Upper bounds (seconds) of the response-time histogram bins; the last bin is open-ended
+RESPONSE_TIME_BOUNDS = (30, 60, 120, 180, 300, 450, 600, 900, 1200, 1800, 2700, 3600, 5400, 7200, 14400)
+
+
+class SlidingWindowCounter:
+    """
+    Event count over the last window_seconds, kept in fixed time buckets.
+    add() touches only the newest bucket and expiry drops whole buckets from the
+    running total, so both are O(1) amortized and total() is a field read.
+    """
+    def __init__(self, window_seconds: float, buckets: int = 60):
+        self.bucket_seconds = max(1e-3, window_seconds / buckets)
+        self.buckets = buckets
+        self._counts = deque()  # [bucket index, count], oldest first
+        self._total = 0
+
+    def _expire(self, bucket: int):
+        while self._counts and self._counts[0][0] <= bucket - self.buckets:
+            self._total -= self._counts.popleft()[1]
+
+    def add(self, now: float, count: int = 1):
+        bucket = int(now // self.bucket_seconds)
+        self._expire(bucket)
+        if self._counts and self._counts[-1][0] >= bucket:
+            self._counts[-1][1] += count
+        else:
+            self._counts.append([bucket, count])
+        self._total += count
+
+    def total(self, now: float) -> int:
+        self._expire(int(now // self.bucket_seconds))
+        return self._total
+
+
+class SlidingActiveSet:
+    """
+    Distinct ids seen in the last window_seconds, plus how many of them were
+    flagged on their latest event (e.g. high risk).
+    Each id sits in the bucket of its latest event; a repeat event moves it to the
+    newest bucket and an expiring bucket evicts its ids, so every id is inserted
+    and evicted once per stay: O(1) amortized per event, O(1) per count.
+    """
+    def __init__(self, window_seconds: float, buckets: int = 60):
+        self.bucket_seconds = max(1e-3, window_seconds / buckets)
+        self.buckets = buckets
+        self._bucket_of: Dict[str, int] = {}
+        self._members: Dict[int, set] = {}
+        self._order = deque()  # bucket indices with members, oldest first
+        self._flagged = set()
+
+    def _expire(self, bucket: int):
+        while self._order and self._order[0] <= bucket - self.buckets:
+            for member in self._members.pop(self._order.popleft()):
+                del self._bucket_of[member]
+                self._flagged.discard(member)
+
+    def add(self, member: str, now: float, flagged: bool = False):
+        bucket = int(now // self.bucket_seconds)
+        self._expire(bucket)
+        if self._order and self._order[-1] > bucket:
+            bucket = self._order[-1]  # late event: count it as current
+        previous = self._bucket_of.get(member)
+        if previous != bucket:
+            if previous is not None:
+                self._members[previous].discard(member)
+            if not self._order or self._order[-1] != bucket:
+                self._order.append(bucket)
+                self._members[bucket] = set()
+            self._members[bucket].add(member)
+            self._bucket_of[member] = bucket
+        if flagged:
+            self._flagged.add(member)
+        else:
+            self._flagged.discard(member)
+
+    def count(self, now: float) -> int:
+        self._expire(int(now // self.bucket_seconds))
+        return len(self._bucket_of)
+
+    def count_flagged(self, now: float) -> int:
+        self._expire(int(now // self.bucket_seconds))
+        return len(self._flagged)
+
+
+class SlidingWindowHistogram:
+    """
+    Fixed-bin histogram over the last window_seconds. Each time bucket keeps its
+    own bin counts, which are subtracted from the running totals when it expires,
+    so observe() and percentile() cost O(number of bins), independent of volume.
+    """
+    def __init__(self, window_seconds: float, bounds: Sequence[float] = RESPONSE_TIME_BOUNDS, buckets: int = 24):
+        self.bucket_seconds = max(1e-3, window_seconds / buckets)
+        self.buckets = buckets
+        self.bounds = tuple(bounds)
+        self._slices = deque()  # [bucket index, bin counts, sum], oldest first
+        self._totals = [0] * (len(self.bounds) + 1)
+        self._count = 0
+        self._sum = 0.0
+
+    def _expire(self, bucket: int):
+        while self._slices and self._slices[0][0] <= bucket - self.buckets:
+            _, counts, total = self._slices.popleft()
+            for i, c in enumerate(counts):
+                self._totals[i] -= c
+            self._count -= sum(counts)
+            self._sum -= total
+
+    def observe(self, value: float, now: float):
+        bucket = int(now // self.bucket_seconds)
+        self._expire(bucket)
+        if not self._slices or self._slices[-1][0] < bucket:
+            self._slices.append([bucket, [0] * len(self._totals), 0.0])
+        current = self._slices[-1]
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        current[1][index] += 1
+        current[2] += value
+        self._totals[index] += 1
+        self._count += 1
+        self._sum += value
+
+    def count(self, now: float) -> int:
+        self._expire(int(now // self.bucket_seconds))
+        return self._count
+
+    def mean(self, now: float) -> Optional[float]:
+        self._expire(int(now // self.bucket_seconds))
+        return self._sum / self._count if self._count else None
+
+    def percentile(self, q: float, now: float) -> Optional[float]:
+        """q in [0, 1]; linearly interpolated inside the bin that holds it."""
+        self._expire(int(now // self.bucket_seconds))
+        if not self._count:
+            return None
+        rank = q * self._count
+        seen = 0
+        for i, c in enumerate(self._totals):
+            if c and seen + c >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * max(0.0, rank - seen) / c
+            seen += c
+        return float(self.bounds[-1])
+
+
+class DashboardAggregator:
+    """
+    Dashboard counters maintained incrementally from ping, alert and EFIR events,
+    so a dashboard read costs the same for ten tourists or a million.
+    Response time is measured from a tourist's first open alert to the EFIR filed for them.
+    """
+    PERCENTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, active_window_seconds: float = 1800, alert_window_seconds: float = 3600,
+                 response_window_seconds: float = 86400):
+        self.active_window_seconds = active_window_seconds
+        self.alert_window_seconds = alert_window_seconds
+        self.response_window_seconds = response_window_seconds
+        self._active = SlidingActiveSet(active_window_seconds)
+        self._alerts = SlidingWindowCounter(alert_window_seconds)
+        self._efirs = SlidingWindowCounter(alert_window_seconds)
+        self._response_times = SlidingWindowHistogram(response_window_seconds)
+        self._open_alerts: "OrderedDict[str, float]" = OrderedDict()  # tourist id -> first alert time
+        self._lock = threading.Lock()
+
+    def record_pings(self, tourist_ids: Iterable[str], high_risk: Iterable[bool], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            for tourist_id, flagged in zip(tourist_ids, high_risk):
+                self._active.add(tourist_id, now, bool(flagged))
+
+    def record_alert(self, tourist_id: Optional[str] = None, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._alerts.add(now)
+            # Alerts nobody responded to within the response window stop waiting
+            while self._open_alerts:
+                oldest = next(iter(self._open_alerts))
+                if self._open_alerts[oldest] > now - self.response_window_seconds:
+                    break
+                del self._open_alerts[oldest]
+            if tourist_id and tourist_id not in self._open_alerts:
+                self._open_alerts[tourist_id] = now
+
+    def record_efir(self, tourist_id: Optional[str] = None, response_seconds: Optional[float] = None,
+                    now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._efirs.add(now)
+            if response_seconds is None and tourist_id:
+                alerted_at = self._open_alerts.pop(tourist_id, None)
+                if alerted_at is not None:
+                    response_seconds = now - alerted_at
+            if response_seconds is not None:
+                self._response_times.observe(max(0.0, float(response_seconds)), now)
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        now = time.time() if now is None else now
+        with self._lock:
+            mean = self._response_times.mean(now)
+            return {
+                'active_tourists': self._active.count(now),
+                'high_risk_tourists': self._active.count_flagged(now),
+                'recent_alerts': self._alerts.total(now),
+                'recent_efirs': self._efirs.total(now),
+                'open_alerts': len(self._open_alerts),
+                'responses_measured': self._response_times.count(now),
+                'avg_response_time_seconds': mean,
+                'response_time_percentiles_seconds': {
+                    f"p{int(q * 100)}": self._response_times.percentile(q, now) for q in self.PERCENTILES
+                },
+            }
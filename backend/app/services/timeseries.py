@@ -0,0 +1,181 @@
+import math
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+# One aggregated point per slot; 48 bytes
+SLOT_DTYPE = np.dtype([
+    ("t", "i8"),        # start of the interval this slot holds (unix seconds), 0 = empty
+    ("count", "f8"),
+    ("sum", "f8"),
+    ("min", "f8"),
+    ("max", "f8"),
+    ("last", "f8"),
+])
+
+# (step seconds, slots): 1 hour at 1s, 2 days at 1m, 90 days at 1h
+DEFAULT_RESOLUTIONS = ((1, 3600), (60, 2880), (3600, 2160))
+
+
+class RingSeries:
+    """
+    Fixed-interval ring buffer in a memory-mapped file. The slot for time t is
+    (t // step) % slots and remembers which interval it holds, so a write, and a
+    read of one point, is a single index whatever the history length; slots left
+    over from an earlier lap of the ring read as empty.
+    """
+    def __init__(self, path: Optional[str], step: int, slots: int, writable: bool = True):
+        self.path = path
+        self.step = step
+        self.slots = slots
+        self.writable = writable
+        self._data: Optional[np.ndarray] = None
+        self._open()
+
+    def _open(self):
+        if self.path is None:
+            self._data = np.zeros(self.slots, dtype=SLOT_DTYPE)
+        elif self.writable:
+            mode = "r+" if os.path.exists(self.path) else "w+"
+            self._data = np.memmap(self.path, dtype=SLOT_DTYPE, mode=mode, shape=(self.slots,))
+        elif os.path.exists(self.path):
+            self._data = np.memmap(self.path, dtype=SLOT_DTYPE, mode="r", shape=(self.slots,))
+
+    def add(self, value: float, ts: float):
+        interval = int(ts // self.step) * self.step
+        slot = self._data[(interval // self.step) % self.slots]
+        if slot["t"] != interval:
+            slot["count"], slot["sum"], slot["min"], slot["max"], slot["last"] = 1, value, value, value, value
+            slot["t"] = interval  # written last so readers never see a half-reset slot as current
+        else:
+            slot["count"] += 1
+            slot["sum"] += value
+            slot["min"] = min(slot["min"], value)
+            slot["max"] = max(slot["max"], value)
+            slot["last"] = value
+
+    def range(self, start: float, end: float) -> np.ndarray:
+        """
+        Slots for every interval in [start, end]; empty intervals have count 0. A range
+        longer than the ring keeps its newest lap, the part that has not been overwritten.
+        """
+        if self._data is None:
+            self._open()
+        first = int(start // self.step)
+        last = int(end // self.step)
+        first = max(first, last - self.slots + 1)  # older points have been overwritten
+        intervals = np.arange(first, last + 1, dtype=np.int64)
+        if self._data is None:
+            points = np.zeros(len(intervals), dtype=SLOT_DTYPE)
+        else:
+            points = self._data[intervals % self.slots].copy()
+            points[points["t"] != intervals * self.step] = np.zeros(1, dtype=SLOT_DTYPE)[0]
+        points["t"] = intervals * self.step
+        return points
+
+    def flush(self):
+        if isinstance(self._data, np.memmap) and self.writable:
+            self._data.flush()
+
+
+class TimeSeriesStore:
+    """
+    Metric history at several resolutions (1s, 1m, 1h by default). Every sample is
+    rolled up into all resolutions as it is written, so no background compaction
+    is needed and the coarse series are exact aggregates of the fine ones.
+
+    Series live in memory-mapped files under directory, so history survives
+    restarts without loading anything. With several workers, the first to take
+    the directory's lock file writes and the others only read the same files.
+    """
+    def __init__(self, directory: str = "", resolutions: Sequence[Tuple[int, int]] = DEFAULT_RESOLUTIONS):
+        self.directory = directory
+        self.resolutions = tuple(sorted(resolutions))
+        self._series: Dict[str, List[RingSeries]] = {}
+        self._lock = threading.Lock()
+        self._lock_file = None
+        self.writable = self._acquire_writer()
+
+    def _acquire_writer(self) -> bool:
+        if not self.directory:
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        if fcntl is None:
+            return True
+        self._lock_file = open(os.path.join(self.directory, ".writer.lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def _rings(self, name: str) -> List[RingSeries]:
+        rings = self._series.get(name)
+        if rings is None:
+            rings = self._series[name] = [
+                RingSeries(
+                    os.path.join(self.directory, f"{name}.{step}s.{slots}.ring") if self.directory else None,
+                    step, slots, self.writable
+                )
+                for step, slots in self.resolutions
+            ]
+        return rings
+
+    def record(self, name: str, value: float, ts: Optional[float] = None):
+        if not self.writable or value is None or (isinstance(value, float) and math.isnan(value)):
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            for ring in self._rings(name):
+                ring.add(float(value), ts)
+
+    def record_many(self, values: Dict[str, float], ts: Optional[float] = None):
+        ts = time.time() if ts is None else ts
+        for name, value in values.items():
+            self.record(name, value, ts)
+
+    def pick_step(self, start: float, end: float, max_points: int) -> int:
+        """Finest resolution that still covers [start, end] within max_points points."""
+        now = time.time()
+        for step, slots in self.resolutions:
+            if (end - start) / step + 1 <= max_points and start >= now - step * slots:
+                return step
+        return self.resolutions[-1][0]
+
+    def query(self, name: str, start: float, end: float, step: Optional[int] = None,
+              max_points: int = 1000) -> List[dict]:
+        """Points of one series between start and end (unix seconds), oldest first."""
+        step = step or self.pick_step(start, end, max_points)
+        steps = [s for s, _ in self.resolutions]
+        if step not in steps:
+            raise ValueError(f"resolution must be one of {steps}")
+        if (end - start) / step + 1 > max_points:
+            raise ValueError(f"more than {max_points} points; use a coarser resolution or a shorter range")
+        with self._lock:
+            ring = self._rings(name)[steps.index(step)]
+        points = ring.range(start, end)
+        return [
+            {
+                "t": int(p["t"]),
+                "avg": float(p["sum"] / p["count"]) if p["count"] else None,
+                "min": float(p["min"]) if p["count"] else None,
+                "max": float(p["max"]) if p["count"] else None,
+                "last": float(p["last"]) if p["count"] else None,
+                "samples": int(p["count"]),
+            }
+            for p in points
+        ]
+
+    def flush(self):
+        with self._lock:
+            for rings in self._series.values():
+                for ring in rings:
+                    ring.flush()
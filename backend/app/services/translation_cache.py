@@ -0,0 +1,181 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
+
+from services.metrics import metrics
+
+metrics.describe("translation_cache_total", "Translation cache lookups by result (memory, disk, miss)")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form for cache keys: NFC, case-folded, whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFC", text).casefold().split())
+
+
+def cache_key(text: str, source_lang: str) -> str:
+    digest = hashlib.blake2b(f"{source_lang}\x00{normalize_text(text)}".encode("utf-8"), digest_size=16)
+    return digest.hexdigest()
+
+
+class TranslationCache:
+    """
+    LRU of translations keyed by a hash of the normalized text and source language,
+    in front of an optional sqlite file. The file is opened in WAL mode, so every
+    worker process reads and writes the same one: a phrase translated by one worker
+    is a disk hit for the others, and hot phrases survive restarts. The file keeps
+    at most disk_capacity rows, pruning the least recently used.
+
+    The in-memory LRU has its own lock, and sqlite is only touched outside it, so a
+    memory hit never waits behind a disk read or write. Disk hits do not update
+    last_used one row at a time: the keys are collected and written in one
+    statement every touch_batch hits, and before a prune.
+    """
+    touch_batch = 64
+
+    def __init__(self, path: str = "", capacity: int = 10000, disk_capacity: int = 200000):
+        self.path = path
+        self.capacity = max(1, capacity)
+        self.disk_capacity = max(1, disk_capacity)
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()  # one sqlite connection, shared by the threads
+        self._db: Optional[sqlite3.Connection] = None
+        self._touched: Set[str] = set()
+        self._writes_since_prune = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if path:
+            self._open()
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, source_lang TEXT, translation TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def get(self, text: str, source_lang: str) -> Optional[str]:
+        key = cache_key(text, source_lang)
+        with self._lock:
+            translation = self._memory.get(key)
+            if translation is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                metrics.inc("translation_cache_total", result="memory")
+                return translation
+        translation = self._disk_get(key)
+        with self._lock:
+            if translation is not None:
+                self._remember(key, translation)
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("translation_cache_total", result="miss" if translation is None else "disk")
+        return translation
+
+    def put(self, text: str, source_lang: str, translation: str):
+        key = cache_key(text, source_lang)
+        with self._lock:
+            self._remember(key, translation)
+        self._disk_put(key, source_lang, translation)
+
+    def get_or_translate(self, text: str, source_lang: str, translate: Callable[[str], str]) -> str:
+        """Cached translation of text, calling translate(text) on a miss. Failed translations are not cached."""
+        translation = self.get(text, source_lang)
+        if translation is None:
+            translation = translate(text)
+            self.put(text, source_lang, translation)
+        return translation
+
+    def _remember(self, key: str, translation: str):
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.capacity:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        with self._db_lock:
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute("SELECT translation FROM translations WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._touched.add(key)
+                    if len(self._touched) >= self.touch_batch:
+                        self._flush_touched()
+            except sqlite3.Error:
+                return None
+        return row[0] if row else None
+
+    def _flush_touched(self):
+        """Write the collected disk hits' last_used in one statement (caller holds _db_lock)."""
+        if not self._touched:
+            return
+        now = time.time()
+        keys, self._touched = self._touched, set()
+        self._db.executemany("UPDATE translations SET last_used = ? WHERE key = ?", [(now, key) for key in keys])
+
+    def _disk_put(self, key: str, source_lang: str, translation: str):
+        with self._db_lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (key, source_lang, translation, last_used) VALUES (?, ?, ?, ?)",
+                    (key, source_lang, translation, time.time()),
+                )
+                self._writes_since_prune += 1
+                if self._writes_since_prune >= max(1, self.disk_capacity // 100):
+                    self._writes_since_prune = 0
+                    self._flush_touched()  # so recent disk hits are not pruned as stale
+                    self._db.execute(
+                        "DELETE FROM translations WHERE key IN ("
+                        "SELECT key FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                        (self.disk_capacity,),
+                    )
+            except sqlite3.Error:
+                pass  # the cache is an optimisation; a locked or full disk must not fail a translation
+
+    def stats(self) -> Dict[str, float]:
+        """Counters and entry counts; disk_entries is a COUNT(*) on the file, so async callers use a thread."""
+        disk_entries = None
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    disk_entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "lookups": lookups,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_capacity": self.capacity,
+                "disk_entries": disk_entries,
+            }
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                try:
+                    self._flush_touched()
+                except sqlite3.Error:
+                    pass
+                self._db.close()
+                self._db = None
@@ -0,0 +1,248 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.metrics import pid_alive
+
+_UINT64 = np.uint64
+
+
+def hash_ids(ids: Iterable[str]) -> np.ndarray:
+    """Stable 64-bit hashes (unlike hash(), identical in every worker process)."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(i).encode("utf-8"), digest_size=8).digest(), "little") for i in ids),
+        dtype=_UINT64,
+    )
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    # Split into 32-bit halves so the float conversion in frexp stays exact
+    hi = (values >> _UINT64(32)).astype(np.float64)
+    lo = (values & _UINT64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
+
+
+class HyperLogLog:
+    """
+    Distinct-count sketch with 2**precision one-byte registers; standard error is
+    about 1.04 / sqrt(2**precision) (2.3% at the default precision 11, in 2 KiB).
+    Two sketches merge by taking the register-wise maximum, so counts over a union
+    of zones, time buckets or workers come from merging, never from re-counting.
+    """
+    def __init__(self, precision: int = 11, registers: Optional[np.ndarray] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8) if registers is None else registers
+
+    def add_hashes(self, hashes: np.ndarray):
+        if not len(hashes):
+            return
+        hashes = np.asarray(hashes, dtype=_UINT64)
+        p = _UINT64(self.precision)
+        index = (hashes >> (_UINT64(64) - p)).astype(np.int64)
+        rest = hashes & ((_UINT64(1) << (_UINT64(64) - p)) - _UINT64(1))
+        rank = (64 - self.precision) - _bit_length(rest) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+    def add(self, ids: Iterable[str]):
+        self.add_hashes(hash_ids(ids))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        if other.precision != self.precision:
+            raise ValueError("cannot merge sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.precision, self.registers.copy())
+
+    def count(self) -> int:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+
+class ZoneSketchStore:
+    """
+    One HyperLogLog per (zone, time bucket) holding the tourists seen there.
+    "Unique tourists in zone X over window W" merges the bucket sketches covering W,
+    so any union of zones and windows is answerable; memory is bounded by
+    zones x retention / bucket_seconds x 2**precision bytes.
+
+    With a sketch_dir, each worker writes its sketches there and queries merge all
+    workers' files, the same way MetricsRegistry aggregates: the file of a worker
+    that has exited is deleted at the next query, with the tourists only it saw.
+    """
+    def __init__(self, bucket_seconds: int = 900, retention_seconds: int = 86400, precision: int = 11,
+                 sketch_dir: str = ""):
+        self.bucket_seconds = bucket_seconds
+        self.retention_buckets = max(1, retention_seconds // bucket_seconds)
+        self.precision = precision
+        self.sketch_dir = sketch_dir
+        self._sketches: Dict[Tuple[str, int], HyperLogLog] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sketches)
+
+    def memory_bytes(self) -> int:
+        return len(self._sketches) << self.precision
+
+    def _bucket(self, ts: float) -> int:
+        return int(ts // self.bucket_seconds)
+
+    def record(self, zone_ids: Sequence[str], tourist_ids: Sequence[str], now: Optional[float] = None):
+        """Add each tourist to the current bucket of the zone it was seen in."""
+        if not len(zone_ids):
+            return
+        now = time.time() if now is None else now
+        bucket = self._bucket(now)
+        hashes = hash_ids(tourist_ids)
+        zones = np.asarray(zone_ids, dtype=object)
+        with self._lock:
+            self._expire(bucket)
+            for zone_id in set(zone_ids):
+                sketch = self._sketches.get((zone_id, bucket))
+                if sketch is None:
+                    sketch = self._sketches[(zone_id, bucket)] = HyperLogLog(self.precision)
+                sketch.add_hashes(hashes[zones == zone_id])
+
+    def _expire(self, bucket: int):
+        oldest = bucket - self.retention_buckets
+        for key in [key for key in self._sketches if key[1] <= oldest]:
+            del self._sketches[key]
+
+    # Queries
+
+    def _collect(self, keep: Callable[[str, int], bool]) -> Dict[str, HyperLogLog]:
+        """Per-zone union of this and other workers' sketches whose (zone, bucket) passes keep."""
+        per_zone: Dict[str, HyperLogLog] = {}
+
+        def add(zone_id: str, sketch: HyperLogLog):
+            if zone_id in per_zone:
+                per_zone[zone_id].merge(sketch)
+            else:
+                per_zone[zone_id] = sketch.copy()
+
+        with self._lock:
+            for (zone_id, bucket), sketch in self._sketches.items():
+                if keep(zone_id, bucket):
+                    add(zone_id, sketch)
+        for (zone_id, bucket), sketch in self._other_workers():
+            if keep(zone_id, bucket):
+                add(zone_id, sketch)
+        return per_zone
+
+    def unique_tourists(self, zone_ids: Optional[Iterable[str]] = None,
+                        windows: Optional[Iterable[Tuple[float, float]]] = None,
+                        now: Optional[float] = None) -> int:
+        """
+        Distinct tourists seen in any of zone_ids (all zones if None) during any of
+        windows ((start, end) unix seconds; the last hour if None). Windows are
+        resolved to whole buckets and kept as intervals, so a window's width costs
+        nothing; ValueError if a window ends before it starts.
+        """
+        now = time.time() if now is None else now
+        windows = list(windows) if windows is not None else [(now - 3600, now)]
+        intervals = []
+        for start, end in windows:
+            if start > end:
+                raise ValueError("window start is after its end")
+            intervals.append((self._bucket(start), self._bucket(end)))
+        zones = set(zone_ids) if zone_ids is not None else None
+
+        def keep(zone_id: str, bucket: int) -> bool:
+            return (zones is None or zone_id in zones) and any(first <= bucket <= last for first, last in intervals)
+
+        union = HyperLogLog(self.precision)
+        for sketch in self._collect(keep).values():
+            union.merge(sketch)
+        return union.count()
+
+    def zone_counts(self, window_seconds: float = 3600, now: Optional[float] = None) -> Dict[str, int]:
+        """Distinct tourists per zone over the last window_seconds, for every zone at once."""
+        now = time.time() if now is None else now
+        first, last = self._bucket(now - window_seconds), self._bucket(now)
+        per_zone = self._collect(lambda z, b: first <= b <= last)
+        return {zone_id: sketch.count() for zone_id, sketch in per_zone.items()}
+
+    # Cross-worker exchange
+
+    def export(self) -> Dict[str, np.ndarray]:
+        """Registers keyed "bucket|zone", e.g. for np.savez or another store's merge_export."""
+        with self._lock:
+            return {f"{bucket}|{zone_id}": sketch.registers.copy() for (zone_id, bucket), sketch in self._sketches.items()}
+
+    def merge_export(self, exported: Dict[str, np.ndarray]):
+        with self._lock:
+            for key, registers in exported.items():
+                bucket, zone_id = key.split("|", 1)
+                other = HyperLogLog(self.precision, np.asarray(registers, dtype=np.uint8))
+                sketch = self._sketches.get((zone_id, int(bucket)))
+                if sketch is None:
+                    self._sketches[(zone_id, int(bucket))] = other.copy()
+                else:
+                    sketch.merge(other)
+
+    def write_snapshot(self):
+        if not self.sketch_dir:
+            return
+        os.makedirs(self.sketch_dir, exist_ok=True)
+        path = os.path.join(self.sketch_dir, f"zones_{os.getpid()}.npz")
+        tmp = f"{path}.tmp.npz"
+        np.savez(tmp, precision=np.array(self.precision), **self.export())
+        os.replace(tmp, path)
+
+    def start_flusher(self, interval_seconds: float):
+        """Write this worker's sketches every interval so other workers' queries include them."""
+        if not self.sketch_dir:
+            return
+
+        def loop():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.write_snapshot()
+                except OSError:
+                    pass
+
+        threading.Thread(target=loop, name="zone-sketch-flusher", daemon=True).start()
+
+    def _other_workers(self) -> List[Tuple[Tuple[str, int], HyperLogLog]]:
+        if not self.sketch_dir or not os.path.isdir(self.sketch_dir):
+            return []
+        own = f"zones_{os.getpid()}.npz"
+        sketches = []
+        for entry in os.listdir(self.sketch_dir):
+            if entry == own or not (entry.startswith("zones_") and entry.endswith(".npz")):
+                continue
+            pid = entry[len("zones_"):].split(".", 1)[0]
+            if pid.isdigit() and not pid_alive(int(pid)):
+                try:
+                    os.remove(os.path.join(self.sketch_dir, entry))
+                except OSError:
+                    pass
+                continue
+            if ".tmp" in entry:
+                continue
+            try:
+                with np.load(os.path.join(self.sketch_dir, entry)) as data:
+                    if int(data["precision"]) != self.precision:
+                        continue
+                    for key in data.files:
+                        if key == "precision":
+                            continue
+                        bucket, zone_id = key.split("|", 1)
+                        sketches.append(((zone_id, int(bucket)), HyperLogLog(self.precision, data[key].astype(np.uint8))))
+            except (OSError, ValueError, KeyError):
+                continue
+        return sketches
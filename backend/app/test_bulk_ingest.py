@@ -0,0 +1,145 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import SmartTouristSafetySystem
+from services.ping_ingest import PingParseError, iter_ndjson_batches
+
+
+def collect(chunks, batch_size):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [batch async for batch in iter_ndjson_batches(stream(), batch_size)]
+
+    return asyncio.run(run())
+
+
+class TestBatchProcessing(unittest.TestCase):
+    def setUp(self):
+        self.system = SmartTouristSafetySystem()
+        self.system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        self.system.geo_fencing.add_risk_zone("delhi_red_fort", [
+            [28.656450, 77.241500],
+            [28.656450, 77.244000],
+            [28.654000, 77.244000],
+            [28.654000, 77.241500]
+        ], 8)
+
+    def test_vectorized_geofence_matches_scalar(self):
+        lats = [28.655, 28.657, 22.567]
+        lngs = [77.2425, 77.245, 88.347]
+        risks = self.system.geo_fencing.check_locations_risk(lats, lngs).tolist()
+        expected = [self.system.geo_fencing.check_location_risk(lat, lng) for lat, lng in zip(lats, lngs)]
+        self.assertEqual(risks, expected)
+        self.assertEqual(risks, [8, 1, 1])
+
+    def test_batch_matches_single_pings(self):
+        pings = [
+            ("T1", {"latitude": 28.655, "longitude": 77.2425, "location_id": 3, "group_size": 1}),
+            ("T2", {"group_size": 4, "experience_level": "expert"}),
+            ("T3", {"latitude": 22.567, "longitude": 88.347}),
+            ("T4", {"latitude": 22.567, "longitude": 88.347, "location_id": 5,
+                    "timestamp": "2025-06-01T10:00:00"}),
+        ]
+        self.system.delta_skipping = False
+        batch = self.system.process_tourist_batch(pings)
+        self.assertEqual([r["tourist_id"] for r in batch], ["T1", "T2", "T3", "T4"])
+
+        for (tourist_id, data), result in zip(pings, batch):
+            single = asyncio.run(self.system.process_tourist_data(tourist_id, data))
+            for key in ("safety_score", "tourist_flow", "incident_probability"):
+                self.assertEqual(result[key], single[key])
+            self.assertEqual(len(result["alerts_generated"]), len(single["alerts_generated"]))
+
+        self.assertEqual(len(batch[0]["alerts_generated"]), 1)
+        self.assertIsNone(batch[1]["tourist_flow"])
+        self.assertIsNone(batch[2]["incident_probability"])
+
+    def test_zone_added_during_lookup(self):
+        geo = self.system.geo_fencing
+        zones = iter(geo.risk_zones.items())
+        next(zones)
+        geo.add_risk_zone("new_zone", [[1, 1], [1, 2], [2, 2], [2, 1]], 6)
+        # The lookup that started before the change finishes on the zones it saw
+        self.assertEqual(list(zones), [])
+        self.assertEqual(geo.check_location_risk(1.5, 1.5), 6)
+
+    def test_empty_batch(self):
+        self.assertEqual(self.system.process_tourist_batch([]), [])
+
+
+class TestNDJSONBatching(unittest.TestCase):
+    def test_batches_across_chunk_boundaries(self):
+        body = b'{"tourist_id": "A", "latitude": 1}\n{"tourist_id": "B"}\n\n{"tourist_id": "C"}'
+        chunks = [body[:10], body[10:40], body[40:]]
+        batches = collect(chunks, batch_size=2)
+        self.assertEqual([len(b) for b in batches], [2, 1])
+        flat = [parsed for batch in batches for _, parsed in batch]
+        self.assertEqual([p[0] for p in flat], ["A", "B", "C"])
+        self.assertEqual(flat[0][1], {"latitude": 1})
+
+    def test_bad_lines_keep_their_position(self):
+        batches = collect([b'{"tourist_id": "A"}\nnot json\n{"latitude": 1}\n'], batch_size=10)
+        (batch,) = batches
+        self.assertEqual([n for n, _ in batch], [1, 2, 3])
+        self.assertEqual(batch[0][1][0], "A")
+        self.assertIsInstance(batch[1][1], PingParseError)
+        self.assertIsInstance(batch[2][1], PingParseError)
+
+    def test_bad_fields_are_rejected_per_line(self):
+        body = b"\n".join([
+            b'{"tourist_id": "A", "latitude": "28.655", "longitude": 77.2425, "location_id": "3"}',
+            b'{"tourist_id": "B", "latitude": "x", "longitude": 77.2}',
+            b'{"tourist_id": "C", "latitude": 28.6, "longitude": 77.2, "location_id": 1, "timestamp": "yesterday-ish"}',
+            b'{"tourist_id": "D", "latitude": 128.6, "longitude": 77.2}',
+            b'{"tourist_id": "E", "latitude": 28.6, "longitude": 77.2, "location_id": 2.5}',
+            b'{"tourist_id": "F", "age": [30]}',
+            b'{"tourist_id": "G", "latitude": 28.6, "longitude": 77.2, "location_id": 1, "timestamp": "2025-06-01T10:00:00+05:30"}',
+        ])
+        (batch,) = collect([body], batch_size=10)
+        parsed = [p for _, p in batch]
+        self.assertEqual(parsed[0], ("A", {"latitude": 28.655, "longitude": 77.2425, "location_id": 3}))
+        for rejected in parsed[1:6]:
+            self.assertIsInstance(rejected, PingParseError)
+        self.assertEqual(parsed[6][1]["timestamp"], "2025-06-01T10:00:00")
+
+        # The remaining pings still go through one batch together
+        system = SmartTouristSafetySystem()
+        system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        good = [p for p in parsed if not isinstance(p, PingParseError)]
+        good.append(("H", {"latitude": 28.6, "longitude": 77.2, "location_id": 1, "timestamp": "2025-06-01T11:00:00"}))
+        results = system.process_tourist_batch(good)
+        self.assertEqual([r["tourist_id"] for r in results], ["A", "G", "H"])
+
+    def test_profile_and_environment_fields_are_checked(self):
+        body = b"\n".join([
+            b'{"tourist_id": "A", "experience_level": [1, 2]}',
+            b'{"tourist_id": "B", "has_itinerary": "yes"}',
+            b'{"tourist_id": "C", "latitude": 28.6, "longitude": 77.2, "location_id": 1, "weather_score": "sunny"}',
+            b'{"tourist_id": "D", "visibility_score": {"km": 2}}',
+            b'{"tourist_id": "E", "experience_level_score": "NaN"}',
+            b'{"tourist_id": "F", "experience_level": "expert", "has_itinerary": true, "latitude": 28.6,'
+            b' "longitude": 77.2, "location_id": 1, "weather_score": "4", "visibility_score": 6, "age": null}',
+        ])
+        (batch,) = collect([body], batch_size=10)
+        parsed = [p for _, p in batch]
+        for rejected in parsed[:5]:
+            self.assertIsInstance(rejected, PingParseError)
+        self.assertEqual(parsed[5][1]["weather_score"], 4.0)
+        self.assertNotIn("age", parsed[5][1])
+
+        system = SmartTouristSafetySystem()
+        system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        (result,) = system.process_tourist_batch([parsed[5]])
+        self.assertIsNotNone(result["incident_probability"])
+
+
+if __name__ == "__main__":
+    unittest.main()
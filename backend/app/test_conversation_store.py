@@ -0,0 +1,125 @@
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import TouristAssistantChatbot
+from services.conversation_store import ConversationStore, redis
+
+
+class _FakeRedis:
+    """Just the list commands the store uses."""
+    def __init__(self):
+        self.lists = {}
+        self.ttls = {}
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value.encode("utf-8"))
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists[key][start:]
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def execute(self):
+        pass
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def delete(self, key):
+        self.lists.pop(key, None)
+
+
+class TestConversationStore(unittest.TestCase):
+    def test_ring_buffer_per_tourist(self):
+        store = ConversationStore(max_turns=3)
+        for i in range(5):
+            store.append("t1", f"q{i}", "How can I help?")
+        self.assertEqual([turn["user"] for turn in store.get("t1")], ["q2", "q3", "q4"])
+        self.assertEqual(store.get("nobody"), [])
+
+    def test_lru_eviction_by_count_and_bytes(self):
+        store = ConversationStore(max_conversations=2)
+        store.append("a", "hi", "hello")
+        store.append("b", "hi", "hello")
+        store.get("a")
+        store.append("a", "again", "hello")  # a is now most recently used
+        store.append("c", "hi", "hello")
+        self.assertEqual(store.get("b"), [])
+        self.assertEqual(len(store.get("a")), 2)
+        self.assertEqual(store.stats()["evicted"], 1)
+
+        small = ConversationStore(max_bytes=1000)
+        for i in range(20):
+            small.append(f"t{i}", "x" * 100, "ok")
+        self.assertLessEqual(small.stats()["bytes"], 1000)
+        self.assertEqual(len(small.get("t19")), 1)
+        self.assertEqual(small.get("t0"), [])
+
+    def test_idle_expiry(self):
+        store = ConversationStore(idle_ttl_seconds=60)
+        with mock.patch("services.conversation_store.time.time", return_value=1000):
+            store.append("old", "hi", "hello")
+        with mock.patch("services.conversation_store.time.time", return_value=1100):
+            self.assertEqual(store.get("old"), [])
+            store.append("new", "hi", "hello")
+        self.assertEqual(len(store), 1)
+        self.assertEqual(store.stats()["bytes"], store._conversations["new"].size)
+
+    def test_bot_replies_are_shared(self):
+        store = ConversationStore()
+        store.append("a", "q", "".join(["Stay ", "safe"]))
+        store.append("b", "q", "".join(["Stay ", "sa", "fe"]))
+        self.assertIs(store.get("a")[0]["bot"], store.get("b")[0]["bot"])
+
+    def test_redis_backend(self):
+        store = ConversationStore(max_turns=2, idle_ttl_seconds=600)
+        store._redis = _FakeRedis()
+        for i in range(3):
+            store.append("t1", f"q{i}", "नमस्ते")
+        self.assertEqual(store.get("t1"), [{"user": "q1", "bot": "नमस्ते"}, {"user": "q2", "bot": "नमस्ते"}])
+        self.assertEqual(store._redis.ttls["chat_history:t1"], 600)
+        store.clear("t1")
+        self.assertEqual(store.get("t1"), [])
+
+    @unittest.skipIf(redis is None, "redis package not installed")
+    def test_unreachable_redis_stays_in_memory(self):
+        store = ConversationStore(redis_url="redis://127.0.0.1:1")
+        self.assertEqual(store.backend, "memory")
+        store.append("t1", "hi", "hello")
+        self.assertEqual(len(store.get("t1")), 1)
+
+    @unittest.skipIf(redis is None, "redis package not installed")
+    def test_redis_outage_does_not_fail_replies(self):
+        class _DownRedis(_FakeRedis):
+            def execute(self):
+                raise redis.ConnectionError("connection refused")
+
+            def lrange(self, key, start, end):
+                raise redis.ConnectionError("connection refused")
+
+        store = ConversationStore()
+        store._redis = _DownRedis()
+        chatbot = TouristAssistantChatbot(store)
+        self.assertEqual(chatbot.process_query("t1", "Is it safe here?")["query_type"], "safety")
+        self.assertEqual(asyncio.run(chatbot.aprocess_query("t1", "Is it safe here?"))["source"], "template")
+        self.assertEqual(asyncio.run(store.aget("t1")), [])
+        self.assertEqual(store.stats()["redis_errors"], 3)
+
+    def test_chatbot_records_turns(self):
+        chatbot = TouristAssistantChatbot(ConversationStore(max_turns=10))
+        chatbot.process_query("t1", "Is this area safe at night?")
+        self.assertEqual(chatbot.conversations.get("t1")[0]["user"], "Is this area safe at night?")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.dashboard_push import DashboardHub
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+
+class TestDashboardHub(unittest.TestCase):
+    def run_async(self, coro):
+        return asyncio.run(coro)
+
+    def test_routing_between_dashboards_and_tourists(self):
+        async def scenario():
+            hub = DashboardHub(queue_size=8)
+            hub.start(asyncio.get_running_loop())
+            dashboard, tourist, other = FakeSocket(), FakeSocket(), FakeSocket()
+            connections = [hub.connect(dashboard), hub.connect(tourist, "T1"), hub.connect(other, "T2")]
+            senders = [asyncio.create_task(c.drain()) for c in connections]
+
+            hub.publish({"type": "alert", "tourist_id": "T1"}, "T1")
+            hub.publish({"type": "tourist_update", "tourist_id": "T1"}, "T1", broadcast=False)
+            hub.publish({"type": "efir"})
+            await asyncio.sleep(0.01)
+            for sender in senders:
+                sender.cancel()
+            return dashboard.sent, tourist.sent, other.sent
+
+        dashboard, tourist, other = self.run_async(scenario())
+        self.assertEqual([m["type"] for m in dashboard], ["alert", "efir"])
+        self.assertEqual([m["type"] for m in tourist], ["alert", "tourist_update"])
+        self.assertEqual(other, [])
+
+    def test_slow_client_drops_oldest(self):
+        async def scenario():
+            hub = DashboardHub(queue_size=3)
+            connection = hub.connect(FakeSocket())
+            for n in range(5):
+                hub._deliver("1\n" + json.dumps({"n": n}))
+            return connection
+
+        connection = self.run_async(scenario())
+        self.assertEqual(connection.dropped, 2)
+        self.assertEqual([json.loads(t)["n"] for t in connection.queue], [2, 3, 4])
+
+    def test_disconnect_stops_delivery(self):
+        async def scenario():
+            hub = DashboardHub()
+            connection = hub.connect(FakeSocket(), "T1")
+            self.assertEqual(hub.connections, 1)
+            hub.disconnect(connection)
+            hub._deliver("1T1\n{}")
+            return hub, connection
+
+        hub, connection = self.run_async(scenario())
+        self.assertEqual(hub.connections, 0)
+        self.assertEqual(len(connection.queue), 0)
+
+    def test_failed_sender_is_logged_and_dropped(self):
+        class BrokenSocket:
+            async def send_text(self, text):
+                raise ConnectionResetError("peer gone")
+
+        async def scenario():
+            hub = DashboardHub()
+            hub.start(asyncio.get_running_loop())
+            connection = hub.connect(BrokenSocket())
+            sender = hub.start_sender(connection)
+            hub.publish({"type": "efir"})
+            await asyncio.sleep(0.01)
+            return hub, sender
+
+        with mock.patch("builtins.print") as printed:
+            hub, sender = self.run_async(scenario())
+        self.assertTrue(sender.done())
+        self.assertEqual(hub.connections, 0)
+        self.assertIn("peer gone", printed.call_args[0][0])
+
+    def test_metrics_delta_only_reports_changes(self):
+        hub = DashboardHub()
+        first = hub.metrics_delta({"active_tourists": 3, "recent_alerts": 1, "last_updated": "a"})
+        self.assertEqual(first, {"active_tourists": 3, "recent_alerts": 1})
+        self.assertEqual(hub.metrics_delta({"active_tourists": 3, "recent_alerts": 1, "last_updated": "b"}), {})
+        self.assertEqual(hub.metrics_delta({"active_tourists": 4, "recent_alerts": 1}), {"active_tourists": 4})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import SmartTouristSafetySystem
+
+
+class CountingSafetyModel:
+    """Wraps the real model and records how many rows reach it."""
+    def __init__(self, model):
+        self.model = model
+        self.rows = 0
+
+    def predict_safety_scores(self, records):
+        self.rows += len(records)
+        return self.model.predict_safety_scores(records)
+
+
+class TestDeltaSkipping(unittest.TestCase):
+    def setUp(self):
+        self.system = SmartTouristSafetySystem()
+        self.system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        self.system.geo_fencing.add_risk_zone("fort", [[0, 0], [0, 1], [1, 1], [1, 0]], 9)
+        self.safety = self.system.safety_model = CountingSafetyModel(self.system.safety_model)
+        self.ping = {"latitude": 0.5, "longitude": 0.5, "location_id": 2,
+                     "timestamp": "2025-06-01T10:05:00", "group_size": 2}
+
+    def process(self, **changes):
+        return self.system.process_tourist_batch([("T1", dict(self.ping, **changes))])[0]
+
+    def test_repeated_ping_reuses_every_stage(self):
+        first = self.process()
+        second = self.process()
+        self.assertEqual(first["skipped_stages"], [])
+        self.assertEqual(second["skipped_stages"], ["safety", "geofence", "flow", "incident"])
+        for key in ("safety_score", "tourist_flow", "incident_probability"):
+            self.assertEqual(first[key], second[key])
+        self.assertEqual(self.safety.rows, 1)
+
+    def test_cached_probability_reads_back_unchanged(self):
+        class FixedIncidentModel:
+            def predict_incident_probabilities(self, cases):
+                return [0.73] * len(cases)
+
+        self.system.incident_predictor = FixedIncidentModel()
+        first, second = self.process(), self.process()
+        self.assertIn("incident", second["skipped_stages"])
+        self.assertEqual((first["incident_probability"], second["incident_probability"]), (0.73, 0.73))
+
+    def test_alert_only_when_geofence_runs(self):
+        self.assertEqual(len(self.process()["alerts_generated"]), 1)
+        self.assertEqual(self.process()["alerts_generated"], [])
+
+    def test_small_moves_skip_geofence_large_moves_do_not(self):
+        self.process()
+        self.assertIn("geofence", self.process(latitude=0.50005)["skipped_stages"])  # ~5.5 m
+        self.assertNotIn("geofence", self.process(latitude=0.501)["skipped_stages"])  # ~110 m
+
+    def test_profile_change_recomputes_safety_only(self):
+        self.process()
+        skipped = self.process(group_size=1)["skipped_stages"]
+        self.assertNotIn("safety", skipped)
+        self.assertIn("geofence", skipped)
+        self.assertIn("flow", skipped)
+
+    def test_time_bucket_change_recomputes_flow(self):
+        self.process()
+        self.assertIn("flow", self.process(timestamp="2025-06-01T10:55:00")["skipped_stages"])
+        self.assertNotIn("flow", self.process(timestamp="2025-06-01T11:00:00")["skipped_stages"])
+
+    def test_new_zone_invalidates_geofence_cache(self):
+        self.process()
+        self.system.geo_fencing.add_risk_zone("market", [[0, 0], [0, 2], [2, 2], [2, 0]], 4)
+        self.assertNotIn("geofence", self.process()["skipped_stages"])
+
+    def test_disabled_recomputes_everything(self):
+        self.system.delta_skipping = False
+        self.process()
+        self.assertEqual(self.process()["skipped_stages"], [])
+
+    def test_stats(self):
+        self.process()
+        self.process()
+        stats = self.system.get_delta_stats()
+        self.assertEqual(stats["safety"]["computed"], 1)
+        self.assertEqual(stats["safety"]["skipped"], 1)
+        self.assertEqual(stats["incident"]["skip_ratio"], 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import MultilingualEmergencyProcessor
+from services.dynamic_batcher import DynamicBatcher
+from services.metrics import MetricsRegistry, metrics
+
+
+class TestDynamicBatcher(unittest.TestCase):
+    def test_concurrent_items_share_batches(self):
+        calls = []
+        release = threading.Event()
+
+        def batch_fn(items):
+            calls.append(list(items))
+            release.wait(1)  # hold the first batch so the rest queue up behind it
+            return [item * 2 for item in items]
+
+        batcher = DynamicBatcher("double", batch_fn, max_batch_size=4, max_wait_ms=50)
+        first = batcher.submit(0)
+        time.sleep(0.1)
+        futures = [batcher.submit(i) for i in range(1, 10)]
+        release.set()
+        self.assertEqual(first.result(1), 0)
+        self.assertEqual([f.result(1) for f in futures], [i * 2 for i in range(1, 10)])
+        self.assertEqual([len(c) for c in calls], [1, 4, 4, 1])
+        stats = batcher.stats()
+        self.assertEqual((stats["batches"], stats["items"], stats["largest_batch"]), (4, 10, 4))
+
+    def test_lone_item_waits_at_most_the_budget(self):
+        batcher = DynamicBatcher("echo", lambda items: items, max_batch_size=64, max_wait_ms=20)
+        started = time.perf_counter()
+        self.assertEqual(batcher("x"), "x")
+        self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_errors_reach_every_caller(self):
+        def fail(items):
+            raise ValueError("model crashed")
+
+        batcher = DynamicBatcher("fail", fail, max_wait_ms=20)
+        futures = [batcher.submit(i) for i in range(3)]
+        for future in futures:
+            with self.assertRaises(ValueError):
+                future.result(1)
+        short = DynamicBatcher("short", lambda items: items[:1], max_wait_ms=20)
+        with self.assertRaises(RuntimeError):
+            [f.result(1) for f in (short.submit(1), short.submit(2))]
+
+    def test_batch_size_histogram_uses_size_buckets(self):
+        DynamicBatcher("sized", lambda items: items, max_wait_ms=1)("a")
+        text = metrics.render_prometheus()
+        self.assertIn('batch_size_bucket{batcher="sized",le="1"} 1', text)
+        self.assertIn('batch_queue_wait_seconds_bucket{batcher="sized",le="0.0001"}', text)
+        registry = MetricsRegistry()
+        registry.observe("latency", 0.003)
+        self.assertIn('latency_bucket{le="0.005"} 1', registry.render_prometheus())
+
+
+class TestProcessorBatching(unittest.TestCase):
+    def test_translation_goes_through_the_batcher(self):
+        processor = MultilingualEmergencyProcessor()
+        self.assertEqual(processor._translate_to_english("मदद", "hindi"), "Translated: मदद")
+        self.assertEqual(processor.translation_batcher.stats()["items"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
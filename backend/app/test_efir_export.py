@@ -0,0 +1,70 @@
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.efir_export import EFIRFilter, iter_csv, iter_efirs, iter_ndjson
+from services.efir_store import EFIRStore
+
+
+def _efir(i, incident_type, severity, area):
+    return {
+        'complaint_number': f"EFIR{i:04d}",
+        'date_time': datetime.fromtimestamp(1000 + i).isoformat(),
+        'complainant_details': {'tourist_id': f"tourist{i}", 'name': 'A, "quoted" name'},
+        'incident_details': {'type': incident_type, 'severity': severity, 'description': 'line one\nline two'},
+        'location_details': {'incident_area': area, 'last_known_location': {'lat': 26.1, 'lng': 91.7}},
+    }
+
+
+class TestEFIRExport(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = EFIRStore(tmp.name, segment_bytes=2048)
+        self.addCleanup(self.store.close)
+        kinds = [('THEFT', 'LOW', 'Shillong Police Bazar'), ('MISSING_PERSON', 'HIGH', 'Kaziranga'),
+                 ('MEDICAL', 'CRITICAL', 'Tawang')]
+        for i in range(30):
+            self.store.append(_efir(i, *kinds[i % 3]))
+
+    def export(self, **filters):
+        return [e['complaint_number'] for e in iter_efirs(self.store.scan(chunk_bytes=100), EFIRFilter(**filters))]
+
+    def test_scan_reads_every_segment_in_order(self):
+        self.assertGreater(self.store.stats()["segments"], 1)
+        self.assertEqual(self.export(), [f"EFIR{i:04d}" for i in range(30)])
+
+    def test_filters(self):
+        self.assertEqual(self.export(types="theft,medical", severities="critical"),
+                         [f"EFIR{i:04d}" for i in range(2, 30, 3)])
+        self.assertEqual(self.export(area="police"), [f"EFIR{i:04d}" for i in range(0, 30, 3)])
+        self.assertEqual(self.export(start=1010, end=1012), ["EFIR0010", "EFIR0011", "EFIR0012"])
+
+    def test_csv_and_ndjson_round_trip(self):
+        matching = list(iter_efirs(self.store.scan(), EFIRFilter(types="MEDICAL")))
+        rows = list(csv.DictReader(io.StringIO("".join(iter_csv(matching, chunk_bytes=256)))))
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]['name'], 'A, "quoted" name')
+        self.assertEqual(rows[0]['description'], 'line one\nline two')
+        self.assertEqual(json.loads(rows[0]['last_known_location']), {'lat': 26.1, 'lng': 91.7})
+
+        chunks = list(iter_ndjson(matching, chunk_bytes=256))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([json.loads(line) for line in "".join(chunks).splitlines()], matching)
+
+    def test_export_is_lazy(self):
+        lines = self.store.scan()
+        self.assertEqual(json.loads(next(lines))['complaint_number'], "EFIR0000")
+        self.store.append(_efir(99, 'THEFT', 'LOW', 'Tawang'))  # writers are not blocked by an open scan
+
+
+if __name__ == '__main__':
+    unittest.main()
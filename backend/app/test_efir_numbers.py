@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import AutomatedEFIRGenerator
+from config import settings
+from services.efir_numbers import EFIRNumberAllocator
+
+
+def _allocate_in_worker(directory, count, queue):
+    allocator = EFIRNumberAllocator(directory, block_size=100)
+    queue.put(allocator.allocate(count // 2) + [allocator.next_number() for _ in range(count - count // 2)])
+
+
+class TestEFIRNumberAllocator(unittest.TestCase):
+    def test_same_second_numbers_are_unique_and_ordered(self):
+        with tempfile.TemporaryDirectory() as directory, mock.patch.object(settings, "EFIR_COUNTER_DIR", directory):
+            generator = AutomatedEFIRGenerator()
+            numbers = [generator.generate_efir({'incident_type': 'SMS_EMERGENCY'})['complaint_number'] for _ in range(50)]
+            self.assertEqual(len(set(numbers)), 50)
+            self.assertEqual(numbers, sorted(numbers))
+            self.assertTrue(numbers[0].startswith("EFIR"))
+            # The default generator keeps its counter on disk, so a restart continues after it
+            self.assertTrue(generator.numbers.stats()["persistent"])
+            restarted = AutomatedEFIRGenerator()
+            self.assertGreater(restarted.numbers.next_number(), numbers[-1])
+
+    def test_blocks_survive_restart(self):
+        with tempfile.TemporaryDirectory() as directory:
+            first = EFIRNumberAllocator(directory, block_size=10)
+            before = first.allocate(3)
+            restarted = EFIRNumberAllocator(directory, block_size=10)
+            after = restarted.next_number()
+            # The rest of the first block is skipped, never reissued
+            self.assertEqual(EFIRNumberAllocator.sequence_of(after), 10)
+            self.assertNotIn(after, before)
+            self.assertEqual(restarted.stats()["blocks_reserved"], 1)
+
+    def test_workers_never_collide(self):
+        with tempfile.TemporaryDirectory() as directory:
+            queue = multiprocessing.Queue()
+            workers = [multiprocessing.Process(target=_allocate_in_worker, args=(directory, 2000, queue)) for _ in range(4)]
+            for worker in workers:
+                worker.start()
+            results = [queue.get(timeout=30) for _ in workers]
+            for worker in workers:
+                worker.join(10)
+            numbers = [n for result in results for n in result]
+            self.assertEqual(len(numbers), 8000)
+            self.assertEqual(len(set(numbers)), 8000)
+            for result in results:  # ordered within each worker
+                self.assertEqual(result, sorted(result))
+
+    def test_throughput_and_node_ids(self):
+        with tempfile.TemporaryDirectory() as directory:
+            allocator = EFIRNumberAllocator(directory, node_id="b2")
+            started = time.perf_counter()
+            for _ in range(20000):
+                allocator.next_number()
+            self.assertLess(time.perf_counter() - started, 2.0)  # well over 10k/s
+            self.assertIn("B2", allocator.next_number())
+        with self.assertRaises(ValueError):
+            EFIRNumberAllocator(node_id="not valid")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import AutomatedEFIRGenerator
+from services.efir_numbers import EFIRNumberAllocator
+from services.efir_search import EFIRSearchIndex
+from services.efir_store import EFIRStore
+
+
+def _efir(i, description, incident_type='THEFT', severity='MEDIUM', area='Shillong'):
+    return {
+        'complaint_number': f"EFIR{i:06d}",
+        'date_time': datetime.fromtimestamp(1000 + i).isoformat(),
+        'incident_details': {'type': incident_type, 'severity': severity, 'description': description},
+        'location_details': {'incident_area': area, 'nearby_landmarks': []},
+    }
+
+
+class TestEFIRSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = EFIRSearchIndex()
+        self.index.add(_efir(1, "Passport stolen near the waterfall", area='Cherrapunji'))
+        self.index.add(_efir(2, "Wallet stolen at the market"))
+        self.index.add(_efir(3, "Tourist missing after trek to the waterfall", 'MISSING_PERSON', 'HIGH', 'Cherrapunji'))
+        self.index.add(_efir(4, "पर्यटक का पासपोर्ट चोरी हो गया", severity='HIGH'))
+
+    def numbers(self, query, **filters):
+        return [number for number, _ in self.index.search(query, **filters)]
+
+    def test_ranking(self):
+        self.assertEqual(self.numbers("passport stolen")[:2], ["EFIR000001", "EFIR000002"])
+        self.assertEqual(set(self.numbers("waterfall")), {"EFIR000001", "EFIR000003"})
+        self.assertEqual(self.numbers("helicopter"), [])
+        self.assertEqual(self.numbers(""), [])
+
+    def test_indic_tokens(self):
+        # Vowel signs stay part of the word, so the whole word matches
+        self.assertEqual(self.numbers("पासपोर्ट"), ["EFIR000004"])
+
+    def test_filters(self):
+        self.assertEqual(self.numbers("waterfall", types=["missing_person"]), ["EFIR000003"])
+        self.assertEqual(self.numbers("stolen", severities=["HIGH"]), [])
+        self.assertEqual(self.numbers("stolen", area="shillong"), ["EFIR000002"])
+        self.assertEqual(self.numbers("waterfall", start=1002), ["EFIR000003"])
+        self.assertEqual(self.numbers("stolen", types=["UNKNOWN"]), [])
+
+    def test_store_keeps_index_current(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = EFIRStore(directory)
+            store.append(_efir(10, "Camera stolen on the ropeway"))
+            index = EFIRSearchIndex()
+            store.subscribe(index.add)
+            generator = AutomatedEFIRGenerator(numbers=EFIRNumberAllocator(), store=store)
+            efir = generator.generate_efir({'incident_type': 'THEFT', 'circumstances': 'Bag snatched near ropeway'})
+            self.assertEqual(len(index), 2)
+            self.assertEqual(index.search("ropeway snatched")[0][0], efir['complaint_number'])
+            store.close()
+
+    def test_replay_does_not_block_appends(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = EFIRStore(directory)
+            for i in range(3):
+                store.append(_efir(i, "Stored before the index"))
+            index = EFIRSearchIndex()
+
+            def slow_add(efir):
+                if efir['complaint_number'] == "EFIR000000":
+                    # An append while the replay is running neither waits nor goes missing
+                    appender = threading.Thread(target=store.append, args=(_efir(7, "Filed during replay"),))
+                    appender.start()
+                    appender.join(1)
+                    self.assertFalse(appender.is_alive())
+                index.add(efir)
+
+            store.subscribe(slow_add)
+            store.append(_efir(8, "Filed after replay"))
+            self.assertEqual(len(index), 5)
+            self.assertEqual(index.search("during replay")[0][0], "EFIR000007")
+            store.close()
+
+    def test_common_terms_do_not_change_results(self):
+        index = EFIRSearchIndex()
+        for i in range(2000):
+            index.add(_efir(i, f"Tourist reported item lost {'near waterfall' if i % 97 == 0 else ''}"))
+        pruned = index.search("tourist reported waterfall", limit=5)
+        # Same documents and scores as scoring every posting of every term
+        full = index.search("tourist reported waterfall", limit=5, area="shillong")
+        self.assertEqual(pruned, full)
+        self.assertEqual(len(pruned), 5)
+
+    def test_large_index_queries_touch_only_matching_postings(self):
+        index = EFIRSearchIndex()
+        for i in range(20000):
+            index.add(_efir(i, f"Routine report {i} lost item", area=f"area{i % 50}"))
+        index.add(_efir(99999, "Lost near the unusual waterfall"))
+        started = time.perf_counter()
+        self.assertEqual(index.search("waterfall")[0][0], "EFIR099999")
+        self.assertLess(time.perf_counter() - started, 0.25)
+        self.assertEqual(len(index.search("lost item", limit=5)), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
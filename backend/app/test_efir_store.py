@@ -0,0 +1,132 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from datetime import datetime
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import AutomatedEFIRGenerator
+from services.efir_numbers import EFIRNumberAllocator
+from services.efir_store import EFIRStore
+
+
+def _efir(number, tourist_id, timestamp):
+    return {
+        'complaint_number': number,
+        'date_time': datetime.fromtimestamp(timestamp).isoformat(),
+        'complainant_details': {'tourist_id': tourist_id},
+        'incident_details': {'type': 'MISSING_PERSON', 'severity': 'HIGH'},
+    }
+
+
+class TestEFIRStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.directory = self.tmp.name
+
+    def open_store(self, **kwargs):
+        store = EFIRStore(self.directory, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_lookup_by_number_tourist_and_time(self):
+        store = self.open_store()
+        for i in range(20):
+            store.append(_efir(f"EFIR{i:04d}", f"tourist{i % 3}", 1000 + i))
+        self.assertEqual(store.get("EFIR0007")['complainant_details']['tourist_id'], "tourist1")
+        self.assertIsNone(store.get("EFIR9999"))
+
+        mine = [e['complaint_number'] for e in store.by_tourist("tourist2", limit=3)]
+        self.assertEqual(mine, ["EFIR0017", "EFIR0014", "EFIR0011"])
+
+        window = [e['complaint_number'] for e in store.range(1005, 1009)]
+        self.assertEqual(window, [f"EFIR{i:04d}" for i in range(5, 10)])
+        self.assertEqual(store.count(1005, 1009), 5)
+        self.assertEqual([e['complaint_number'] for e in store.range(1005, 1009, limit=2, offset=1)],
+                         ["EFIR0006", "EFIR0007"])
+
+    def test_group_commit_and_restart(self):
+        store = self.open_store(commit_interval_ms=1000)
+        for i in range(10):
+            store.append(_efir(f"EFIR{i:04d}", "t", 1000 + i))
+        self.assertEqual(store.stats()["uncommitted"], 10)
+        store.flush()
+        self.assertEqual(store.stats()["uncommitted"], 0)
+        self.assertEqual(store.stats()["group_commits"], 1)
+        store.close()
+
+        reopened = self.open_store()
+        self.assertEqual(len(reopened), 10)
+        self.assertEqual(reopened.get("EFIR0003")['date_time'], datetime.fromtimestamp(1003).isoformat())
+
+    def test_torn_tail_is_dropped_on_recovery(self):
+        store = self.open_store()
+        store.append(_efir("EFIR0001", "t", 1000))
+        store.close()
+        segment = [name for name in os.listdir(self.directory) if name.endswith(".ndjson")][0]
+        with open(os.path.join(self.directory, segment), "ab") as f:
+            f.write(b'{"complaint_number": "EFIR00')  # crash mid-write
+
+        reopened = self.open_store()
+        self.assertEqual(len(reopened), 1)
+        reopened.append(_efir("EFIR0002", "t", 1001))
+        self.assertEqual(reopened.get("EFIR0002")['complaint_number'], "EFIR0002")
+        reopened.close()
+        self.assertEqual(len(self.open_store()), 2)
+
+    def test_segments_rotate(self):
+        store = self.open_store(segment_bytes=1024)
+        for i in range(50):
+            store.append(_efir(f"EFIR{i:04d}", "t", 1000 + i))
+        self.assertGreater(store.stats()["segments"], 1)
+        self.assertEqual(store.get("EFIR0000")['complaint_number'], "EFIR0000")
+        self.assertEqual(store.get("EFIR0049")['complaint_number'], "EFIR0049")
+
+    def test_second_writer_sees_first(self):
+        first = self.open_store()
+        second = self.open_store()
+        self.assertNotEqual(first.writer_slot, second.writer_slot)
+        first.append(_efir("EFIR0001", "t", 1000))
+        second.append(_efir("EFIR0002", "t", 1001))
+        self.assertIsNotNone(second.get("EFIR0001"))
+        self.assertEqual([e['complaint_number'] for e in first.range(0, 2000)], ["EFIR0001", "EFIR0002"])
+
+    def test_tailing_reads_in_chunks(self):
+        first = self.open_store()
+        for i in range(30):
+            first.append(_efir(f"EFIR{i:04d}", "t", 1000 + i))
+        with open(first._segment_path, "ab") as f:
+            f.write(b'{"complaint_number": "EFIR9')  # another writer mid-append
+        second = self.open_store()
+        second.tail_chunk_bytes = 100  # smaller than one record
+        second._read_offsets.clear()
+        second._by_number.clear()
+        second.refresh()
+        self.assertEqual(len(second), 30)
+        self.assertEqual(second.get("EFIR0029")['complaint_number'], "EFIR0029")
+
+    def test_committer_sleeps_until_an_append(self):
+        store = self.open_store(commit_interval_ms=1)
+        time.sleep(0.05)
+        self.assertEqual(store.stats()["group_commits"], 0)
+        store.append(_efir("EFIR0001", "t", 1000))
+        deadline = time.time() + 2
+        while store.stats()["group_commits"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(store.stats()["group_commits"], 1)
+        self.assertEqual(store.stats()["uncommitted"], 0)
+
+    def test_generator_appends_to_store(self):
+        store = self.open_store()
+        generator = AutomatedEFIRGenerator(numbers=EFIRNumberAllocator(), store=store)
+        efir = generator.generate_efir({'tourist_id': 'tourist123', 'incident_type': 'SMS_EMERGENCY'})
+        self.assertEqual(store.get(efir['complaint_number'])['incident_details']['type'], 'SMS_EMERGENCY')
+        self.assertEqual(len(store.by_tourist('tourist123')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
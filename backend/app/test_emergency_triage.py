@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import MultilingualEmergencyProcessor
+
+
+class TestTriageCascade(unittest.TestCase):
+    def setUp(self):
+        self.processor = MultilingualEmergencyProcessor()
+        self.translations = []
+
+        def translator(texts, **kwargs):
+            self.translations.extend(texts)
+            return [{'translation_text': "Help! I am injured near the temple, call an ambulance"} for _ in texts]
+
+        self.processor.translator = translator
+
+    def test_clear_native_sos_is_decided_without_translating(self):
+        result = self.processor.process_emergency_text("मदद! दुर्घटना हो गई है", defer_translation=True)
+        self.assertEqual(self.translations, [])
+        self.assertEqual((result['language'], result['emergency_level']), ('hindi', 9))
+        self.assertTrue(result['requires_immediate_response'])
+        self.assertEqual(result['triage_stage'], 'native_keywords')
+        self.assertTrue(result['translation_pending'])
+
+        completed = self.processor.complete_translation(result)
+        self.assertEqual(len(self.translations), 1)
+        self.assertFalse(completed['translation_pending'])
+        self.assertEqual(completed['emergency_level'], 9)  # never lowered by the translation
+        self.assertTrue(completed['extracted_info']['transport_needed'])
+        self.assertEqual(completed['original_text'], "मदद! दुर्घटना हो गई है")
+
+    def test_ambiguous_native_text_is_translated_before_answering(self):
+        result = self.processor.process_emergency_text("मैं मंदिर के पास हूँ", defer_translation=True)
+        self.assertEqual(len(self.translations), 1)
+        self.assertEqual(result['triage_stage'], 'translation')
+        self.assertFalse(result['translation_pending'])
+        self.assertEqual(result['emergency_level'], 9)
+
+    def test_english_and_non_deferred_paths(self):
+        english = self.processor.process_emergency_text("I'm lost near the fort", defer_translation=True)
+        self.assertEqual((english['triage_stage'], english['emergency_level']), ('keywords', 5))
+        self.assertEqual(self.translations, [])
+
+        # Without defer_translation every non-English message is translated, as before
+        result = self.processor.process_emergency_text("உதவி! அவசரம்")
+        self.assertEqual(len(self.translations), 1)
+        self.assertEqual(result['triage_stage'], 'translation')
+
+
+if __name__ == "__main__":
+    unittest.main()
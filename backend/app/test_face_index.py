@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+import unittest
+
+import numpy as np
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import TouristVerificationSystem
+from services.face_index import FaceEncodingIndex
+
+
+class TestFaceEncodingIndex(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+
+    def test_identify_matches_brute_force(self):
+        index = FaceEncodingIndex(capacity=4)  # forces several doublings
+        encodings = self.rng.normal(0, 0.1, (500, 128))
+        for i, encoding in enumerate(encodings):
+            index.add(f"t{i}", encoding)
+        probe = encodings[123] + self.rng.normal(0, 0.01, 128)
+
+        expected = np.argsort(np.linalg.norm(encodings - probe, axis=1))[:5]
+        found = index.identify(probe, k=5)
+        self.assertEqual([tourist_id for tourist_id, _ in found], [f"t{i}" for i in expected])
+        self.assertAlmostEqual(found[0][1], float(np.linalg.norm(encodings[123] - probe)), places=4)
+        self.assertEqual(index.identify(encodings[7], k=1)[0], ("t7", 0.0))
+
+    def test_dict_like_and_removal(self):
+        index = FaceEncodingIndex()
+        a, b, c = (self.rng.normal(0, 0.1, 128) for _ in range(3))
+        index.add("a", a)
+        index.add("b", b)
+        index.add("c", c)
+        self.assertIn("b", index)
+        np.testing.assert_allclose(index["b"], b.astype(np.float32))
+        self.assertTrue(index.remove("a"))
+        self.assertFalse(index.remove("a"))
+        self.assertNotIn("a", index)
+        self.assertEqual(sorted(index), ["b", "c"])
+        self.assertEqual(index.identify(c, k=10)[0][0], "c")
+        self.assertEqual(len(index.identify(c, k=10)), 2)
+        index.add("c", a)  # re-registration replaces
+        self.assertEqual(len(index), 2)
+        self.assertAlmostEqual(index.distance("c", a), 0.0, places=5)
+        self.assertIsNone(index.distance("a", a))
+
+    def test_large_gallery(self):
+        index = FaceEncodingIndex(capacity=100000)
+        encodings = self.rng.normal(0, 0.1, (100000, 128)).astype(np.float32)
+        for i in range(0, len(encodings), 1000):
+            for j in range(i, i + 1000):
+                index.add(f"t{j}", encodings[j])
+        started = time.perf_counter()
+        found = index.identify(encodings[54321], k=10)
+        self.assertLess(time.perf_counter() - started, 0.1)
+        self.assertEqual(found[0][0], "t54321")
+
+    def test_verification_system_identifies(self):
+        system = TouristVerificationSystem()
+        system.known_faces.add("alice", np.zeros(128))
+        system.known_faces.add("bob", np.full(128, 0.2))
+        # The CV stub (or a blank test image) yields an all-zero encoding
+        result = system.identify_tourist(np.ones((300, 300, 3), dtype=np.uint8), top_k=2)
+        if not result['face_found']:
+            self.skipTest("face_recognition found no face in the blank image")
+        self.assertEqual(result['candidates'][0], {'tourist_id': 'alice', 'distance': 0.0, 'match': True})
+        self.assertFalse(result['candidates'][1]['match'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import TouristAssistantChatbot
+from services.faq_index import FAQIndex
+
+FAQ_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "chatbot_faq.json")
+
+
+class TestFAQIndex(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = tmp.name
+        self.index = FAQIndex.open(FAQ_PATH, self.directory)
+
+    def test_matches_paraphrases(self):
+        self.assertEqual(self.index.match("I lost my passport")["id"], "lost-passport")
+        self.assertEqual(self.index.match("which number to call for ambulance")["id"], "emergency-numbers")
+        self.assertEqual(self.index.match("is it safe to walk at night here")["id"], "night-safety")
+        self.assertEqual(self.index.match("how to get inner line permit")["id"], "trekking-permits")
+        self.assertEqual(self.index.match("my passport was stolen")["id"], "lost-passport")
+
+    def test_unrelated_queries_miss(self):
+        for query in ("tell me a joke", "what is the weather in Paris", "best food in town", ""):
+            self.assertIsNone(self.index.match(query), query)
+        stats = self.index.stats()
+        self.assertEqual(stats["lookups"], 4)
+        self.assertEqual(stats["hit_rate"], 0.0)
+
+    def test_near_misses_are_not_answered(self):
+        # Filler ("what should I do", "is it") or one shared word must not pick an entry
+        for query in ("my friend is lost what should i do", "my phone was stolen what should i do",
+                      "is it safe", "my child is missing", "I lost my way", "what should i do",
+                      "is the water safe to drink", "can you help me with my luggage"):
+            self.assertIsNone(self.index.match(query), query)
+
+    def test_loaded_memory_mapped_and_reused(self):
+        self.assertIsInstance(self.index.weights, np.memmap)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        again = FAQIndex.open(FAQ_PATH, self.directory)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+        self.assertEqual(again.search("ATM near me")[0]["id"], "money")
+
+    def test_lookup_is_fast(self):
+        self.index.match("where is the nearest hospital")
+        started = time.perf_counter()
+        for _ in range(100):
+            self.index.match("where is the nearest hospital")
+        self.assertLess((time.perf_counter() - started) / 100, 0.002)
+
+    def test_chatbot_answers_from_faq_but_not_emergencies(self):
+        chatbot = TouristAssistantChatbot(faq=self.index)
+        result = chatbot.process_query("t1", "Where can I exchange money?")
+        self.assertEqual(result["source"], "faq")
+        self.assertIn("authorised money changers", result["response"])
+        result = chatbot.process_query("t1", "Help! which number for police emergency")
+        self.assertEqual(result["source"], "template")
+        self.assertTrue(result["requires_human_intervention"])
+        self.assertEqual(chatbot.process_query("t1", "tell me a joke")["source"], "template")
+        self.assertAlmostEqual(self.index.stats()["hit_rate"], 1 / 2)
+
+    def test_faq_hit_skips_llm(self):
+        class NoLLM:
+            async def complete(self, *args, **kwargs):
+                raise AssertionError("LLM called for an FAQ question")
+
+        chatbot = TouristAssistantChatbot(llm=NoLLM(), faq=self.index)
+        result = asyncio.run(chatbot.aprocess_query("t1", "How do I get a local SIM card?"))
+        self.assertEqual(result["source"], "faq")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import threading
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.inference_pool import InferencePools
+
+
+class TestInferencePools(unittest.TestCase):
+    def setUp(self):
+        self.pools = InferencePools({"tabular": 2, "vision": 1})
+
+    def tearDown(self):
+        self.pools.shutdown()
+
+    def test_runs_off_the_event_loop(self):
+        async def run():
+            loop_thread = threading.get_ident()
+            worker_thread = await self.pools.run("tabular", threading.get_ident)
+            return loop_thread, worker_thread
+
+        loop_thread, worker_thread = asyncio.run(run())
+        self.assertNotEqual(loop_thread, worker_thread)
+
+    def test_queue_depth_accounting(self):
+        release = threading.Event()
+        futures = [self.pools.pool("vision").submit(release.wait) for _ in range(3)]
+
+        stats = self.pools.stats()["vision"]
+        self.assertEqual(stats["workers"], 1)
+        self.assertEqual(stats["queued"] + stats["running"], 3)
+        self.assertGreaterEqual(stats["max_queued"], 2)
+
+        release.set()
+        for future in futures:
+            future.result(timeout=5)
+        stats = self.pools.stats()["vision"]
+        self.assertEqual((stats["queued"], stats["running"], stats["completed"]), (0, 0, 3))
+
+    def test_cancelled_before_start_leaves_the_queue(self):
+        release = threading.Event()
+        blocker = self.pools.pool("vision").submit(release.wait)
+
+        async def run():
+            task = asyncio.ensure_future(self.pools.run("vision", lambda: None))
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.pools.stats()["vision"]["queued"], 1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        release.set()
+        blocker.result(timeout=5)
+        stats = self.pools.stats()["vision"]
+        self.assertEqual((stats["queued"], stats["running"], stats["completed"]), (0, 0, 1))
+
+    def test_failures_propagate_and_are_counted(self):
+        def boom():
+            raise ValueError("bad input")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.pools.run("tabular", boom))
+        self.assertEqual(self.pools.stats()["tabular"]["failed"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
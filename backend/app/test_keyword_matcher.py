@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import MultilingualEmergencyProcessor
+from services.keyword_matcher import KeywordMatcher, tokenize
+
+
+class TestTokenize(unittest.TestCase):
+    def test_keeps_indic_marks_and_drops_punctuation(self):
+        self.assertEqual(tokenize("मदद करो! मैं खो गया हूँ।"), ["मदद", "करो", "मैं", "खो", "गया", "हूँ"])
+        self.assertEqual(tokenize("Help, I'm LOST"), ["help", "i", "m", "lost"])
+
+
+class TestKeywordMatcher(unittest.TestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            "location": ["at", "near"],
+            "hindi": ["खो गया", "मदद"],
+            "high": ["help", "emergency"],
+            "phrase": ["help me"],
+        })
+
+    def test_keywords_start_at_a_word_boundary(self):
+        self.assertEqual(self.matcher.scan("that boat is great"), {})
+        self.assertEqual(self.matcher.scan("At the gate, NEAR the fort"), {"location": {"at", "near"}})
+        self.assertEqual(self.matcher.scan("unhelpful"), {})
+
+    def test_inflected_forms_match(self):
+        self.assertEqual(self.matcher.scan("helpless, emergency"), {"high": {"help", "emergency"}})
+        self.assertEqual(self.matcher.scan("nearby"), {"location": {"near"}})
+        # Short keywords stay whole words
+        self.assertEqual(self.matcher.scan("attic"), {})
+
+    def test_one_scan_reports_every_table(self):
+        hits = self.matcher.scan("मदद! मैं खो गया हूँ, emergency near the temple")
+        self.assertEqual(hits, {"hindi": {"मदद", "खो गया"}, "high": {"emergency"}, "location": {"near"}})
+        # A multi-word keyword must not match a word that merely ends like its first word
+        self.assertNotIn("hindi", self.matcher.scan("सखो गया"))
+
+    def test_longest_keyword_at_a_position_wins(self):
+        self.assertEqual(self.matcher.scan("help me"), {"phrase": {"help me"}})
+        self.assertEqual(self.matcher.scan("help us"), {"high": {"help"}})
+
+
+class TestEmergencyProcessorScan(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.processor = MultilingualEmergencyProcessor()
+
+    def test_levels_languages_and_flags(self):
+        p = self.processor
+        self.assertEqual(p._assess_emergency_level("Help! Emergency! I'm injured in an accident"), 9)
+        self.assertEqual(p._assess_emergency_level("Help, I'm lost"), 7)
+        self.assertEqual(p._assess_emergency_level("I'm confused about the directions"), 5)
+        self.assertEqual(p._assess_emergency_level("The view is beautiful here"), 3)
+        # Inflected forms of the urgency words still count
+        self.assertEqual(p._assess_emergency_level("This place is dangerous, we had accidents"), 9)
+        self.assertEqual(p._assess_emergency_level("I am panicking, helpless"), 9)
+        self.assertEqual(p._detect_language("সাহায্য করুন, আমি হারিয়ে গেছি"), "bengali")
+        self.assertEqual(p._detect_language("मदत करा, मी हरवलो आहे"), "marathi")
+        info = p._extract_emergency_info("Please call my contact, we are near the hospital")
+        self.assertTrue(info["location_mentioned"] and info["contact_requested"] and info["transport_needed"])
+        self.assertFalse(p._extract_emergency_info("That boat ride was great")["location_mentioned"])
+
+    def test_process_reuses_scan(self):
+        result = self.processor.process_emergency_text("Help! I'm injured near the waterfall. Need ambulance!")
+        self.assertEqual(result["language"], "english")
+        self.assertTrue(result["requires_immediate_response"])
+        self.assertTrue(result["extracted_info"]["transport_needed"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import MultilingualEmergencyProcessor
+from services.language_detector import ScriptLanguageDetector
+
+SAMPLES = {
+    "Help me, I'm lost": "english",
+    "সাহায্য করুন, আমি হারিয়ে গেছি": "bengali",
+    "உதவி செய்யுங்கள், நான் தொலைந்து போனேன்": "tamil",
+    "મદદ કરો, હું ખોવાઈ ગયો છું": "gujarati",
+    "నాకు సహాయం చేయండి": "telugu",
+    "मुझे अस्पताल ले चलो": "hindi",
+    "मला दवाखान्यात न्या": "marathi",
+    "123 !!": "english",
+}
+
+
+class TestScriptLanguageDetector(unittest.TestCase):
+    def setUp(self):
+        self.detector = ScriptLanguageDetector()
+
+    def test_detects_without_any_keyword(self):
+        for text, language in SAMPLES.items():
+            self.assertEqual(self.detector.detect(text), language, text)
+
+    def test_batch_matches_single(self):
+        texts = list(SAMPLES) + ["", "Help मदद"]
+        self.assertEqual(self.detector.detect_many(texts), [self.detector.detect(t) for t in texts])
+        self.assertEqual(self.detector.detect_many([]), [])
+
+    def test_histogram_ignores_digits_and_punctuation(self):
+        self.assertEqual(self.detector.script_histogram("Help! मदद 112"), {"latin": 4, "devanagari": 3})
+
+
+class TestProcessorLanguage(unittest.TestCase):
+    def test_keywords_break_devanagari_ties(self):
+        processor = MultilingualEmergencyProcessor()
+        self.assertEqual(processor._detect_language("मदद करो, मैं खो गया हूँ"), "hindi")
+        self.assertEqual(processor._detect_language("मदत"), "marathi")
+        self.assertEqual(processor._detect_language("మాకు ప్రమాదం జరిగింది"), "telugu")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import RealTimeTourismAnalytics, SmartTouristSafetySystem
+from services.live_state import LIVE_STATE_DTYPE, LiveStateStore
+
+
+class TestLiveStateStore(unittest.TestCase):
+    def setUp(self):
+        self.store = LiveStateStore(capacity=2)
+
+    def test_update_and_get(self):
+        self.store.update(["T1"], safety_score=[7], last_seen=[1000])
+        self.store.update(["T1"], zones=["fort"], lat=[28.655], lng=[77.2425], location_risk=[8])
+        state = self.store.get("T1")
+        self.assertEqual(state["safety_score"], 7)
+        self.assertEqual(state["zone_id"], "fort")
+        self.assertAlmostEqual(state["latitude"], 28.655, places=4)
+        self.assertIsNone(state["incident_probability"])
+        self.assertIsNone(self.store.get("unknown"))
+
+    def test_grows_past_initial_capacity(self):
+        ids = [f"T{i}" for i in range(10)]
+        self.store.update(ids, safety_score=np.arange(1, 11))
+        self.assertEqual(len(self.store), 10)
+        self.assertGreaterEqual(self.store.capacity, 10)
+        self.assertEqual(self.store.get("T9")["safety_score"], 10)
+
+    def test_unknown_column_rejected(self):
+        with self.assertRaises(KeyError):
+            self.store.update(["T1"], speed=[3])
+
+    def test_vectorized_fleet_queries(self):
+        now = 10_000
+        self.store.update(["A", "B", "C", "D"], last_seen=[now, now - 10, now - 5000, now],
+                          safety_score=[2, 8, 2, 9], location_risk=[1, 1, 1, 9],
+                          zones=[None, "fort", "fort", "beach"])
+        self.assertEqual(self.store.count_active(60, now), 3)
+        self.assertEqual(self.store.count_high_risk(60, now), 2)  # A by score, D by location
+        self.assertEqual(self.store.zone_counts(60, now), {"fort": 1, "beach": 1})
+
+    def test_bbox(self):
+        self.store.update(["A", "B"], lat=[10.0, 20.0], lng=[70.0, 80.0])
+        self.assertEqual(self.store.tourists_in_bbox(5, 65, 15, 75), ["A"])
+
+    def test_million_rows_fit_in_tens_of_megabytes(self):
+        self.assertLessEqual(LIVE_STATE_DTYPE.itemsize * 1_000_000, 64 * 1024 * 1024)
+
+
+class TestSafetySystemLiveState(unittest.TestCase):
+    def test_pings_update_store_and_dashboard(self):
+        system = SmartTouristSafetySystem()
+        system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        system.geo_fencing.add_risk_zone("fort", [[0, 0], [0, 1], [1, 1], [1, 0]], 9)
+        system.process_tourist_batch([
+            ("T1", {"latitude": 0.5, "longitude": 0.5}),
+            ("T2", {"group_size": 3}),
+        ])
+        self.assertEqual(system.live_state.get("T1")["zone_id"], "fort")
+        self.assertEqual(system.live_state.get("T1")["location_risk"], 9)
+        self.assertIsNone(system.live_state.get("T2")["latitude"])
+
+        metrics = RealTimeTourismAnalytics(system.live_state).get_dashboard_metrics()
+        self.assertEqual(metrics["active_tourists"], 2)
+        self.assertEqual(metrics["high_risk_tourists"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import TouristAssistantChatbot
+from services.llm_client import LLMClient
+
+
+class _MockCompletions(BaseHTTPRequestHandler):
+    """
+    OpenAI-style /chat/completions that echoes the prompt after server.delay seconds,
+    or with "stream": true sends server.tokens as SSE chunks server.token_delay apart.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.requests.append((self.client_address, self.headers.get("Authorization"), body))
+        if body.get("stream"):
+            return self.stream_tokens()
+        time.sleep(self.server.delay)
+        if self.server.status != 200:
+            self.send_response(self.server.status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        payload = json.dumps({"choices": [{"message": {"content": "LLM: " + body["messages"][-1]["content"]}}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            self.wfile.write(payload)
+        except ConnectionError:
+            pass  # the client gave up at its deadline
+
+    def stream_tokens(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for token in self.server.tokens:
+                time.sleep(self.server.token_delay)
+                chunk = {"choices": [{"delta": {"content": token}}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except ConnectionError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class TestLLMClient(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _MockCompletions)
+        self.server.daemon_threads = True
+        self.server.delay, self.server.status, self.server.requests = 0.0, 200, []
+        self.server.tokens, self.server.token_delay = ["Take ", "the ", "ropeway."], 0.0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+
+    def client(self, **kwargs):
+        return LLMClient("test-key", self.base_url, **kwargs)
+
+    def test_completion_reuses_connection(self):
+        llm = self.client()
+
+        async def run():
+            first = await llm.complete([{"role": "user", "content": "hello"}])
+            second = await llm.complete([{"role": "user", "content": "again"}])
+            await llm.aclose()
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), ("LLM: hello", "LLM: again"))
+        (first_peer, auth, body), (second_peer, _, _) = self.server.requests
+        self.assertEqual(auth, "Bearer test-key")
+        self.assertEqual(body["model"], "gpt-3.5-turbo")
+        self.assertEqual(first_peer, second_peer)  # same keep-alive connection
+        self.assertEqual(llm.stats()["ok"], 2)
+
+    def test_deadline_falls_back(self):
+        self.server.delay = 0.5
+        llm = self.client(timeout_seconds=0.1)
+
+        async def run():
+            started = time.perf_counter()
+            text = await llm.complete([{"role": "user", "content": "slow"}])
+            elapsed = time.perf_counter() - started
+            await llm.aclose()
+            return text, elapsed
+
+        text, elapsed = asyncio.run(run())
+        self.assertIsNone(text)
+        self.assertLess(elapsed, 0.4)
+        self.assertEqual(llm.stats()["timeout"], 1)
+
+    def test_errors_fall_back(self):
+        self.server.status = 500
+        llm = self.client()
+        self.assertIsNone(asyncio.run(llm.complete([{"role": "user", "content": "x"}])))
+        self.assertEqual(llm.stats()["error"], 1)
+
+    def test_semaphore_limits_concurrency(self):
+        self.server.delay = 0.2
+        llm = self.client(max_concurrency=2, timeout_seconds=0.3)
+
+        async def run():
+            results = await asyncio.gather(*(llm.complete([{"role": "user", "content": str(i)}]) for i in range(4)))
+            await llm.aclose()
+            return results
+
+        results = asyncio.run(run())
+        # Two run; the other two only get a slot once those finish, too late for their deadline
+        self.assertEqual(sum(r is not None for r in results), 2)
+        self.assertEqual(llm.stats()["busy"] + llm.stats()["timeout"], 2)
+
+    def test_chatbot_uses_llm_then_template(self):
+        chatbot = TouristAssistantChatbot(llm=self.client(timeout_seconds=0.1))
+        result = asyncio.run(chatbot.aprocess_query("t1", "Where is the museum?"))
+        self.assertEqual(result["source"], "llm")
+        self.assertTrue(result["response"].startswith("LLM: Tourist asked: Where is the museum?"))
+
+        self.server.delay = 0.5
+        result = asyncio.run(chatbot.aprocess_query("t1", "Is it safe?"))
+        self.assertEqual(result["source"], "template")
+        self.assertEqual(result["response"], TouristAssistantChatbot.TEMPLATES["safety"])
+        self.assertEqual(len(chatbot.conversations.get("t1")), 2)
+
+
+    def test_stream_yields_tokens(self):
+        llm = self.client()
+
+        async def run():
+            tokens = [token async for token in llm.stream([{"role": "user", "content": "route?"}])]
+            await llm.aclose()
+            return tokens
+
+        self.assertEqual(asyncio.run(run()), ["Take ", "the ", "ropeway."])
+        self.assertTrue(self.server.requests[0][2]["stream"])
+
+    def test_stream_deadline_cuts_off(self):
+        self.server.token_delay = 0.15
+        llm = self.client(timeout_seconds=0.25)
+
+        async def run():
+            tokens = []
+            with self.assertRaises(asyncio.TimeoutError):
+                async for token in llm.stream([{"role": "user", "content": "route?"}]):
+                    tokens.append(token)
+            await llm.aclose()
+            return tokens
+
+        self.assertEqual(asyncio.run(run()), ["Take "])
+        self.assertEqual(llm.stats()["timeout"], 1)
+        self.assertEqual(llm.stats()["in_flight"], 0)
+
+    def test_chatbot_stream_sends_template_first_and_records_final_text(self):
+        self.server.token_delay = 0.05
+        chatbot = TouristAssistantChatbot(llm=self.client())
+
+        async def run():
+            events = []
+            started = time.perf_counter()
+            async for event, data in chatbot.astream_query("t1", "How to reach the peak?"):
+                events.append((event, data, time.perf_counter() - started))
+            return events
+
+        events = asyncio.run(run())
+        self.assertEqual(events[0][0], "template")
+        self.assertLess(events[0][2], 0.05)  # before the model's first token
+        self.assertEqual([data for event, data, _ in events if event == "token"], ["Take ", "the ", "ropeway."])
+        self.assertEqual(events[-1][0], "done")
+        self.assertEqual(events[-1][1]["source"], "llm")
+        self.assertEqual(chatbot.conversations.get("t1")[0]["bot"], "Take the ropeway.")
+
+    def test_chatbot_stream_records_on_disconnect(self):
+        self.server.token_delay = 0.05
+        chatbot = TouristAssistantChatbot(llm=self.client())
+
+        async def run():
+            stream = chatbot.astream_query("t1", "Where is the lake?")
+            async for event, _ in stream:
+                if event == "token":
+                    break
+            await stream.aclose()
+
+        asyncio.run(run())
+        self.assertEqual(chatbot.conversations.get("t1")[0]["bot"], "Take ")
+        self.assertEqual(chatbot.llm.stats()["in_flight"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
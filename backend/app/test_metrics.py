@@ -0,0 +1,86 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry(buckets=(0.1, 1.0))
+
+    def test_histogram_buckets_are_cumulative(self):
+        for value in (0.05, 0.5, 0.5, 5.0):
+            self.registry.observe("stage_duration_seconds", value, component="safety_model", stage="inference")
+        text = self.registry.render_prometheus()
+        labels = 'component="safety_model",stage="inference"'
+        self.assertIn("# TYPE stage_duration_seconds histogram", text)
+        self.assertIn(f'stage_duration_seconds_bucket{{{labels},le="0.1"}} 1', text)
+        self.assertIn(f'stage_duration_seconds_bucket{{{labels},le="1.0"}} 3', text)
+        self.assertIn(f'stage_duration_seconds_bucket{{{labels},le="+Inf"}} 4', text)
+        self.assertIn(f"stage_duration_seconds_count{{{labels}}} 4", text)
+        self.assertIn(f"stage_duration_seconds_sum{{{labels}}} 6.05", text)
+
+    def test_timer_context_and_decorator(self):
+        with self.registry.timer("stage_duration_seconds", stage="a"):
+            pass
+
+        @self.registry.timer("stage_duration_seconds", stage="b")
+        def work():
+            return 42
+
+        self.assertEqual(work(), 42)
+        histograms = self.registry.snapshot()["histograms"]["stage_duration_seconds"]
+        self.assertEqual(sorted(k[0][1] for k, _ in histograms), ["a", "b"])
+
+    def test_counters_gauges_and_escaping(self):
+        self.registry.inc("alerts_total", alert_type='geo "fence"')
+        self.registry.inc("alerts_total", 2, alert_type='geo "fence"')
+        self.registry.register_gauge("inference_pool_queued", lambda: [({"pool": "nlp"}, 3)])
+        text = self.registry.render_prometheus()
+        self.assertIn('alerts_total{alert_type="geo \\"fence\\""} 3', text)
+        self.assertIn('inference_pool_queued{pool="nlp"} 3', text)
+
+    def test_merges_snapshots_from_other_workers(self):
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            registry = MetricsRegistry(metrics_dir, buckets=(0.1, 1.0))
+            registry.inc("stage_items_total", 5, stage="ping")
+            registry.observe("stage_duration_seconds", 0.05, stage="ping")
+            registry.register_gauge("inference_pool_queued", lambda: [({"pool": "nlp"}, 1)])
+
+            # Another worker (pid 1 is always alive) and one that has exited
+            for pid in (1, 2 ** 22 + 1):
+                with open(os.path.join(metrics_dir, f"metrics_{pid}.json"), "w") as f:
+                    json.dump({
+                        "pid": pid,
+                        "buckets": [0.1, 1.0],
+                        "counters": {"stage_items_total": [[[["stage", "ping"]], 2]]},
+                        "histograms": {"stage_duration_seconds": [[[["stage", "ping"]], [0, 1, 0, 0.5, 1]]]},
+                        "gauges": {"inference_pool_queued": [[[["pool", "nlp"]], 4]]},
+                    }, f)
+
+            text = registry.render_prometheus()
+            self.assertIn('stage_items_total{stage="ping"} 7', text)
+            self.assertIn('stage_duration_seconds_bucket{stage="ping",le="1.0"} 2', text)
+            self.assertIn('stage_duration_seconds_count{stage="ping"} 2', text)
+            self.assertIn('inference_pool_queued{pool="nlp"} 5', text)
+            self.assertTrue(os.path.exists(os.path.join(metrics_dir, f"metrics_{os.getpid()}.json")))
+            # The exited worker's snapshot is deleted rather than summed forever
+            self.assertFalse(os.path.exists(os.path.join(metrics_dir, f"metrics_{2 ** 22 + 1}.json")))
+
+    def test_mismatched_buckets_are_skipped(self):
+        with tempfile.TemporaryDirectory() as metrics_dir:
+            registry = MetricsRegistry(metrics_dir, buckets=(0.1, 1.0))
+            with open(os.path.join(metrics_dir, "metrics_1.json"), "w") as f:
+                json.dump({"pid": 1, "buckets": [0.5], "counters": {"x_total": [[[], 1]]},
+                           "histograms": {}, "gauges": {}}, f)
+            self.assertNotIn("x_total", registry.render_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import SmartTouristSafetySystem
+from config import settings
+from services.service_registry import ServiceRegistry
+
+
+class TestServiceRegistry(unittest.TestCase):
+    def test_built_once_on_first_use(self):
+        registry = ServiceRegistry()
+        builds = []
+
+        def factory():
+            builds.append(1)
+            time.sleep(0.05)
+            return object()
+
+        registry.register("model", factory)
+        self.assertIsNone(registry.peek("model"))
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("model"))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(builds), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertIs(registry.peek("model"), results[0])
+
+    def test_warm_up_in_background_and_readiness(self):
+        registry = ServiceRegistry()
+        release = threading.Event()
+        registry.register("slow", lambda: release.wait(2) and "loaded")
+        registry.register("on_demand", lambda: "built", warm=False)
+        registry.warm_up()
+        self.assertFalse(registry.ready())
+        self.assertNotEqual(registry.status()["slow"]["state"], "ready")
+        release.set()
+        registry.warm_up().join(2)
+        self.assertTrue(registry.ready())
+        self.assertEqual(registry.status()["on_demand"]["state"], "pending")  # never needed for readiness
+
+    def test_failed_build_is_reported_and_retried(self):
+        registry = ServiceRegistry()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise OSError("weights missing")
+            return "ok"
+
+        registry.register("flaky", flaky)
+        with self.assertRaises(OSError):
+            registry.get("flaky")
+        self.assertEqual(registry.status()["flaky"],
+                         {"state": "failed", "load_seconds": None, "error": "weights missing", "degraded": []})
+        self.assertEqual(registry.get("flaky"), "ok")
+        self.assertTrue(registry.ready())
+
+    def test_aget_builds_off_the_event_loop(self):
+        registry = ServiceRegistry()
+        loop_thread = []
+        registry.register("model", lambda: threading.current_thread())
+
+        async def main():
+            loop_thread.append(threading.current_thread())
+            return await registry.aget("model")
+
+        built_on = asyncio.run(main())
+        self.assertIsNot(built_on, loop_thread[0])
+
+    def test_missing_model_artifact_is_ready_but_degraded(self):
+        system = SmartTouristSafetySystem()
+        registry = ServiceRegistry()
+
+        def warm():
+            system.warm_up()
+            return system
+
+        registry.register("safety_models", warm, fallbacks=lambda s: s.fallback_models())
+        with mock.patch.object(settings, "INCIDENT_MODEL_PATH", "/nonexistent/incident.pkl"):
+            registry.warm_up().join(10)
+        self.assertTrue(registry.ready())
+        self.assertEqual(registry.degraded(), ["safety_models"])
+        self.assertEqual(registry.status()["safety_models"]["state"], "ready")
+        self.assertIn("incident", registry.status()["safety_models"]["degraded"])
+        # The fallback still answers
+        self.assertEqual(system.incident_predictor.predict_incident_probabilities([({}, {}, {})]), [0.25])
+
+if __name__ == "__main__":
+    unittest.main()
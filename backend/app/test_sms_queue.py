@@ -0,0 +1,64 @@
+import os
+import sys
+import threading
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import MultilingualEmergencyProcessor
+from services.sms_queue import SMSPriorityQueue, priority_class
+
+
+class TestSMSPriorityQueue(unittest.TestCase):
+    def test_most_urgent_first_then_arrival_order(self):
+        queue = SMSPriorityQueue()
+        queue.push_many(["chatter 1", "sos 1", "lost", "chatter 2", "sos 2"], [3, 9, 5, 3, 9])
+        order = [queue.pop(0)[1] for _ in range(5)]
+        self.assertEqual(order, ["sos 1", "sos 2", "lost", "chatter 1", "chatter 2"])
+        self.assertIsNone(queue.pop(0))
+
+    def test_full_queue_rejects_all_but_critical(self):
+        queue = SMSPriorityQueue(max_size=2)
+        counts = queue.push_many(["a", "b", "c", "sos"], [3, 3, 7, 9])
+        self.assertEqual(counts, {"low": {"accepted": 2, "rejected": 0},
+                                  "high": {"accepted": 0, "rejected": 1},
+                                  "critical": {"accepted": 1, "rejected": 0}})
+        self.assertEqual(len(queue), 3)
+
+    def test_wait_stats_per_priority_class(self):
+        queue = SMSPriorityQueue()
+        queue.push_many(["sos", "chatter"], [9, 4])
+        queue.pop(0)
+        stats = queue.stats()
+        self.assertEqual(stats["queued"], 1)
+        self.assertEqual(stats["by_priority"]["critical"]["processed"], 1)
+        self.assertIsNotNone(stats["by_priority"]["critical"]["wait_seconds_p50"])
+        self.assertEqual(stats["by_priority"]["low"]["queued"], 1)
+        self.assertIsNone(stats["by_priority"]["low"]["wait_seconds_mean"])
+
+    def test_pop_wakes_on_push(self):
+        queue = SMSPriorityQueue()
+        popped = []
+        worker = threading.Thread(target=lambda: popped.append(queue.pop(5)))
+        worker.start()
+        queue.push_many(["sos"], [9])
+        worker.join(5)
+        self.assertEqual(popped[0][:2], (9, "sos"))
+
+    def test_priority_classes(self):
+        self.assertEqual([priority_class(l) for l in (10, 9, 7, 5, 3)], ["critical", "critical", "high", "medium", "low"])
+
+
+class TestPrescore(unittest.TestCase):
+    def test_prescore_matches_full_assessment_without_translation(self):
+        processor = MultilingualEmergencyProcessor()
+        texts = ["Help! Emergency!", "मदद! दुर्घटना हो गई है", "I'm lost", "nice weather", "मदत करा, मी हरवलो आहे"]
+        levels, languages = processor.prescore(texts)
+        self.assertEqual(levels, [9, 9, 5, 3, 7])
+        self.assertEqual(languages, [processor._detect_language(text) for text in texts])
+        self.assertEqual(languages[4], "marathi")
+
+
+if __name__ == "__main__":
+    unittest.main()
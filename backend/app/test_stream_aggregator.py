@@ -0,0 +1,96 @@
+import os
+import sys
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import AutomatedEFIRGenerator, RealTimeTourismAnalytics, SmartTouristSafetySystem
+from services.efir_numbers import EFIRNumberAllocator
+from services.stream_aggregator import (
+    DashboardAggregator,
+    SlidingActiveSet,
+    SlidingWindowCounter,
+    SlidingWindowHistogram,
+)
+
+
+class TestSlidingWindows(unittest.TestCase):
+    def test_counter_expires_whole_buckets(self):
+        counter = SlidingWindowCounter(window_seconds=60, buckets=6)
+        counter.add(0)
+        counter.add(5, count=2)
+        counter.add(30)
+        self.assertEqual(counter.total(30), 4)
+        self.assertEqual(counter.total(65), 1)  # the 0-10s bucket has left the window
+        self.assertEqual(counter.total(200), 0)
+
+    def test_active_set_counts_distinct_ids_and_latest_flag(self):
+        active = SlidingActiveSet(window_seconds=60, buckets=6)
+        active.add("A", 0, flagged=True)
+        active.add("B", 10)
+        active.add("A", 50, flagged=False)
+        self.assertEqual(active.count(55), 2)
+        self.assertEqual(active.count_flagged(55), 0)
+        active.add("B", 55, flagged=True)
+        self.assertEqual(active.count_flagged(55), 1)
+        self.assertEqual(active.count(100), 2)  # both refreshed at 50 and 55
+        self.assertEqual(active.count(125), 0)
+        self.assertEqual(active.count_flagged(125), 0)
+
+    def test_histogram_percentiles(self):
+        histogram = SlidingWindowHistogram(window_seconds=3600, bounds=(10, 20, 30), buckets=4)
+        for value in (5, 15, 15, 25):
+            histogram.observe(value, now=0)
+        self.assertEqual(histogram.count(0), 4)
+        self.assertEqual(histogram.mean(0), 15)
+        self.assertEqual(histogram.percentile(0.5, 0), 15)  # middle of the 10-20 bin
+        self.assertEqual(histogram.percentile(1.0, 0), 30)
+        self.assertEqual(histogram.percentile(0.25, 0), 10)
+        self.assertIsNone(histogram.percentile(0.5, 10000))
+
+
+class TestDashboardAggregator(unittest.TestCase):
+    def test_response_time_from_alert_to_efir(self):
+        aggregator = DashboardAggregator(active_window_seconds=600, alert_window_seconds=600,
+                                         response_window_seconds=3600)
+        aggregator.record_alert("T1", now=1000)
+        aggregator.record_alert("T1", now=1100)  # still open: response time keeps the first alert
+        aggregator.record_efir("T1", now=1300)
+        aggregator.record_efir(response_seconds=60, now=1300)
+        snapshot = aggregator.snapshot(now=1300)
+        self.assertEqual(snapshot["recent_alerts"], 2)
+        self.assertEqual(snapshot["recent_efirs"], 2)
+        self.assertEqual(snapshot["open_alerts"], 0)
+        self.assertEqual(snapshot["responses_measured"], 2)
+        self.assertEqual(snapshot["avg_response_time_seconds"], 180)
+
+    def test_unanswered_alerts_stop_waiting(self):
+        aggregator = DashboardAggregator(response_window_seconds=100)
+        aggregator.record_alert("T1", now=0)
+        aggregator.record_alert("T2", now=150)
+        self.assertEqual(aggregator.snapshot(now=150)["open_alerts"], 1)
+
+
+class TestPipelineFeedsDashboard(unittest.TestCase):
+    def test_pings_alerts_and_efirs_reach_dashboard(self):
+        system = SmartTouristSafetySystem()
+        system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        system.geo_fencing.add_risk_zone("fort", [[0, 0], [0, 1], [1, 1], [1, 0]], 9)
+        system.process_tourist_batch([
+            ("T1", {"latitude": 0.5, "longitude": 0.5}),
+            ("T2", {"group_size": 3}),
+        ])
+        system.process_tourist_batch([("T2", {"group_size": 3})])
+        AutomatedEFIRGenerator(system.aggregator, EFIRNumberAllocator()).generate_efir({"tourist_id": "T1"})
+
+        metrics = RealTimeTourismAnalytics(aggregator=system.aggregator).get_dashboard_metrics()
+        self.assertEqual(metrics["active_tourists"], 2)
+        self.assertEqual(metrics["high_risk_tourists"], 1)
+        self.assertEqual(metrics["recent_alerts"], 1)
+        self.assertEqual(metrics["recent_efirs"], 1)
+        self.assertIsNotNone(metrics["avg_response_time_minutes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import RealTimeTourismAnalytics
+from services.stream_aggregator import DashboardAggregator
+from services.timeseries import RingSeries, TimeSeriesStore
+
+T0 = 1_700_000_000
+
+
+class TestRingSeries(unittest.TestCase):
+    def test_aggregates_within_an_interval(self):
+        ring = RingSeries(None, step=60, slots=10)
+        for value in (1, 5, 3):
+            ring.add(value, T0 + 5)
+        (point,) = ring.range(T0, T0)
+        self.assertEqual((point["count"], point["sum"], point["min"], point["max"], point["last"]), (3, 9, 1, 5, 3))
+
+    def test_overwritten_slots_read_as_empty(self):
+        ring = RingSeries(None, step=1, slots=10)
+        ring.add(1, T0)
+        ring.add(2, T0 + 10)  # same slot, one lap later
+        self.assertEqual(ring.range(T0, T0)[0]["count"], 0)
+        self.assertEqual(ring.range(T0 + 10, T0 + 10)[0]["last"], 2)
+
+    def test_range_longer_than_ring_keeps_newest_lap(self):
+        ring = RingSeries(None, step=1, slots=10)
+        for t in range(30):
+            ring.add(t, T0 + t)
+        points = ring.range(T0, T0 + 29)
+        self.assertEqual(len(points), 10)  # capped at one lap
+        self.assertEqual(int(points[0]["t"]), T0 + 20)
+        self.assertEqual([float(p["last"]) for p in points], [float(t) for t in range(20, 30)])
+
+
+class TestTimeSeriesStore(unittest.TestCase):
+    def test_rollup_into_every_resolution(self):
+        store = TimeSeriesStore("", resolutions=((1, 120), (60, 10)))
+        for t in range(120):
+            store.record("active_tourists", t % 10, T0 - T0 % 60 + t)
+        start = T0 - T0 % 60
+        fine = store.query("active_tourists", start, start + 119, step=1, max_points=200)
+        coarse = store.query("active_tourists", start, start + 119, step=60)
+        self.assertEqual(len(fine), 120)
+        self.assertEqual([p["samples"] for p in coarse], [60, 60])
+        self.assertEqual(coarse[0]["avg"], 4.5)
+        self.assertEqual(coarse[0]["max"], 9)
+
+    def test_history_survives_restart_and_second_worker_reads(self):
+        with tempfile.TemporaryDirectory() as directory:
+            writer = TimeSeriesStore(directory)
+            writer.record("recent_alerts", 7, T0)
+            reader = TimeSeriesStore(directory)  # lock already held: read-only
+            self.assertFalse(reader.writable)
+            reader.record("recent_alerts", 99, T0)
+            self.assertEqual(reader.query("recent_alerts", T0, T0, step=1)[0]["last"], 7)
+
+            writer.flush()
+            del writer, reader
+            restarted = TimeSeriesStore(directory)
+            self.assertTrue(restarted.writable)
+            self.assertEqual(restarted.query("recent_alerts", T0, T0, step=60)[0]["last"], 7)
+
+    def test_rejects_unknown_resolution_and_huge_ranges(self):
+        store = TimeSeriesStore("")
+        with self.assertRaises(ValueError):
+            store.query("x", T0, T0 + 10, step=5)
+        with self.assertRaises(ValueError):
+            store.query("x", T0, T0 + 5000, step=1, max_points=1000)
+
+
+class TestAnalyticsHistory(unittest.TestCase):
+    def test_samples_aggregator_metrics(self):
+        aggregator = DashboardAggregator()
+        analytics = RealTimeTourismAnalytics(aggregator=aggregator, history=TimeSeriesStore(""))
+        aggregator.record_pings(["A", "B"], [False, True], now=T0)
+        analytics.record_history(now=T0)
+        (point,) = analytics.get_history("active_tourists", T0, T0, resolution=1)
+        self.assertEqual(point["last"], 2)
+        # None (no response measured yet) is skipped, not stored as zero
+        self.assertEqual(analytics.get_history("avg_response_time_seconds", T0, T0, resolution=1)[0]["samples"], 0)
+        with self.assertRaises(ValueError):
+            analytics.get_history("passwords", T0, T0)
+
+
+if __name__ == "__main__":
+    unittest.main()
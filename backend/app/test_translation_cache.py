@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import MultilingualEmergencyProcessor
+from services.translation_cache import TranslationCache, cache_key
+
+
+class TestTranslationCache(unittest.TestCase):
+    def test_key_ignores_case_spacing_and_unicode_form(self):
+        self.assertEqual(cache_key("Help  me\n", "english"), cache_key("help me", "english"))
+        self.assertEqual(cache_key("cafe\u0301", "french"), cache_key("caf\u00e9", "french"))
+        self.assertNotEqual(cache_key("मदद", "hindi"), cache_key("मदद", "marathi"))
+
+    def test_lru_eviction_and_stats(self):
+        cache = TranslationCache(capacity=2)
+        calls = []
+        translate = lambda text: calls.append(text) or text.upper()
+        for text in ("a", "b", "a", "c", "b"):
+            cache.get_or_translate(text, "x", translate)
+        self.assertEqual(calls, ["a", "b", "c", "b"])  # b was evicted by c
+        stats = cache.stats()
+        self.assertEqual((stats["memory_hits"], stats["misses"], stats["memory_entries"]), (1, 4, 2))
+        self.assertAlmostEqual(stats["hit_rate"], 0.2)
+
+    def test_disk_shared_between_instances_and_restarts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cache", "translations.sqlite3")
+            first = TranslationCache(path)
+            second = TranslationCache(path)  # another worker
+            first.put("मदद करो", "hindi", "help me")
+            self.assertEqual(second.get("मदद करो ", "hindi"), "help me")
+            self.assertEqual(second.stats()["disk_hits"], 1)
+            first.close()
+            second.close()
+            restarted = TranslationCache(path)
+            self.assertEqual(restarted.get("मदद करो", "hindi"), "help me")
+            self.assertEqual(restarted.stats()["disk_entries"], 1)
+            restarted.close()
+
+    def test_disk_is_pruned_to_capacity(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TranslationCache(os.path.join(directory, "t.sqlite3"), capacity=1, disk_capacity=5)
+            for i in range(20):
+                cache.put(f"phrase {i}", "hindi", str(i))
+            self.assertLessEqual(cache.stats()["disk_entries"], 5)
+            self.assertEqual(cache.get("phrase 19", "hindi"), "19")
+            cache.close()
+
+    def test_memory_hits_do_not_wait_on_sqlite(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TranslationCache(os.path.join(directory, "t.sqlite3"))
+            cache.put("मदद करो", "hindi", "help me")
+            with cache._db_lock:  # a slow disk read or write in another thread
+                self.assertEqual(cache.get("मदद करो", "hindi"), "help me")
+            cache.close()
+
+    def test_disk_hit_access_times_are_written_in_batches(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "t.sqlite3")
+            writer = TranslationCache(path)
+            for i in range(3):
+                writer.put(f"phrase {i}", "hindi", str(i))
+            reader = TranslationCache(path, capacity=1)
+            reader.touch_batch = 2
+
+            def last_used():
+                return dict(writer._db.execute("SELECT key, last_used FROM translations").fetchall())
+
+            before = last_used()
+            reader.get("phrase 0", "hindi")
+            self.assertEqual(last_used(), before)
+            reader.get("phrase 1", "hindi")
+            after = last_used()
+            self.assertEqual(sum(after[k] > before[k] for k in before), 2)
+            reader.close()
+            writer.close()
+
+
+class TestProcessorUsesCache(unittest.TestCase):
+    def test_repeated_phrase_translated_once(self):
+        processor = MultilingualEmergencyProcessor()
+        calls = []
+
+        def translator(texts, **kwargs):
+            calls.extend(texts)
+            return [{'translation_text': "help"} for _ in texts]
+
+        processor.translator = translator
+        for text in ("मदद करो", "मदद  करो", "मदद करो"):
+            self.assertEqual(processor._translate_to_english(text, "hindi"), "help")
+        self.assertEqual(calls, ["मदद करो"])
+
+    def test_failed_translation_is_not_cached(self):
+        processor = MultilingualEmergencyProcessor()
+
+        def broken(texts, **kwargs):
+            raise RuntimeError("model not loaded")
+
+        processor.translator = broken
+        self.assertEqual(processor._translate_to_english("मदद", "hindi"), "मदद")
+        self.assertIsNone(processor.translation_cache.get("मदद", "hindi"))
+
+
+if __name__ == "__main__":
+    unittest.main()
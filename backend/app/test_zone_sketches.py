@@ -0,0 +1,101 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add the current directory to the path so we can import the modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from ai_models import SmartTouristSafetySystem
+from services.zone_sketches import HyperLogLog, ZoneSketchStore
+
+
+class TestHyperLogLog(unittest.TestCase):
+    def test_small_counts_are_exact_enough(self):
+        sketch = HyperLogLog()
+        sketch.add([f"T{i}" for i in range(100)] * 3)
+        self.assertAlmostEqual(sketch.count(), 100, delta=2)
+
+    def test_large_count_within_error_bound(self):
+        sketch = HyperLogLog(precision=11)
+        sketch.add([f"T{i}" for i in range(50000)])
+        self.assertLess(abs(sketch.count() / 50000 - 1), 0.07)  # 3 standard errors
+
+    def test_merge_equals_union(self):
+        a, b = HyperLogLog(), HyperLogLog()
+        a.add([f"T{i}" for i in range(0, 3000)])
+        b.add([f"T{i}" for i in range(2000, 5000)])
+        self.assertLess(abs(a.merge(b).count() / 5000 - 1), 0.07)
+
+    def test_precision_mismatch(self):
+        with self.assertRaises(ValueError):
+            HyperLogLog(10).merge(HyperLogLog(11))
+
+
+class TestZoneSketchStore(unittest.TestCase):
+    def setUp(self):
+        self.store = ZoneSketchStore(bucket_seconds=60, retention_seconds=600)
+
+    def test_counts_per_zone_and_window_union(self):
+        self.store.record(["fort"] * 3 + ["beach"], ["A", "B", "C", "A"], now=0)
+        self.store.record(["fort", "fort"], ["A", "D"], now=120)
+        self.assertEqual(self.store.zone_counts(60, now=120), {"fort": 2})
+        self.assertEqual(self.store.zone_counts(300, now=120), {"fort": 4, "beach": 1})
+        # A is in both windows and both zones but counted once
+        self.assertEqual(self.store.unique_tourists(windows=[(0, 10), (120, 130)]), 4)
+        self.assertEqual(self.store.unique_tourists(["beach"], windows=[(0, 10)]), 1)
+        self.assertEqual(self.store.unique_tourists(["fort"], windows=[(60, 70)]), 0)
+
+    def test_huge_and_reversed_windows(self):
+        self.store.record(["fort"], ["A"], now=120)
+        started = time.perf_counter()
+        self.assertEqual(self.store.unique_tourists(windows=[(0, 1e11)]), 1)
+        self.assertLess(time.perf_counter() - started, 0.05)
+        with self.assertRaises(ValueError):
+            self.store.unique_tourists(windows=[(130, 120)])
+
+    def test_old_buckets_are_evicted(self):
+        self.store.record(["fort"], ["A"], now=0)
+        self.store.record(["fort"], ["B"], now=1200)
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(self.store.memory_bytes(), 2048)
+
+    def test_workers_merge_through_export_and_snapshot_dir(self):
+        other = ZoneSketchStore(bucket_seconds=60)
+        other.record(["fort", "fort"], ["A", "Z"], now=0)
+        self.store.record(["fort"], ["A"], now=0)
+
+        merged = ZoneSketchStore(bucket_seconds=60)
+        merged.merge_export(self.store.export())
+        merged.merge_export(other.export())
+        self.assertEqual(merged.unique_tourists(windows=[(0, 10)]), 2)
+
+        with tempfile.TemporaryDirectory() as sketch_dir:
+            other.sketch_dir = sketch_dir
+            other.write_snapshot()
+            os.rename(os.path.join(sketch_dir, f"zones_{os.getpid()}.npz"), os.path.join(sketch_dir, "zones_1.npz"))
+            self.store.sketch_dir = sketch_dir
+            self.assertEqual(self.store.unique_tourists(windows=[(0, 10)]), 2)
+            self.assertEqual(self.store.zone_counts(60, now=10), {"fort": 2})
+
+            # A worker that has exited (the PID is above any pid_max) is pruned, not merged
+            os.rename(os.path.join(sketch_dir, "zones_1.npz"), os.path.join(sketch_dir, f"zones_{2 ** 22 + 1}.npz"))
+            self.assertEqual(self.store.unique_tourists(windows=[(0, 10)]), 1)
+            self.assertEqual(os.listdir(sketch_dir), [])
+
+
+class TestPingPathFeedsSketches(unittest.TestCase):
+    def test_located_pings_count_even_when_geofence_is_skipped(self):
+        system = SmartTouristSafetySystem()
+        system.geo_fencing._send_emergency_alert = lambda alert_data: None
+        system.geo_fencing.add_risk_zone("fort", [[0, 0], [0, 1], [1, 1], [1, 0]], 9)
+        ping = {"latitude": 0.5, "longitude": 0.5}
+        system.process_tourist_batch([("T1", ping), ("T2", {"latitude": 5.0, "longitude": 5.0}), ("T3", {})])
+        result = system.process_tourist_batch([("T1", ping), ("T4", ping)])
+        self.assertIn("geofence", result[0]["skipped_stages"])
+        self.assertEqual(system.geo_fencing.zone_sketches.zone_counts(3600), {"fort": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
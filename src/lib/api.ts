@@ -118,7 +118,10 @@ export interface DashboardMetrics {
   active_tourists: number;
   recent_alerts: number;
   high_risk_tourists: number;
-  avg_response_time_minutes: number;
+  avg_response_time_minutes: number | null;  // null until an alert has been answered by an e-FIR
+  response_time_percentiles_minutes?: { p50: number | null; p90: number | null; p99: number | null };
+  recent_efirs?: number;
+  open_alerts?: number;
   system_status: string;
   last_updated: string;
 }
@@ -258,13 +261,44 @@ export const api = {
 };
 
 // WebSocket helpers (compatible with FastAPI/websockets)
-export function connectDashboardWS(onMessage: (msg: any) => void): WebSocket {
+// Messages: hello, metrics (full snapshot on connect), metrics_delta, alert, efir,
+// and tourist_update (only when connected with a touristId).
+export function connectDashboardWS(onMessage: (msg: any) => void, touristId?: string): WebSocket {
   const wsUrl = (API_BASE_URL.startsWith("https") ? "wss" : "ws") + API_BASE_URL.slice(API_BASE_URL.indexOf(":"));
-  const ws = new WebSocket(`${wsUrl}/ws/dashboard`);
+  const query = touristId ? `?tourist_id=${encodeURIComponent(touristId)}` : "";
+  const ws = new WebSocket(`${wsUrl}/ws/dashboard${query}`);
   ws.onmessage = (e) => {
     try { onMessage(JSON.parse(e.data)); } catch { /* ignore */ }
   };
   return ws;
 }
 
+// Same as connectDashboardWS, but reconnects with backoff; returns an unsubscribe function
+export function subscribeDashboard(onMessage: (msg: any) => void, touristId?: string): () => void {
+  let ws: WebSocket | null = null;
+  let closed = false;
+  let retryMs = 1000;
+  let timer: ReturnType<typeof setTimeout> | null = null;
+  const open = () => {
+    try {
+      ws = connectDashboardWS(onMessage, touristId);
+    } catch {
+      timer = setTimeout(open, retryMs);
+      return;
+    }
+    ws.onopen = () => { retryMs = 1000; };
+    ws.onclose = () => {
+      if (closed) return;
+      timer = setTimeout(open, retryMs);
+      retryMs = Math.min(retryMs * 2, 30000);
+    };
+  };
+  open();
+  return () => {
+    closed = true;
+    if (timer) clearTimeout(timer);
+    try { ws?.close(); } catch { /* ignore */ }
+  };
+}
+
 
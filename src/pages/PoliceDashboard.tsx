@@ -275,8 +275,10 @@ const PoliceDashboard = () => {
       bc = new BroadcastChannel('sos_channel');
       bc.onmessage = () => load();
     } catch {}
-    const id = setInterval(load, 10000);
-    return () => { try { bc?.close(); } catch {}; clearInterval(id); };
+    // Other tabs writing sos_events fire 'storage'; no need to re-read it on a timer
+    const onStorage = (e: StorageEvent) => { if (e.key === 'sos_events') load(); };
+    window.addEventListener('storage', onStorage);
+    return () => { try { bc?.close(); } catch {}; window.removeEventListener('storage', onStorage); };
   }, []);
 
   return (
@@ -7,7 +7,7 @@ import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
 import { motion } from "framer-motion";
 import { Calendar, Landmark, MapPin, Users, UserCheck, Star, Shield, BarChart3, LogOut, Map, Cloud } from "lucide-react";
 import { useEffect, useMemo, useState } from "react";
-import { api, connectDashboardWS } from "@/lib/api";
+import { subscribeDashboard, type DashboardMetrics } from "@/lib/api";
 import MapWithWeather from "@/components/MapWithWeather";
 import {
     CartesianGrid,
@@ -58,7 +58,7 @@ const TourismDashboard = () => {
   const [monument, setMonument] = useState<MonumentKey>("Red Fort");
   const [date, setDate] = useState<string>(new Date().toISOString().slice(0, 10));
   const [activeTab, setActiveTab] = useState("analytics");
-  const [metrics, setMetrics] = useState<{ active_tourists?: number; recent_alerts?: number } | null>(null);
+  const [metrics, setMetrics] = useState<Partial<DashboardMetrics> | null>(null);
   const [routeDeviations, setRouteDeviations] = useState<Array<any>>([]);
   const [sosEvents, setSosEvents] = useState<Array<any>>([]);
 
@@ -75,7 +75,7 @@ const TourismDashboard = () => {
 
   const currentOccupancyPercent = (totalVisitors / selectedMonumentDetail.dailyCapacity) * 100;
 
-  // Load route deviation events from localStorage every 10s
+  // Load route deviation events from localStorage, reloading when another tab writes them
   useEffect(() => {
     const load = () => {
       try {
@@ -84,8 +84,9 @@ const TourismDashboard = () => {
       } catch { setRouteDeviations([]); }
     };
     load();
-    const id = setInterval(load, 10000);
-    return () => clearInterval(id);
+    const onStorage = (e: StorageEvent) => { if (e.key === 'route_deviation_events') load(); };
+    window.addEventListener('storage', onStorage);
+    return () => window.removeEventListener('storage', onStorage);
   }, []);
 
   // Load SOS events and listen for real-time updates
@@ -102,8 +103,9 @@ const TourismDashboard = () => {
       bc = new BroadcastChannel('sos_channel');
       bc.onmessage = () => load();
     } catch {}
-    const id = setInterval(load, 10000);
-    return () => { try { bc?.close(); } catch {}; clearInterval(id); };
+    const onStorage = (e: StorageEvent) => { if (e.key === 'sos_events') load(); };
+    window.addEventListener('storage', onStorage);
+    return () => { try { bc?.close(); } catch {}; window.removeEventListener('storage', onStorage); };
   }, []);
 
   // Travel guides (stateful for UI actions)
@@ -184,21 +186,14 @@ const TourismDashboard = () => {
           {(() => {
             // eslint-disable-next-line react-hooks/rules-of-hooks
             useEffect(() => {
-              let ws: WebSocket | null = null;
-              (async () => {
-                try {
-                  const m = await api.getDashboardMetrics();
-                  setMetrics(m);
-                } catch { /* ignore */ }
-                try {
-                  ws = connectDashboardWS((msg) => {
-                    if (msg?.type === "tourist_update") {
-                      setMetrics((prev) => ({ ...prev, recent_alerts: (prev?.recent_alerts || 0) + (msg.data?.alerts_count ? 1 : 0) }));
-                    }
-                  });
-                } catch { /* ignore */ }
-              })();
-              return () => { try { ws?.close(); } catch {} };
+              // The server sends a full snapshot on connect, then only the fields that changed
+              return subscribeDashboard((msg) => {
+                if (msg?.type === "metrics") {
+                  setMetrics(msg.data);
+                } else if (msg?.type === "metrics_delta") {
+                  setMetrics((prev) => ({ ...prev, ...msg.data }));
+                }
+              });
             }, []);
             return null;
           })()}
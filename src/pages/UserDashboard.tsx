@@ -13,7 +13,7 @@ import { SITE_NAME } from "@/lib/brand";
 import brandLogo from "@/components/logo2.jpg";
 import Navbar from "@/components/Navbar";
 import { useEffect, useRef, useState, useCallback } from "react";
-import { api } from "@/lib/api";
+import { api, subscribeDashboard } from "@/lib/api";
 import { useNavigate } from "react-router-dom";
 import { toast } from "sonner";
 import { lazy, Suspense } from 'react';
@@ -246,15 +246,21 @@ const UserDashboard = () => {
     // Initial fetch
     fetchSafetyScore();
     
-    // Set up polling every 5 minutes if we have a valid API URL
-    let interval: NodeJS.Timeout | null = null;
+    // The server pushes this tourist's score whenever it changes, instead of a 5-minute poll
+    let unsubscribe: (() => void) | null = null;
     if (import.meta.env.VITE_API_URL && import.meta.env.VITE_API_URL !== 'http://localhost:8000') {
-      interval = setInterval(fetchSafetyScore, 300000); // Poll every 5 minutes
+      unsubscribe = subscribeDashboard((msg) => {
+        if (msg?.type === 'tourist_update' && !cancelled && msg.data?.safety_score) {
+          setSafetyScore(msg.data.safety_score);
+        } else if (msg?.type === 'alert') {
+          toast.warning('Safety alert: you have entered a high-risk area');
+        }
+      }, blockchainId);
     }
 
     return () => {
       cancelled = true;
-      if (interval) clearInterval(interval);
+      unsubscribe?.();
     };
   }, [currentLocation]);
 